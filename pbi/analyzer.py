@@ -0,0 +1,140 @@
+import json
+import os
+import zipfile
+
+from pbi.archive import LAYOUT, LAYOUT_ENCODING
+from pbi.trace import traced
+
+
+def _get_size(obj):
+    """
+    Returns the size of a layout subtree once serialized in the layout (UTF-16: 2 bytes per character)
+    :param obj: a json string or a json-like object
+    :return: an integer
+    """
+    if not isinstance(obj, str):
+        obj = json.dumps(obj)
+    return 2 * len(obj)
+
+
+class PbiSizeReport:
+    """
+    The size breakdown of one or several .pbix files: archive members, then layout pages, containers, bookmarks and
+    filters.
+    """
+
+    def __init__(self, entries=None):
+        """
+        Creates a size report
+        :param entries: a list of dictionaries with 'report', 'kind', 'path', 'size' and 'compressed_size' keys
+        """
+        self.entries = entries if entries is not None else []
+
+    def __add__(self, other):
+        return PbiSizeReport(self.entries + other.entries)
+
+    def _add(self, report, kind, path, size, compressed_size=None):
+        """
+        Adds an entry to the size report
+        :param report: the report name
+        :param kind: 'member', 'page', 'container', 'bookmark' or 'filter'
+        :param path: the key path of the entry (tuple)
+        :param size: the uncompressed (or serialized) size in bytes
+        :param compressed_size: the compressed size in bytes or None
+        :return: None
+        """
+        self.entries.append({
+            'report': report,
+            'kind': kind,
+            'path': path,
+            'size': size,
+            'compressed_size': compressed_size
+        })
+
+    def get_largest(self, n=10, kind=None):
+        """
+        Returns the largest contributors
+        :param n: the number of entries to return
+        :param kind: 'member', 'page', 'container', 'bookmark', 'filter', a list of these or None (all kinds)
+        :return: a list of dictionaries
+        """
+        if isinstance(kind, str):
+            kind = [kind]
+        entries = [entry for entry in self.entries if kind is None or entry['kind'] in kind]
+        return sorted(entries, key=lambda entry: entry['size'], reverse=True)[:n]
+
+    def get_totals(self, kind='member'):
+        """
+        Returns the total size of the entries of given kind, per report
+        :param kind: 'member', 'page', 'container', 'bookmark' or 'filter'
+        :return: a dictionary {report name: size in bytes}
+        """
+        res = {}
+        for entry in self.entries:
+            if entry['kind'] == kind:
+                res[entry['report']] = res.get(entry['report'], 0) + entry['size']
+        return res
+
+    def __str__(self):
+        lines = [
+            f"{entry['size']:>12,}  {entry['kind']:<9}  {entry['report']}: {'/'.join(str(key) for key in entry['path'])}"
+            for entry in self.get_largest(20)
+        ]
+        return '\n'.join(['Largest contributors (bytes):'] + lines)
+
+    def to_frame(self):
+        """
+        Returns the size report as a pandas DataFrame (pandas is only imported when this is called)
+        :return: a pandas DataFrame
+        """
+        import pandas as pd
+        return pd.DataFrame(self.entries)
+
+
+@traced('analyzer.analyze')
+def analyze(path, report=None):
+    """
+    Returns the size breakdown of a .pbix file (read without extracting the archive)
+    :param path: the path to the .pbix file
+    :param report: the report name (default is the file name)
+    :return: a Power BI size report
+    """
+    if report is None:
+        report = os.path.splitext(os.path.basename(path))[0]
+    res = PbiSizeReport()
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            res._add(report, 'member', (info.filename,), info.file_size, info.compress_size)
+        layout = json.loads(archive.read(LAYOUT).decode(LAYOUT_ENCODING))
+
+    for flt in json.loads(layout.get('filters', '[]')):
+        res._add(report, 'filter', ('filters', flt.get('name')), _get_size(flt))
+    config = json.loads(layout.get('config', '{}'))
+    for bookmark in config.get('bookmarks', []):
+        res._add(report, 'bookmark', ('bookmarks', bookmark.get('displayName', bookmark['name'])), _get_size(bookmark))
+    for section in layout.get('sections', []):
+        page_path = ('sections', section.get('displayName'))
+        res._add(report, 'page', page_path, _get_size(section))
+        for flt in json.loads(section.get('filters', '[]')):
+            res._add(report, 'filter', page_path + ('filters', flt.get('name')), _get_size(flt))
+        for container in section.get('visualContainers', []):
+            try:
+                name = json.loads(container['config'])['name']
+            except (KeyError, ValueError):
+                name = None
+            res._add(report, 'container', page_path + ('visualContainers', name), _get_size(container))
+    return res
+
+
+def analyze_folder(folder):
+    """
+    Returns the size breakdown of all the .pbix files of a folder
+    :param folder: a path to a local folder
+    :return: a Power BI size report
+    """
+    res = PbiSizeReport()
+    for file in sorted(os.listdir(folder)):
+        filename, ext = os.path.splitext(file)
+        if ext == '.pbix':
+            res += analyze(os.path.join(folder, file), filename)
+    return res
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+from pbi.trace import tracer
+
+LAYOUT = 'Report/Layout'
+CONNECTIONS = 'Connections'
+LAYOUT_ENCODING = 'utf-16-le'
+
+
+def read_member(path, name):
+    """
+    Reads a member of a .pbix archive without extracting the archive
+    :param path: the path to the .pbix file
+    :param name: the member name (e.g. 'Report/Layout')
+    :return: bytes or None if the member does not exist
+    """
+    with zipfile.ZipFile(path) as archive:
+        try:
+            data = archive.read(name)
+        except KeyError:
+            return None
+    tracer.count('bytes_read', len(data))
+    return data
+
+
+def read_layout_str(path):
+    """
+    Reads the layout of a .pbix archive without extracting the archive
+    :param path: the path to the .pbix file
+    :return: a json string
+    """
+    return read_member(path, LAYOUT).decode(LAYOUT_ENCODING)
+
+
+def read_connections(path):
+    """
+    Reads the connections of a .pbix archive without extracting the archive
+    :param path: the path to the .pbix file
+    :return: a dictionary or None if the report has no connection file
+    """
+    connections = read_member(path, CONNECTIONS)
+    if connections is None:
+        return None
+    return json.loads(connections.decode('utf-8-sig'))
+
+
+def get_file_hash(path, chunk_size=1 << 20):
+    """
+    Returns the sha1 hash of a file content
+    :param path: the path to the file
+    :param chunk_size: the size of the chunks read (integer)
+    :return: a string
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_member(source, target, info):
+    """
+    Copies a member from an archive to another, streamed in chunks (the member is never held in memory at once), with
+    its name, date, compression method and attributes
+    :param source: the source archive (zipfile.ZipFile opened for reading)
+    :param target: the target archive (zipfile.ZipFile opened for writing)
+    :param info: the zipfile.ZipInfo of the member in the source archive
+    :return: None
+    """
+    new_info = zipfile.ZipInfo(info.filename, info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.external_attr = info.external_attr
+    new_info.comment = info.comment
+    new_info.file_size = info.file_size
+    with source.open(info) as source_file, target.open(new_info, 'w') as target_file:
+        shutil.copyfileobj(source_file, target_file, 1 << 20)
+
+
+def write_archive(path, members=None, removals=None, target_path=None):
+    """
+    Rewrites a .pbix archive once: members given are replaced or added, members to remove are dropped, and all
+    other members are copied as they are (streamed, with the same compression method)
+    :param path: the path to the source .pbix file
+    :param members: a dictionary {member name: bytes} or None
+    :param removals: a collection of member names or None
+    :param target_path: the path to the resulting .pbix file or None (to overwrite the source file)
+    :return: None
+    """
+    members = members or {}
+    removals = set(removals or [])
+    if target_path is None:
+        target_path = path
+    temp_path = f'{target_path}.tmp'
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(temp_path, 'w') as target:
+        for info in source.infolist():
+            if info.filename in removals:
+                continue
+            if info.filename in members:
+                new_info = zipfile.ZipInfo(info.filename, info.date_time)
+                new_info.compress_type = info.compress_type
+                new_info.external_attr = info.external_attr
+                target.writestr(new_info, members[info.filename])
+            else:
+                copy_member(source, target, info)
+        for name, data in members.items():
+            if name not in source.NameToInfo and name not in removals:
+                target.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+    os.replace(temp_path, target_path)
+    tracer.count('bytes_written', os.path.getsize(target_path))
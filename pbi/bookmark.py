@@ -1,4 +1,4 @@
-from pbi.object import _PbiObject
+from pbi.object import _PbiObject, mutates
 
 
 class Bookmark(dict, _PbiObject):
@@ -27,3 +27,46 @@ class Bookmark(dict, _PbiObject):
 Warning: could not find bookmark target visuals.
 """)
             return []
+
+    @mutates
+    def prune(self, section_visuals):
+        """
+        Removes the bookmark state of the sections (pages) and visuals that no longer exist, in the bookmark and its
+        children bookmarks
+        :param section_visuals: a dictionary {section name: set of the names of the visuals of the section}
+        :return: the number of section and visual states removed
+        """
+        res = _prune_state(self, section_visuals)
+        for child in self.get('children', []):
+            res += _prune_state(child, section_visuals)
+        return res
+
+
+def _prune_state(bookmark, section_visuals):
+    """
+    Removes the state of the sections and visuals that no longer exist from a bookmark (dictionary)
+    :param bookmark: a dictionary
+    :param section_visuals: a dictionary {section name: set of the names of the visuals of the section}
+    :return: the number of section and visual states removed
+    """
+    res = 0
+    all_visuals = set().union(*section_visuals.values())
+    try:
+        target_visuals = bookmark['options']['targetVisualNames']
+        bookmark['options']['targetVisualNames'] = [name for name in target_visuals if name in all_visuals]
+        res += len(target_visuals) - len(bookmark['options']['targetVisualNames'])
+    except KeyError:
+        pass
+    sections = bookmark.get('explorationState', {}).get('sections', {})
+    for section_name in list(sections):
+        if section_name not in section_visuals:
+            del sections[section_name]
+            res += 1
+            continue
+        for key in ['visualContainers', 'visualContainerGroups']:
+            states = sections[section_name].get(key, {})
+            for visual_name in list(states):
+                if visual_name not in section_visuals[section_name]:
+                    del states[visual_name]
+                    res += 1
+    return res
@@ -0,0 +1,153 @@
+import gc
+import hashlib
+import os
+import pickle
+
+from pbi import __version__
+from pbi.archive import LAYOUT_ENCODING
+from pbi.layout import PbiLayout, dump_tree
+from pbi.trace import traced, tracer
+
+# the version of the snapshot format, to bump whenever the pickled object tree of a layout changes (e.g. new classes
+# or attributes), even within the same library version
+FORMAT_VERSION = 3
+
+
+class PbiLayoutCache:
+    """
+    An on-disk cache of parsed layouts (pickled object trees), keyed by a hash of the 'Report/Layout' member.
+    The cache is bounded in size: least recently used snapshots are evicted first.
+    NB: loading a snapshot unpickles it, which can run arbitrary code: only use a cache folder that no untrusted user
+    can write to.
+    """
+    ext = 'pbilayout'
+
+    def __init__(self, folder, max_size=500 * 1024 * 1024):
+        """
+        Creates a layout cache in the given folder
+        :param folder: a path to a local folder (created if needed)
+        :param max_size: the maximum total size of the cached snapshots, in bytes
+        """
+        self.folder = folder
+        self.max_size = max_size
+        os.makedirs(folder, exist_ok=True)
+
+    def get_key(self, layout_bytes):
+        """
+        Returns the cache key of a layout (a change of the layout, of the library version or of the snapshot format
+        version changes the key)
+        :param layout_bytes: the content of the 'Report/Layout' member (bytes)
+        :return: a string
+        """
+        digest = hashlib.sha1(layout_bytes)
+        digest.update(f'{__version__}-{FORMAT_VERSION}-{pickle.HIGHEST_PROTOCOL}'.encode())
+        return digest.hexdigest()
+
+    def _get_path(self, key):
+        """
+        Returns the path to the snapshot of given key
+        :param key: a string
+        :return: a string
+        """
+        return os.path.join(self.folder, f'{key}.{self.ext}')
+
+    @traced('cache.get')
+    def get(self, key):
+        """
+        Returns the cached layout of given key
+        :param key: a string
+        :return: a Power BI layout or None if not in cache
+        """
+        path = self._get_path(key)
+        gc_enabled = gc.isenabled()
+        gc.disable()  # the snapshot only holds acyclic dictionaries and lists: no need to collect while loading
+        try:
+            with open(path, 'rb') as file:
+                layout = pickle.loads(file.read())
+        except FileNotFoundError:
+            tracer.count('cache_misses')
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError):
+            print(f'Warning: invalid layout snapshot {path}. Ignoring.')
+            self._remove(path)
+            tracer.count('cache_misses')
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        os.utime(path)
+        tracer.count('cache_hits')
+        return layout
+
+    @traced('cache.put')
+    def put(self, key, layout):
+        """
+        Stores a layout snapshot in the cache and evicts the least recently used snapshots if needed
+        :param key: a string
+        :param layout: a Power BI layout
+        :return: None
+        """
+        path = self._get_path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(dump_tree(layout))
+        os.replace(temp_path, path)
+        self.evict()
+
+    def load(self, layout_bytes):
+        """
+        Returns the layout for the given 'Report/Layout' content, from the cache if possible, otherwise by parsing it
+        (and storing the result in the cache)
+        :param layout_bytes: the content of the 'Report/Layout' member (bytes)
+        :return: a Power BI layout
+        """
+        key = self.get_key(layout_bytes)
+        layout = self.get(key)
+        if layout is None:
+            layout = PbiLayout(layout_bytes.decode(LAYOUT_ENCODING))
+            self.put(key, layout)
+        return layout
+
+    @staticmethod
+    def _remove(path):
+        """
+        Removes a snapshot file, ignoring files already removed (e.g. by another process)
+        :param path: a string
+        :return: None
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """
+        Removes the least recently used snapshots until the cache fits in its maximum size
+        :return: the number of snapshots removed
+        """
+        entries = []
+        for file in os.listdir(self.folder):
+            if file.endswith(f'.{self.ext}'):
+                try:
+                    stat = os.stat(os.path.join(self.folder, file))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, file))
+        total = sum(size for _, size, _ in entries)
+        res = 0
+        for _, size, file in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(os.path.join(self.folder, file))
+            total -= size
+            res += 1
+        return res
+
+    def clear(self):
+        """
+        Removes all snapshots from the cache
+        :return: None
+        """
+        for file in os.listdir(self.folder):
+            if file.endswith(f'.{self.ext}'):
+                self._remove(os.path.join(self.folder, file))
@@ -0,0 +1,303 @@
+import os
+import sqlite3
+
+from pbi.archive import get_file_hash, read_connections, read_layout_str
+from pbi.layout import PbiLayout
+from pbi.report import PbiReport
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    folder TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    UNIQUE (folder, filename)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    display_name TEXT,
+    ordinal INTEGER
+);
+CREATE TABLE IF NOT EXISTS visuals (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    page_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    display_name TEXT,
+    parent_name TEXT,
+    bookmark TEXT
+);
+CREATE TABLE IF NOT EXISTS filters (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    level TEXT NOT NULL,
+    page_name TEXT,
+    visual_name TEXT,
+    name TEXT,
+    entity TEXT,
+    property TEXT
+);
+CREATE TABLE IF NOT EXISTS bookmarks (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    display_name TEXT,
+    parent_name TEXT
+);
+CREATE TABLE IF NOT EXISTS connections (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    name TEXT,
+    type TEXT,
+    dataset_id TEXT,
+    connection_string TEXT
+);
+CREATE INDEX IF NOT EXISTS visuals_type ON visuals (type);
+CREATE INDEX IF NOT EXISTS visuals_bookmark ON visuals (bookmark);
+CREATE INDEX IF NOT EXISTS bookmarks_name ON bookmarks (name);
+CREATE INDEX IF NOT EXISTS filters_field ON filters (entity, property);
+CREATE INDEX IF NOT EXISTS connections_dataset ON connections (dataset_id);
+'''
+
+TABLES = ['pages', 'visuals', 'filters', 'bookmarks', 'connections']
+
+
+def _get_visual_info(container):
+    """
+    Returns the type, display name, parent name and linked bookmark of a visual container, with None for what its
+    config does not define (e.g. a group without display name, or a container without single visual)
+    :param container: a Power BI container
+    :return: a tuple of strings or None
+    """
+    config = container['config']
+    if container.is_group:
+        return container.type, config['singleVisualGroup'].get('displayName'), container.parent_name, None
+    visual = config.get('singleVisual', {})
+    try:
+        display_name = visual['vcObjects']['title'][0]['properties']['text']['expr']['Literal']['Value']
+    except (KeyError, IndexError):
+        display_name = None
+    try:
+        bookmark = visual['vcObjects']['visualLink'][0]['properties']['bookmark']['expr']['Literal']['Value'].replace(
+            "'", ''
+        )
+    except (KeyError, IndexError):
+        bookmark = None
+    return visual.get('visualType'), display_name, container.parent_name, bookmark
+
+
+class PbiCatalogEntry(dict):
+    """
+    A row returned by a Power BI catalog query, with a handle back to the report it comes from.
+    """
+
+    @property
+    def report(self):
+        """
+        Opens and returns the Power BI report the row comes from
+        :return: a Power BI report
+        """
+        return PbiReport(self['folder'], self['filename'])
+
+
+class PbiCatalog:
+    """
+    An on-disk SQLite catalog of the reports, pages, visuals, filters, bookmarks and connections of report folders.
+    """
+    ext = PbiReport.ext
+
+    def __init__(self, db_path):
+        """
+        Opens (or creates) the catalog stored at the given path
+        :param db_path: the path to the SQLite database (string)
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Closes the catalog database
+        :return: None
+        """
+        self.connection.close()
+
+    def refresh(self, folder):
+        """
+        Updates the catalog with the reports of the given folder. Only the reports whose modification time, size and
+        content hash changed are parsed again; reports no longer in the folder are removed.
+        :param folder: a path to a local folder
+        :return: a dictionary with the number of 'added', 'updated', 'unchanged' and 'removed' reports
+        """
+        res = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        known = {
+            row['filename']: row for row in self.connection.execute(
+                'SELECT id, filename, mtime, size, hash FROM reports WHERE folder = ?', (folder,)
+            )
+        }
+        found = set()
+        for file in sorted(os.listdir(folder)):
+            filename, ext = os.path.splitext(file)
+            if ext != f'.{self.ext}':
+                continue
+            found.add(filename)
+            path = os.path.join(folder, file)
+            stat = os.stat(path)
+            row = known.get(filename)
+            if row is not None and row['mtime'] == stat.st_mtime and row['size'] == stat.st_size:
+                res['unchanged'] += 1
+                continue
+            file_hash = get_file_hash(path)
+            with self.connection:
+                if row is not None and row['hash'] == file_hash:
+                    self.connection.execute(
+                        'UPDATE reports SET mtime = ?, size = ? WHERE id = ?',
+                        (stat.st_mtime, stat.st_size, row['id'])
+                    )
+                    res['unchanged'] += 1
+                    continue
+                if row is not None:
+                    self.connection.execute('DELETE FROM reports WHERE id = ?', (row['id'],))
+                    res['updated'] += 1
+                else:
+                    res['added'] += 1
+                report_id = self.connection.execute(
+                    'INSERT INTO reports (folder, filename, mtime, size, hash) VALUES (?, ?, ?, ?, ?)',
+                    (folder, filename, stat.st_mtime, stat.st_size, file_hash)
+                ).lastrowid
+                self._index_report(report_id, path)
+        with self.connection:
+            for filename, row in known.items():
+                if filename not in found:
+                    self.connection.execute('DELETE FROM reports WHERE id = ?', (row['id'],))
+                    res['removed'] += 1
+        return res
+
+    def _index_report(self, report_id, path):
+        """
+        Inserts the content of the report at the given path in the catalog
+        :param report_id: the id of the report in the catalog (integer)
+        :param path: the path to the .pbix file
+        :return: None
+        """
+        layout = PbiLayout(read_layout_str(path))
+        rows = {table: [] for table in TABLES}
+        rows['filters'] += [
+            (report_id, 'report', None, None, flt['name'], flt.entity, flt.property_name)
+            for flt in layout.get('filters', [])
+        ]
+        for page in layout['sections']:
+            rows['pages'].append((report_id, page.name, page.display_name, page.get('ordinal')))
+            rows['filters'] += [
+                (report_id, 'page', page.name, None, flt['name'], flt.entity, flt.property_name)
+                for flt in page.get('filters', [])
+            ]
+            for container in page['visualContainers']:
+                rows['visuals'].append((
+                    report_id, page.name, container.name, *_get_visual_info(container)
+                ))
+                rows['filters'] += [
+                    (report_id, 'visual', page.name, container.name, flt['name'], flt.entity, flt.property_name)
+                    for flt in container.get('filters', [])
+                ]
+        for bookmark in layout['config'].get('bookmarks', []):
+            rows['bookmarks'].append((report_id, bookmark['name'], bookmark.get('displayName'), None))
+            rows['bookmarks'] += [
+                (report_id, child['name'], child.get('displayName'), bookmark['name'])
+                for child in bookmark.get('children', [])
+            ]
+        connections = read_connections(path)
+        if connections is not None:
+            remote_artifacts = connections.get('RemoteArtifacts') or [{}]
+            for connection in connections.get('Connections', []):
+                rows['connections'].append((
+                    report_id,
+                    connection.get('Name'),
+                    connection.get('ConnectionType'),
+                    connection.get('PbiModelDatabaseName', remote_artifacts[0].get('DatasetId')),
+                    connection.get('ConnectionString')
+                ))
+        for table, table_rows in rows.items():
+            if table_rows:
+                placeholders = ', '.join('?' * len(table_rows[0]))
+                self.connection.executemany(f'INSERT INTO {table} VALUES ({placeholders})', table_rows)
+
+    def query(self, sql, parameters=()):
+        """
+        Runs a SQL query on the catalog. Rows which include the report 'folder' and 'filename' columns give access
+        to the report through their 'report' property.
+        :param sql: a SQL query (string)
+        :param parameters: the query parameters (tuple or dictionary)
+        :return: a list of Power BI catalog entries
+        """
+        return [PbiCatalogEntry(dict(row)) for row in self.connection.execute(sql, parameters)]
+
+    def get_reports(self):
+        """
+        Returns all the reports in the catalog
+        :return: a list of Power BI catalog entries
+        """
+        return self.query('SELECT folder, filename, hash FROM reports ORDER BY folder, filename')
+
+    def find_bookmarks(self, name):
+        """
+        Returns the reports with a bookmark of the given name (or display name), and the visuals linking to it
+        :param name: a string
+        :return: a list of Power BI catalog entries
+        """
+        return self.query('''
+            SELECT r.folder, r.filename, b.name AS bookmark, b.display_name,
+                v.page_name, v.name AS visual_name
+            FROM bookmarks b
+            JOIN reports r ON r.id = b.report_id
+            LEFT JOIN visuals v ON v.report_id = b.report_id AND v.bookmark = b.name
+            WHERE b.name = ? OR b.display_name = ?
+            ORDER BY r.folder, r.filename
+        ''', (name, name))
+
+    def find_visuals(self, visual_type=None, display_name=None):
+        """
+        Returns the visuals of the given type and/or display name
+        :param visual_type: a Power BI visual type (e.g. 'slicer') or None
+        :param display_name: a string or None
+        :return: a list of Power BI catalog entries
+        """
+        return self.query('''
+            SELECT r.folder, r.filename, p.display_name AS page, v.name, v.type, v.display_name
+            FROM visuals v
+            JOIN reports r ON r.id = v.report_id
+            JOIN pages p ON p.report_id = v.report_id AND p.name = v.page_name
+            WHERE (:type IS NULL OR v.type = :type) AND (:display_name IS NULL OR v.display_name = :display_name)
+            ORDER BY r.folder, r.filename, p.ordinal
+        ''', {'type': visual_type, 'display_name': display_name})
+
+    def find_filters(self, entity=None, property_name=None):
+        """
+        Returns the filters on the given table and/or column
+        :param entity: a table name or None
+        :param property_name: a column or measure name or None
+        :return: a list of Power BI catalog entries
+        """
+        return self.query('''
+            SELECT r.folder, r.filename, f.level, f.page_name, f.visual_name, f.name, f.entity, f.property
+            FROM filters f
+            JOIN reports r ON r.id = f.report_id
+            WHERE (:entity IS NULL OR f.entity = :entity) AND (:property IS NULL OR f.property = :property)
+            ORDER BY r.folder, r.filename
+        ''', {'entity': entity, 'property': property_name})
+
+    def find_connections(self, dataset_id):
+        """
+        Returns the reports connected to the given dataset
+        :param dataset_id: a string
+        :return: a list of Power BI catalog entries
+        """
+        return self.query('''
+            SELECT r.folder, r.filename, c.name, c.type, c.dataset_id
+            FROM connections c
+            JOIN reports r ON r.id = c.report_id
+            WHERE c.dataset_id = ?
+            ORDER BY r.folder, r.filename
+        ''', (dataset_id,))
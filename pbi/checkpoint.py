@@ -0,0 +1,74 @@
+from pbi.object import _observers
+
+
+class PbiCheckpoint:
+    """
+    An in-memory checkpoint of a Power BI layout, with copy-on-write: taking the checkpoint copies nothing, and each
+    Power BI object (layout, page, container, filter, bookmark) saves its own content the first time it is modified
+    afterwards. Unchanged pages and containers are shared with the live layout, and rolling back only restores (in
+    place) the objects that changed.
+    The objects of other layouts are told apart by the owner token the layout tags its objects with when they are
+    parsed or attached by the library methods, so taking a checkpoint does not walk the layout.
+    NB: objects added afterwards are dropped by the rollback of the list holding them, and objects are only tracked
+    when they are modified through the library methods (or after _notify_write is called).
+    """
+
+    def __init__(self, layout):
+        """
+        Creates an active checkpoint of the given layout
+        :param layout: a Power BI layout
+        """
+        self.layout = layout
+        self.owner = layout._get_owner()
+        self.states = {}
+        self.active = True
+        _observers.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        self.release()
+        return False
+
+    def before_write(self, obj):
+        """
+        Saves the content of a Power BI object of the layout before its first modification since the checkpoint
+        (objects tagged by other layouts are ignored)
+        :param obj: a Power BI object
+        :return: None
+        """
+        owner = obj.__dict__.get('_owner')
+        if (owner is None or owner is self.owner) and id(obj) not in self.states:
+            self.states[id(obj)] = obj, obj._snapshot()
+
+    @property
+    def changed(self):
+        """
+        Returns the Power BI objects modified since the checkpoint
+        :return: a list of Power BI objects
+        """
+        return [obj for obj, _ in self.states.values()]
+
+    def rollback(self):
+        """
+        Restores the layout as it was when the checkpoint was taken (the checkpoint remains active)
+        :return: the number of objects restored
+        """
+        res = len(self.states)
+        states, self.states = self.states, {}
+        for obj, state in states.values():
+            obj._restore(state)
+        return res
+
+    def release(self):
+        """
+        Keeps all changes and stops tracking them
+        :return: None
+        """
+        if self.active:
+            _observers.remove(self)
+            self.active = False
+        self.states = {}
@@ -0,0 +1,172 @@
+import json
+
+REMOVED = ['hidden_visuals', 'empty_groups', 'unused_filters', 'unused_resources']
+
+
+def _is_hidden(container):
+    """
+    Returns True if the container is hidden
+    :param container: a Power BI container
+    :return: a boolean
+    """
+    config = container['config']
+    if 'singleVisualGroup' in config:
+        return bool(config['singleVisualGroup'].get('isHidden', False))
+    return config.get('singleVisual', {}).get('display', {}).get('mode') == 'hidden'
+
+
+def _get_bookmark_visual_names(layout):
+    """
+    Returns the names of all the visuals (and groups) whose state is governed by a bookmark
+    :param layout: a Power BI layout
+    :return: a set of strings
+    """
+    res = set()
+    bookmarks = []
+    for bookmark in layout['config'].get('bookmarks', []):
+        bookmarks += [bookmark] + bookmark.get('children', [])
+    for bookmark in bookmarks:
+        res.update(bookmark.get('options', {}).get('targetVisualNames', []))
+        for section in bookmark.get('explorationState', {}).get('sections', {}).values():
+            res.update(section.get('visualContainers', {}))
+            res.update(section.get('visualContainerGroups', {}))
+    return res
+
+
+def _is_unused(flt):
+    """
+    Returns True if the filter has no condition and cannot be set by users (hidden in the filter pane)
+    :param flt: a Power BI filter
+    :return: a boolean
+    """
+    return 'filter' not in flt and flt.get('isHiddenInViewMode', False)
+
+
+def _get_size(obj):
+    """
+    Returns the approximate size of an object once serialized in the layout (UTF-16: 2 bytes per character)
+    :param obj: a json-like object
+    :return: an integer
+    """
+    return 2 * len(json.dumps(obj))
+
+
+def find_garbage(layout):
+    """
+    Finds the dead objects of a layout:
+    - hidden visuals (and groups, with their content) that no bookmark can show again,
+    - visuals whose parent group does not exist anymore,
+    - groups without any visual,
+    - filters (at any level) without any condition that are hidden in the filter pane,
+    - registered resource package items that nothing refers to.
+    :param layout: a Power BI layout
+    :return: a dictionary {category: list of (page or None, object) tuples}
+    """
+    res = {
+        'hidden_visuals': [],
+        'orphan_visuals': [],
+        'empty_groups': [],
+        'unused_filters': [],
+        'unused_resources': []
+    }
+    bookmark_visual_names = _get_bookmark_visual_names(layout)
+    for page in layout['sections']:
+        containers = {container.name: container for container in page['visualContainers']}
+        dead = set()
+        for name, container in containers.items():
+            ancestors = [container]
+            while ancestors[-1].parent_name in containers and containers[ancestors[-1].parent_name] not in ancestors:
+                ancestors.append(containers[ancestors[-1].parent_name])
+            if any(_is_hidden(ancestor) and ancestor.name not in bookmark_visual_names for ancestor in ancestors):
+                dead.add(name)
+                res['hidden_visuals'].append((page, container))
+            elif container.parent_name is not None and container.parent_name not in containers:
+                res['orphan_visuals'].append((page, container))
+        parent_names = {
+            container.parent_name for name, container in containers.items()
+            if name not in dead and not container.is_group
+        }
+        # a group is empty if neither it nor any of its sub-groups holds a visual
+        non_empty = set()
+        for parent_name in parent_names:
+            while parent_name in containers and parent_name not in non_empty:
+                non_empty.add(parent_name)
+                parent_name = containers[parent_name].parent_name
+        res['empty_groups'] += [
+            (page, container) for name, container in containers.items()
+            if container.is_group and name not in dead and name not in non_empty
+        ]
+        res['unused_filters'] += [(page, flt) for flt in page.get('filters', []) if _is_unused(flt)]
+        res['unused_filters'] += [
+            (page, flt) for name, container in containers.items() if name not in dead
+            for flt in container.get('filters', []) if _is_unused(flt)
+        ]
+    res['unused_filters'] += [(None, flt) for flt in layout.get('filters', []) if _is_unused(flt)]
+
+    references = json.dumps([layout['config'], [page.export() for page in layout['sections']]])
+    try:
+        items = layout.get_resource_package('RegisteredResources')['items']
+    except (KeyError, AssertionError):
+        items = []
+    res['unused_resources'] = [
+        (None, item) for item in items
+        if item['name'] not in references and item.get('path', item['name']) not in references
+    ]
+    return res
+
+
+def get_garbage_size(garbage):
+    """
+    Returns the approximate number of layout bytes the removal of the dead objects found by find_garbage frees
+    :param garbage: a dictionary returned by find_garbage
+    :return: an integer
+    """
+    return sum(_get_size(obj) for category in REMOVED for _, obj in garbage[category])
+
+
+def remove_garbage(layout, garbage):
+    """
+    Removes the dead objects found by find_garbage from a layout
+    :param layout: a Power BI layout
+    :param garbage: a dictionary returned by find_garbage
+    :return: the approximate number of bytes removed from the layout
+    """
+    removed = {id(obj) for category in REMOVED for _, obj in garbage[category]}
+    if not removed and not garbage['orphan_visuals']:
+        return 0
+    layout._notify_write()
+    for _, container in garbage['orphan_visuals']:
+        if id(container) not in removed:
+            container._notify_write()
+            del container['config']['parentGroupName']
+    for obj in [layout] + layout['sections'] + [
+        container for page in layout['sections'] for container in page['visualContainers']
+    ]:
+        if 'visualContainers' in obj and any(id(container) in removed for container in obj['visualContainers']):
+            obj._notify_write()
+            obj['visualContainers'] = [
+                container for container in obj['visualContainers'] if id(container) not in removed
+            ]
+        if 'filters' in obj and any(id(flt) in removed for flt in obj['filters']):
+            obj._notify_write()
+            obj['filters'][:] = [flt for flt in obj['filters'] if id(flt) not in removed]
+    for package in layout.get('resourcePackages', []):
+        items = package['resourcePackage']['items']
+        items[:] = [item for item in items if id(item) not in removed]
+    return get_garbage_size(garbage)
+
+
+def summarize_garbage(garbage):
+    """
+    Returns a printable summary of the dead objects found by find_garbage
+    :param garbage: a dictionary returned by find_garbage
+    :return: a dictionary {category: list of names}
+    """
+    res = {}
+    for category, objects in garbage.items():
+        names = []
+        for page, obj in objects:
+            name = obj.name if hasattr(obj, 'is_group') else obj.get('name')
+            names.append(name if page is None else f'{page.display_name}/{name}')
+        res[category] = names
+    return res
@@ -0,0 +1,167 @@
+import codecs
+import json
+import os
+import re
+
+from pbi.archive import CONNECTIONS, read_member, write_archive
+from pbi.trace import traced, tracer
+
+
+class PbiConnection(dict):
+    """
+    A Power BI connection (to a dataset), as listed in the report connections.
+    """
+
+    @property
+    def properties(self):
+        """
+        Returns the properties of the connection string
+        :return: a dictionary {property name: value}
+        """
+        res = {}
+        for part in self.get('ConnectionString', '').split(';'):
+            if '=' in part:
+                key, value = part.split('=', 1)
+                res[key.strip()] = value.strip()
+        return res
+
+    @property
+    def dataset_id(self):
+        """
+        Returns the id of the dataset the report is bound to
+        :return: a string or None
+        """
+        return self.get('PbiModelDatabaseName') or self.properties.get('Initial Catalog')
+
+    @property
+    def data_source(self):
+        """
+        Returns the data source of the connection (e.g. 'pbiazure://api.powerbi.com' or a workspace url)
+        :return: a string or None
+        """
+        return self.properties.get('Data Source')
+
+
+class PbiConnections(dict):
+    """
+    The Power BI report connections (the 'Connections' member of a .pbix file).
+    """
+
+    def __init__(self, strg, bom=False):
+        """
+        Creates a PbiConnections object from its json string
+        :param strg: a json string
+        :param bom: a boolean, True if the member starts with a UTF-8 byte order mark (kept when exported)
+        """
+        super().__init__(json.loads(strg))
+        self.bom = bom
+        self['Connections'] = [PbiConnection(connection) for connection in self.get('Connections', [])]
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Creates a PbiConnections object from the content of the 'Connections' member
+        :param data: bytes
+        :return: a Power BI connections object
+        """
+        return cls(data.decode('utf-8-sig'), data.startswith(codecs.BOM_UTF8))
+
+    def to_bytes(self):
+        """
+        Exports the connections as the content of the 'Connections' member
+        :return: bytes
+        """
+        data = json.dumps(self, separators=(',', ':')).encode('utf-8')
+        return codecs.BOM_UTF8 + data if self.bom else data
+
+    @property
+    def connections(self):
+        """
+        Returns the connections of the report
+        :return: a list of Power BI connections
+        """
+        return self['Connections']
+
+    @property
+    def dataset_ids(self):
+        """
+        Returns the ids of the datasets the report is bound to
+        :return: a set of strings
+        """
+        res = {connection.dataset_id for connection in self.connections} - {None}
+        res |= {artifact['DatasetId'] for artifact in self.get('RemoteArtifacts', []) if 'DatasetId' in artifact}
+        return res
+
+    def rebind(self, dataset_ids=None, workspace_ids=None):
+        """
+        Rebinds the report to other datasets (and workspaces): all the ids are replaced at once, within the values of
+        the connections only (so that an id mapped to another id of the mapping is not replaced twice)
+        :param dataset_ids: a dictionary {dataset id from: dataset id to} or None
+        :param workspace_ids: a dictionary {workspace id from: workspace id to} or None
+        :return: the number of values updated
+        """
+        mapping = {**(workspace_ids or {}), **(dataset_ids or {})}
+        mapping = {key: value for key, value in mapping.items() if key and value and key != value}
+        if not mapping:
+            return 0
+        pattern = re.compile('|'.join(re.escape(key) for key in sorted(mapping, key=len, reverse=True)))
+        return _rebind(self, pattern, mapping)
+
+
+def _rebind(obj, pattern, mapping):
+    """
+    Replaces the ids of a mapping within all the string values of a json-like object, in place
+    :param obj: a dictionary or a list
+    :param pattern: a compiled regular expression matching the ids to replace
+    :param mapping: a dictionary {id from: id to}
+    :return: the number of values updated
+    """
+    res = 0
+    items = obj.items() if isinstance(obj, dict) else enumerate(obj)
+    for key, value in list(items):
+        if isinstance(value, str):
+            new_value = pattern.sub(lambda match: mapping[match.group(0)], value)
+            if new_value != value:
+                obj[key] = new_value
+                res += 1
+        elif isinstance(value, (dict, list)):
+            res += _rebind(value, pattern, mapping)
+    return res
+
+
+def rebind_file(path, dataset_ids=None, workspace_ids=None):
+    """
+    Rebinds a .pbix file to other datasets (and workspaces): only the 'Connections' member is rewritten, all other
+    members (layout, data model, etc.) are copied as they are
+    :param path: the path to the .pbix file
+    :param dataset_ids: a dictionary {dataset id from: dataset id to} or None
+    :param workspace_ids: a dictionary {workspace id from: workspace id to} or None
+    :return: the number of values updated
+    """
+    data = read_member(path, CONNECTIONS)
+    if data is None:
+        return 0
+    connections = PbiConnections.from_bytes(data)
+    res = connections.rebind(dataset_ids, workspace_ids)
+    if res:
+        write_archive(path, {CONNECTIONS: connections.to_bytes()})
+    return res
+
+
+@traced('connections.rebind_folder')
+def rebind_folder(folder, dataset_ids=None, workspace_ids=None):
+    """
+    Rebinds all the .pbix files of a folder to other datasets (and workspaces), only rewriting their 'Connections'
+    member (the layouts are not even read)
+    :param folder: a path to a local folder
+    :param dataset_ids: a dictionary {dataset id from: dataset id to} or None
+    :param workspace_ids: a dictionary {workspace id from: workspace id to} or None
+    :return: a dictionary {report name: number of values updated}
+    """
+    res = {}
+    for file in sorted(os.listdir(folder)):
+        filename, ext = os.path.splitext(file)
+        if ext == '.pbix':
+            res[filename] = rebind_file(os.path.join(folder, file), dataset_ids, workspace_ids)
+    tracer.count('reports_rebound', sum(1 for count in res.values() if count))
+    return res
@@ -3,6 +3,7 @@ import json
 
 from pbi.config import PbiConfig
 from pbi.filter import _PbiFilterObject
+from pbi.object import _clone, _set_owner, mutates
 
 
 class PbiContainer(dict, _PbiFilterObject):
@@ -36,6 +37,7 @@ class PbiContainer(dict, _PbiFilterObject):
         """
         return self['config']['name']
 
+    @mutates
     def update_name(self, new_name):
         """
         Updates the name of the PowerBI container
@@ -62,6 +64,7 @@ class PbiContainer(dict, _PbiFilterObject):
         except KeyError:
             return None
 
+    @mutates
     def update_parent_name(self, new_name):
         """
         Updates the parent name of the PowerBI container
@@ -112,6 +115,7 @@ class PbiContainer(dict, _PbiFilterObject):
         return self['config']['singleVisual']['objects']['text'][1]['properties']['fontFamily']['expr']['Literal'][
             'Value']
 
+    @mutates
     def update_font(self, new_font):
         """
         Updates the font used in the visual text.
@@ -122,10 +126,13 @@ class PbiContainer(dict, _PbiFilterObject):
 
     def copy(self):
         """
-        Returns a new Power BI container.
+        Returns a new Power BI container (the decoded structure is cloned as is, without any json round trip), held by
+        no layout
         :return: a Power BI container
         """
-        return PbiContainer(self.export())
+        res = _clone(self)
+        _set_owner(res, None)
+        return res
 
     def export(self):
         """
@@ -149,6 +156,7 @@ class PbiContainer(dict, _PbiFilterObject):
 
         return container
 
+    @mutates
     def update_keep_layer_order(self):
         """
         Updates keep layer order if appropriate
@@ -181,6 +189,7 @@ class PbiContainer(dict, _PbiFilterObject):
             else:
                 return False
 
+    @mutates
     def update_multiselect(self, allow_control=False, allow_all=True, unselect_all=True):
         """
         Updates multiselection not to allow CTRL key and returns a boolean
@@ -260,6 +269,7 @@ class PbiContainer(dict, _PbiFilterObject):
                 print(f'KeyError in updating multi-select {self.display_name} (unselect all): {e}.')
         return res_ctrl, res_allow_all, res_unselect_all
 
+    @mutates
     def add_search(self):
         """
         Enables the search feature for a slicer
@@ -277,6 +287,7 @@ class PbiContainer(dict, _PbiFilterObject):
                 print(f'Error in enabling search for {self.display_name}: {e}.')
                 return False
 
+    @mutates
     def disable_headers(self):
         """
         Disables headers for the visual and returns a boolean
@@ -316,6 +327,7 @@ class PbiContainer(dict, _PbiFilterObject):
             print(f'Error in disabling headers: {self.display_name}.')
             return False
 
+    @mutates
     def remove_from_mobile(self):
         """
         Removes the visual from the mobile screen and returns a boolean
@@ -332,6 +344,7 @@ class PbiContainer(dict, _PbiFilterObject):
             print(f'Error in removing visual from mobile: {self.display_name}.')
             return False
 
+    @mutates
     def hide(self):
         """
         Hides the visual
@@ -342,6 +355,7 @@ class PbiContainer(dict, _PbiFilterObject):
         else:
             self['config']['singleVisual']['display'] = {'mode': 'hidden'}
 
+    @mutates
     def update_position(
             self,
             x=None,
@@ -375,6 +389,7 @@ class PbiContainer(dict, _PbiFilterObject):
             self['config']['layouts'][0]['position']['height'] = height
             self['height'] = round(height, 2)
 
+    @mutates
     def update_page_link(self, page):
         """
         Update a link to point to a page.
@@ -400,6 +415,7 @@ class PbiContainer(dict, _PbiFilterObject):
             except KeyError:
                 print(f'Coud not update button link for {self.display_name}.')
 
+    @mutates
     def remove_link(self, update_style=False, hide=False):
         """
         Removes a link from an action button visual and updates look and feel by setting font and border to grey or
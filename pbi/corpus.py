@@ -0,0 +1,115 @@
+import os
+import pickle
+import zlib
+from multiprocessing import shared_memory
+
+from pbi.layout import dump_tree
+from pbi.trace import traced, tracer
+
+
+def _attach(name):
+    """
+    Attaches to an existing shared memory block, without tracking it for removal (only the process that created the
+    block removes it)
+    :param name: the name of the shared memory block
+    :return: a SharedMemory object
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:  # Python < 3.13: pool workers share the resource tracker of the process that created the block
+        return shared_memory.SharedMemory(name)
+
+
+class PbiCorpus:
+    """
+    A read-only corpus of report layouts held once in shared memory (as compressed object trees), to be shared between
+    the worker processes of a pool: the corpus itself pickles as the name of its memory block and an index, and each
+    worker only loads the layouts it needs.
+    """
+
+    def __init__(self, name, index):
+        """
+        Attaches to a corpus
+        :param name: the name of the shared memory block
+        :param index: a dictionary {report name: (offset, size)}
+        """
+        self.name = name
+        self.index = index
+        self._memory = _attach(name)
+        self._owner = False
+
+    def __reduce__(self):
+        return PbiCorpus, (self.name, self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @classmethod
+    @traced('corpus.create')
+    def create(cls, reports):
+        """
+        Creates a corpus from reports: their layouts are copied once to shared memory
+        :param reports: a list of Power BI reports
+        :return: a Power BI corpus (to be closed once the workers are done)
+        """
+        blobs = {report.filename: zlib.compress(dump_tree(report.layout), 1) for report in reports}
+        memory = shared_memory.SharedMemory(create=True, size=max(sum(len(blob) for blob in blobs.values()), 1))
+        index = {}
+        offset = 0
+        for name, blob in blobs.items():
+            memory.buf[offset:offset + len(blob)] = blob
+            index[name] = (offset, len(blob))
+            offset += len(blob)
+        corpus = cls.__new__(cls)
+        corpus.name = memory.name
+        corpus.index = index
+        corpus._memory = memory
+        corpus._owner = True
+        tracer.count('corpus_bytes', offset)
+        return corpus
+
+    @classmethod
+    def from_folder(cls, folder, report_class=None):
+        """
+        Creates a corpus from all the reports of a folder
+        :param folder: a path to a local folder
+        :param report_class: the report class used to open the reports (default is PbiReport)
+        :return: a Power BI corpus
+        """
+        if report_class is None:
+            from pbi.report import PbiReport
+            report_class = PbiReport
+        return cls.create([
+            report_class(folder, filename) for filename, ext in map(os.path.splitext, sorted(os.listdir(folder)))
+            if ext == f'.{report_class.ext}'
+        ])
+
+    @property
+    def names(self):
+        """
+        Returns the names of the reports of the corpus
+        :return: a list of strings
+        """
+        return list(self.index)
+
+    def get_layout(self, name):
+        """
+        Returns the layout of a report of the corpus (a new object tree, loaded from shared memory)
+        :param name: the report name
+        :return: a Power BI layout
+        """
+        offset, size = self.index[name]
+        return pickle.loads(zlib.decompress(self._memory.buf[offset:offset + size]))
+
+    def close(self):
+        """
+        Detaches from the corpus (and frees the shared memory if the corpus was created in this process)
+        :return: None
+        """
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
@@ -0,0 +1,334 @@
+import hashlib
+import json
+
+POSITION_KEYS = {'x', 'y', 'z', 'width', 'height'}
+
+
+def _hash(*parts):
+    """
+    Returns the hexadecimal sha1 digest of the given strings
+    :param parts: strings
+    :return: a string
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def _hash_object(obj):
+    """
+    Returns the hash of a json-like object (dictionaries, lists, and Power BI objects deriving from them)
+    :param obj: a json-like object
+    :return: a string
+    """
+    return _hash(json.dumps(obj, sort_keys=True))
+
+
+def _get_bookmarks(layout):
+    """
+    Returns all bookmarks of the layout (bookmarks within bookmark groups included) by name
+    :param layout: a Power BI layout
+    :return: a dictionary
+    """
+    res = {}
+    for bookmark in layout['config'].get('bookmarks', []):
+        res[bookmark['name']] = bookmark
+        for child in bookmark.get('children', []):
+            res[child['name']] = child
+    return res
+
+
+def _get_filters(obj):
+    """
+    Returns the filters of an object with filters by name
+    :param obj: a Power BI layout, page or container
+    :return: a dictionary
+    """
+    return {flt['name']: flt for flt in obj.get('filters', [])}
+
+
+def _without_position(container):
+    """
+    Returns the container content without any positional information
+    :param container: a Power BI container
+    :return: a dictionary
+    """
+    res = {key: value for key, value in container.items() if key not in POSITION_KEYS}
+    res['config'] = {key: value for key, value in container['config'].items() if key != 'layouts'}
+    return res
+
+
+def get_key_paths(old, new, path=()):
+    """
+    Returns the key paths where two json-like objects differ. Identical subtrees are skipped at once.
+    :param old: a json-like object
+    :param new: a json-like object
+    :param path: the key path of the given objects (tuple)
+    :return: a list of tuples
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        res = []
+        for key in list(old) + [key for key in new if key not in old]:
+            if key not in old or key not in new:
+                res.append(path + (key,))
+            else:
+                res += get_key_paths(old[key], new[key], path + (key,))
+        return res
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        res = []
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            res += get_key_paths(old_item, new_item, path + (i,))
+        return res
+    return [path]
+
+
+class PbiChange:
+    """
+    A change between two Power BI layouts.
+    """
+
+    def __init__(self, kind, status, path, old_path=None, key_paths=None):
+        """
+        Creates a change
+        :param kind: 'layout', 'page', 'visual', 'filter' or 'bookmark'
+        :param status: 'added', 'removed', 'modified', 'repositioned' (a visual whose position only changed) or 'moved'
+        (a visual moved to another page)
+        :param path: the key path of the object in the new layout (in the old one if removed)
+        :param old_path: the key path of the object in the old layout (if moved to another page)
+        :param key_paths: the key paths modified within the object (list of tuples)
+        """
+        self.kind = kind
+        self.status = status
+        self.path = path
+        self.old_path = old_path
+        self.key_paths = key_paths or []
+
+    def __repr__(self):
+        return f'PbiChange({self.status} {self.kind} {"/".join(str(key) for key in self.path)})'
+
+    def to_dict(self):
+        """
+        Returns the change as a dictionary
+        :return: a dictionary
+        """
+        return {
+            'kind': self.kind,
+            'status': self.status,
+            'path': list(self.path),
+            'old_path': None if self.old_path is None else list(self.old_path),
+            'key_paths': [list(key_path) for key_path in self.key_paths]
+        }
+
+
+def _get_own(layout):
+    """
+    Returns the own content of a layout: its items other than pages, filters and bookmarks
+    :param layout: a Power BI layout
+    :return: a dictionary
+    """
+    res = {key: value for key, value in layout.items() if key not in ('sections', 'filters', 'config')}
+    res['config'] = {key: value for key, value in layout['config'].items() if key != 'bookmarks'}
+    return res
+
+
+class PbiMerkleTree:
+    """
+    The hashes of all page, container, filter and bookmark subtrees of a layout, computed bottom-up.
+    A tree can be reused to diff the same layout against several others.
+    """
+
+    def __init__(self, layout):
+        """
+        Computes the hashes of the given layout
+        :param layout: a Power BI layout
+        """
+        self.layout = layout
+        self.own = _hash_object(_get_own(layout))
+        self.filters = {name: _hash_object(flt) for name, flt in _get_filters(layout).items()}
+        self.bookmarks = {name: _hash_object(bookmark) for name, bookmark in _get_bookmarks(layout).items()}
+        self.pages = {}
+        self.containers = {}
+        self.page_filters = {}
+        self.container_pages = {}
+        self._pages = {}
+        self._containers = {}
+        for page in layout['sections']:
+            self._pages[page.name] = page
+            containers = {}
+            for container in page['visualContainers']:
+                containers[container.name] = _hash_object(container)
+                self.container_pages.setdefault(container.name, []).append(page.name)
+                self._containers[page.name, container.name] = container
+            self.containers[page.name] = containers
+            self.page_filters[page.name] = {name: _hash_object(flt) for name, flt in _get_filters(page).items()}
+            own = {key: value for key, value in page.items() if key not in ('visualContainers', 'filters')}
+            self.pages[page.name] = _hash(
+                _hash_object(own),
+                *sorted(containers.values()),
+                *sorted(self.page_filters[page.name].values())
+            )
+        self.root = _hash(
+            self.own,
+            *self.pages.values(),
+            *sorted(self.filters.values()),
+            *sorted(self.bookmarks.values())
+        )
+
+    def get_page(self, name):
+        """
+        Returns the page of given (internal) name
+        :param name: a string
+        :return: a Power BI page
+        """
+        return self._pages[name]
+
+    def get_container(self, page_name, name):
+        """
+        Returns the container of given name on the page of given (internal) name
+        :param page_name: a string
+        :param name: a string
+        :return: a Power BI container
+        """
+        return self._containers[page_name, name]
+
+    def has_container(self, page_name, name):
+        """
+        Returns whether the page of given (internal) name has a container of given name
+        :param page_name: a string
+        :param name: a string
+        :return: a boolean
+        """
+        return name in self.containers.get(page_name, {})
+
+
+def _diff_hashes(kind, old_hashes, new_hashes, old_objects, new_objects, prefix):
+    """
+    Returns the changes between two sets of hashed objects (filters or bookmarks)
+    :return: a list of Power BI changes
+    """
+    res = []
+    for name, old_hash in old_hashes.items():
+        if name not in new_hashes:
+            res.append(PbiChange(kind, 'removed', prefix + (name,)))
+        elif new_hashes[name] != old_hash:
+            res.append(PbiChange(
+                kind, 'modified', prefix + (name,),
+                key_paths=get_key_paths(old_objects[name], new_objects[name])
+            ))
+    res += [PbiChange(kind, 'added', prefix + (name,)) for name in new_hashes if name not in old_hashes]
+    return res
+
+
+def _get_moves(old_tree, new_tree):
+    """
+    Returns the containers moved to another page: a container that left a page and arrived on another one under the
+    same name
+    :return: a dictionary {(new page name, container name): old page name}
+    """
+    res = {}
+    for name, old_pages in old_tree.container_pages.items():
+        left = [page_name for page_name in old_pages if not new_tree.has_container(page_name, name)]
+        arrived = [
+            page_name for page_name in new_tree.container_pages.get(name, [])
+            if not old_tree.has_container(page_name, name)
+        ]
+        for old_page_name, new_page_name in zip(left, arrived):
+            res[new_page_name, name] = old_page_name
+    return res
+
+
+def diff_layouts(old, new):
+    """
+    Returns the structural differences between two layouts. Subtrees with identical hashes are skipped at once.
+    Key paths use page display names and container, filter and bookmark names.
+    :param old: a Power BI layout or a Power BI Merkle tree
+    :param new: a Power BI layout or a Power BI Merkle tree
+    :return: a list of Power BI changes
+    """
+    old_tree = old if isinstance(old, PbiMerkleTree) else PbiMerkleTree(old)
+    new_tree = new if isinstance(new, PbiMerkleTree) else PbiMerkleTree(new)
+    if old_tree.root == new_tree.root:
+        return []
+    res = []
+
+    if old_tree.own != new_tree.own:
+        res.append(PbiChange(
+            'layout', 'modified', (), key_paths=get_key_paths(_get_own(old_tree.layout), _get_own(new_tree.layout))
+        ))
+    res += _diff_hashes(
+        'filter', old_tree.filters, new_tree.filters,
+        _get_filters(old_tree.layout), _get_filters(new_tree.layout), ('filters',)
+    )
+    if old_tree.bookmarks != new_tree.bookmarks:
+        res += _diff_hashes(
+            'bookmark', old_tree.bookmarks, new_tree.bookmarks,
+            _get_bookmarks(old_tree.layout), _get_bookmarks(new_tree.layout), ('bookmarks',)
+        )
+
+    moves = _get_moves(old_tree, new_tree)
+    for name in old_tree.pages:
+        if name not in new_tree.pages:
+            res.append(PbiChange('page', 'removed', ('sections', old_tree.get_page(name).display_name)))
+    for name, page_hash in new_tree.pages.items():
+        new_page = new_tree.get_page(name)
+        path = ('sections', new_page.display_name)
+        if name not in old_tree.pages:
+            res.append(PbiChange('page', 'added', path))
+            res += _diff_containers(old_tree, new_tree, name, path, moves)
+            continue
+        if old_tree.pages[name] == page_hash:
+            continue
+        old_page = old_tree.get_page(name)
+        own_key_paths = get_key_paths(
+            {key: value for key, value in old_page.items() if key not in ('visualContainers', 'filters')},
+            {key: value for key, value in new_page.items() if key not in ('visualContainers', 'filters')}
+        )
+        if own_key_paths:
+            res.append(PbiChange('page', 'modified', path, key_paths=own_key_paths))
+        res += _diff_hashes(
+            'filter', old_tree.page_filters[name], new_tree.page_filters[name],
+            _get_filters(old_page), _get_filters(new_page), path + ('filters',)
+        )
+        res += _diff_containers(old_tree, new_tree, name, path, moves)
+
+    moved = {(old_page_name, name) for (_, name), old_page_name in moves.items()}
+    for name, old_pages in old_tree.container_pages.items():
+        for page_name in old_pages:
+            if not new_tree.has_container(page_name, name) and (page_name, name) not in moved:
+                old_path = ('sections', old_tree.get_page(page_name).display_name, 'visualContainers', name)
+                res.append(PbiChange('visual', 'removed', old_path))
+    return res
+
+
+def _diff_containers(old_tree, new_tree, page_name, path, moves):
+    """
+    Returns the changes of the containers of a page of the new layout
+    :return: a list of Power BI changes
+    """
+    res = []
+    old_hashes = old_tree.containers.get(page_name, {})
+    for container_name, container_hash in new_tree.containers[page_name].items():
+        if old_hashes.get(container_name) == container_hash:
+            continue
+        container_path = path + ('visualContainers', container_name)
+        new_container = new_tree.get_container(page_name, container_name)
+        if container_name not in old_hashes:
+            old_page_name = moves.get((page_name, container_name))
+            if old_page_name is None:
+                res.append(PbiChange('visual', 'added', container_path))
+                continue
+            old_path = ('sections', old_tree.get_page(old_page_name).display_name, 'visualContainers', container_name)
+            key_paths = get_key_paths(old_tree.get_container(old_page_name, container_name), new_container)
+            res.append(PbiChange('visual', 'moved', container_path, old_path=old_path, key_paths=key_paths))
+            continue
+        old_container = old_tree.get_container(page_name, container_name)
+        key_paths = get_key_paths(old_container, new_container)
+        if _without_position(old_container) == _without_position(new_container):
+            res.append(PbiChange('visual', 'repositioned', container_path, key_paths=key_paths))
+        else:
+            res.append(PbiChange('visual', 'modified', container_path, key_paths=key_paths))
+    return res
@@ -1,7 +1,7 @@
 import copy
 import json
 
-from pbi.object import _PbiObject
+from pbi.object import _PbiObject, _set_owner, mutates
 
 
 class PbiFilter(dict, _PbiObject):
@@ -22,6 +22,33 @@ class PbiFilter(dict, _PbiObject):
         """
         return PbiFilter(copy.deepcopy(self))
 
+    @property
+    def entity(self):
+        """
+        Returns the table (entity) the filter applies to
+        :return: a string or None
+        """
+        for kind in self.get('expression', {}).values():
+            try:
+                return kind['Expression']['SourceRef']['Entity']
+            except (KeyError, TypeError):
+                pass
+        return None
+
+    @property
+    def property_name(self):
+        """
+        Returns the column or measure (property) the filter applies to
+        :return: a string or None
+        """
+        for kind in self.get('expression', {}).values():
+            try:
+                return kind['Property']
+            except (KeyError, TypeError):
+                pass
+        return None
+
+    @mutates
     def update_name(self, new_name):
         """
         Updates the name of the current Power BI Filter
@@ -30,20 +57,78 @@ class PbiFilter(dict, _PbiObject):
         """
         self['name'] = new_name
 
+    @staticmethod
+    def _get_literal(value):
+        """
+        Returns the Power BI literal corresponding to a value
+        :param value: a string, an integer, a float or a boolean
+        :return: a dictionary
+        """
+        if isinstance(value, bool):
+            literal = str(value).lower()
+        elif isinstance(value, int):
+            literal = f'{value}L'
+        elif isinstance(value, float):
+            literal = f'{value}D'
+        else:
+            literal = "'" + str(value).replace("'", "''") + "'"
+        return {'Literal': {'Value': literal}}
+
+    def _get_new_condition_filter(self):
+        """
+        Returns a new filter definition with an empty 'In' condition on the filter expression, only for filters on a
+        column ('In' conditions are not valid on measures, aggregations or hierarchy levels)
+        :return: a dictionary or None if the filter is not on a column
+        """
+        if list(self.get('expression', {})) != ['Column'] or not self.entity or not self.property_name:
+            return None
+        alias = self.entity[0].lower()
+        return {
+            'Version': 2,
+            'From': [{'Name': alias, 'Entity': self.entity, 'Type': 0}],
+            'Where': [{'Condition': {'In': {
+                'Expressions': [{'Column': {
+                    'Expression': {'SourceRef': {'Source': alias}}, 'Property': self.property_name
+                }}],
+                'Values': []
+            }}}]
+        }
+
+    @mutates
     def update_value(self, value):
         """
-        Updates the value of the filter
-        :param value: a string
-        :return: None
+        Updates the value(s) of the filter
+        :param value: a string, or a list of strings (or numbers) for a multi-value filter
+        :return: a boolean whether the update actually happened
         """
-        corrected_value = value.replace("'", "''")
-        try:
-            self['filter']['Where'][0]['Condition']['In']['Values'][0][0]['Literal']['Value'] = f"'{corrected_value}'"
-        except KeyError:
-            try:
-                self['filter']['Where'][0]['Condition']['Comparison']['Right']['Literal']['Value'] = f"'{corrected_value}'"
-            except KeyError:
+        values = value if isinstance(value, list) else [value]
+        if 'filter' not in self:
+            new_filter = self._get_new_condition_filter()
+            if new_filter is None:
                 print(f'Unable to update filter to {value}.')
+                return False
+            self['filter'] = new_filter
+        try:
+            condition = self['filter']['Where'][0]['Condition']
+        except (KeyError, IndexError):
+            print(f'Unable to update filter to {value}.')
+            return False
+        if 'In' in condition:
+            condition['In']['Values'] = [[self._get_literal(item)] for item in values]
+        elif 'Comparison' in condition and len(values) == 1:
+            condition['Comparison']['Right'] = self._get_literal(values[0])
+        else:
+            print(f'Unable to update filter to {value}.')
+            return False
+        return True
+
+    @mutates
+    def clear_value(self):
+        """
+        Clears the value(s) of the filter (the filter remains available but does not filter anything)
+        :return: a boolean whether the update actually happened
+        """
+        return self.pop('filter', None) is not None
 
     def export(self):
         """
@@ -67,16 +152,16 @@ class PbiFilters(list):
             res[i] = PbiFilter(res[i])
         return res
 
-    def get_filters(self, filter_name):
+    def get_filters(self, filter_name, entity=None):
         """
-        Returns the filter with the name given
+        Returns the filters on the column or measure with the name given
         :param filter_name: a string
+        :param entity: a table name or None
         :return: a list of Power Bi Filter Object
         """
         return [
             filter for filter in self
-            if 'Column' not in filter['expression']
-            or filter['expression']['Column']['Property'] == filter_name
+            if filter.property_name == filter_name and (entity is None or filter.entity == entity)
         ]
 
     def export(self):
@@ -111,24 +196,26 @@ class _PbiFilterObject(_PbiObject):
         """
         return self['filters'].export()
 
-    def get_filters(self, filter_name):
+    def get_filters(self, filter_name, entity=None):
         """
-        Returns the filter with the name given
+        Returns the filters on the column or measure with the name given
         :param filter_name: a string
+        :param entity: a table name or None
         :return: a list of Power Bi Filter Object
         """
-        return self['filters'].get_filters(filter_name)
+        return self['filters'].get_filters(filter_name, entity)
 
-    def update_filter(self, filter_name, value):
+    def update_filter(self, filter_name, value, entity=None):
         """
-        Updates a filter to a new value
+        Updates the filters on the column or measure with the name given to a new value
         :param filter_name: a string
-        :param value: a string
-        :return: None
+        :param value: a string or a list of strings
+        :param entity: a table name or None
+        :return: the number of updates
         """
-        filter = self.get_filters(filter_name)
-        filter.update_value(value)
+        return sum(filter.update_value(value) for filter in self.get_filters(filter_name, entity))
 
+    @mutates
     def add_filters(self, filters):
         """
         Adds the given filters to the page.
@@ -138,4 +225,104 @@ class _PbiFilterObject(_PbiObject):
         new_list = [filter.copy() for filter in filters]
         for filter in new_list:
             filter.update_name(self._generate_name())
+            _set_owner(filter, self.__dict__.get('_owner'))
         self['filters'] = PbiFilters(self['filters'] + new_list)
+
+
+class PbiFilterIndex:
+    """
+    An index of the filters of a layout by table (entity), column or measure (property) and level.
+    """
+    levels = ['report', 'page', 'visual']
+
+    def __init__(self, layout):
+        """
+        Indexes the filters of the given layout at report, page and visual level
+        :param layout: a Power BI layout
+        """
+        self.entries = {}
+        self._add(layout.get('filters', []), 'report')
+        for page in layout['sections']:
+            self._add(page.get('filters', []), 'page', page)
+            for container in page['visualContainers']:
+                self._add(container.get('filters', []), 'visual', page, container)
+
+    def _add(self, filters, level, page=None, container=None):
+        """
+        Adds filters to the index
+        :param filters: a list of Power BI filters
+        :param level: 'report', 'page' or 'visual'
+        :param page: the Power BI page of the filters or None
+        :param container: the Power BI container of the filters or None
+        :return: None
+        """
+        for filter in filters:
+            self.entries.setdefault((filter.entity, filter.property_name), []).append(
+                (level, page, container, filter)
+            )
+
+    def get_entries(self, entity=None, property_name=None, level=None):
+        """
+        Returns the index entries matching the given table, column or measure and level
+        :param entity: a table name or None
+        :param property_name: a column or measure name or None
+        :param level: 'report', 'page', 'visual', a list of these or None
+        :return: a list of (level, page, container, filter) tuples
+        """
+        if isinstance(level, str):
+            level = [level]
+        if entity is not None and property_name is not None:
+            candidates = self.entries.get((entity, property_name), [])
+        else:
+            candidates = [
+                entry for (entry_entity, entry_property), entries in self.entries.items()
+                if (entity is None or entry_entity == entity)
+                and (property_name is None or entry_property == property_name)
+                for entry in entries
+            ]
+        return [entry for entry in candidates if level is None or entry[0] in level]
+
+    def get_filters(self, entity=None, property_name=None, level=None):
+        """
+        Returns the filters matching the given table, column or measure and level
+        :param entity: a table name or None
+        :param property_name: a column or measure name or None
+        :param level: 'report', 'page', 'visual', a list of these or None
+        :return: a list of Power BI filters
+        """
+        return [entry[3] for entry in self.get_entries(entity, property_name, level)]
+
+    def update_values(self, entity, property_name, value, level=None):
+        """
+        Sets the value(s) of all the matching filters
+        :param entity: a table name
+        :param property_name: a column or measure name
+        :param value: a string or a list of strings (None to clear the filters)
+        :param level: 'report', 'page', 'visual', a list of these or None
+        :return: the number of updates
+        """
+        if value is None:
+            return self.clear_values(entity, property_name, level)
+        return sum(filter.update_value(value) for filter in self.get_filters(entity, property_name, level))
+
+    def clear_values(self, entity, property_name, level=None):
+        """
+        Clears the value(s) of all the matching filters
+        :param entity: a table name
+        :param property_name: a column or measure name
+        :param level: 'report', 'page', 'visual', a list of these or None
+        :return: the number of updates
+        """
+        return sum(filter.clear_value() for filter in self.get_filters(entity, property_name, level))
+
+    def apply(self, updates, level=None):
+        """
+        Applies several filter updates at once
+        :param updates: a dictionary {(table, column): value(s) or None to clear}
+        :param level: 'report', 'page', 'visual', a list of these or None
+        :return: a dictionary with the number of updates per (table, column)
+        """
+        return {
+            field: self.update_values(*field, value, level=level)
+            for field, value in updates.items()
+        }
@@ -0,0 +1,169 @@
+import io
+import os
+
+from pbi.archive import read_member
+from pbi.resources import get_resource_member_name
+from pbi.trace import traced, tracer
+
+IMAGE_FORMATS = {'PNG', 'JPEG'}
+# the JPEG quality of downsampled images when no quality is given
+DOWNSAMPLE_QUALITY = 90
+
+
+def _import_pillow():
+    """
+    Imports Pillow (optional dependency, only needed to optimize images)
+    :return: the PIL.Image module
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError('Pillow is required to optimize images: pip install python-pbi[images]')
+    return Image
+
+
+def _get_item_names(obj):
+    """
+    Returns the names of the resource package items referenced within a json-like object
+    :param obj: a json-like object
+    :return: a set of strings
+    """
+    res = set()
+    if isinstance(obj, dict):
+        if 'ResourcePackageItem' in obj and isinstance(obj['ResourcePackageItem'], dict):
+            res.add(obj['ResourcePackageItem'].get('ItemName'))
+        for value in obj.values():
+            res |= _get_item_names(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            res |= _get_item_names(value)
+    return res
+
+
+def get_display_sizes(layout):
+    """
+    Returns the largest size at which each resource package item is displayed (in visuals or as page backgrounds)
+    :param layout: a Power BI layout
+    :return: a dictionary {item name: (width, height)}
+    """
+    res = {}
+
+    def update(names, width, height):
+        for name in names:
+            current_width, current_height = res.get(name, (0, 0))
+            res[name] = max(current_width, width), max(current_height, height)
+
+    for page in layout['sections']:
+        update(_get_item_names(page['config']), page.get('width', 0), page.get('height', 0))
+        for container in page['visualContainers']:
+            update(_get_item_names(container['config']), container.get('width', 0), container.get('height', 0))
+    return res
+
+
+def optimize_image(data, quality=None, max_size=None):
+    """
+    Recompresses a PNG or JPEG image, losslessly by default: PNG are optimized (with a palette only if the conversion
+    is exact) and JPEG are left as they are, as Pillow cannot re-encode them without loss. EXIF data (e.g. the
+    orientation) and ICC color profiles are kept.
+    :param data: the image content (bytes)
+    :param quality: a JPEG quality (1-95) to recompress lossily (PNG are then reduced to 256 colors), or None
+    :param max_size: a (width, height) tuple to downsample the image to (keeping its aspect ratio), or None. Downsampled
+    JPEG are saved with the given quality, or DOWNSAMPLE_QUALITY if None.
+    :return: the optimized image content (bytes), or the original one if it cannot be made smaller
+    """
+    Image = _import_pillow()
+    try:
+        image = Image.open(io.BytesIO(data))
+        image_format = image.format
+        image.load()
+    except (OSError, SyntaxError):
+        return data
+    if image_format not in IMAGE_FORMATS or getattr(image, 'is_animated', False):
+        return data
+    resized = max_size is not None and (image.width > max_size[0] or image.height > max_size[1])
+    if image_format == 'JPEG' and quality is None and not resized:
+        return data
+    metadata = {key: image.info[key] for key in ('exif', 'icc_profile') if image.info.get(key)}
+    if resized:
+        image.thumbnail((max(int(max_size[0]), 1), max(int(max_size[1]), 1)), Image.LANCZOS)
+    output = io.BytesIO()
+    if image_format == 'JPEG':
+        if image.mode not in ('RGB', 'L', 'CMYK'):
+            image = image.convert('RGB')
+        image.save(
+            output, 'JPEG', optimize=True, progressive=True,
+            quality=DOWNSAMPLE_QUALITY if quality is None else quality, **metadata
+        )
+    else:
+        if image.mode in ('RGB', 'RGBA'):
+            method = Image.Quantize.FASTOCTREE if image.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+            palette_image = image.quantize(colors=256, method=method)
+            if quality is not None or palette_image.convert(image.mode).tobytes() == image.tobytes():
+                image = palette_image
+        image.save(output, 'PNG', optimize=True, **metadata)
+    res = output.getvalue()
+    return res if len(res) < len(data) else data
+
+
+@traced('images.optimize')
+def optimize_report_images(report, quality=None, downsample=False, scale=2, package_name='RegisteredResources'):
+    """
+    Recompresses the images registered in a report resource package, and writes the report once (or stages the
+    changes if an edit session is open on the report)
+    :param report: a Power BI report
+    :param quality: a JPEG quality (1-95) to recompress lossily, or None for lossless recompression only (JPEG are
+    then left as they are, unless downsampled)
+    :param downsample: a boolean, True to downsample images to the largest size any visual displays them at (JPEG are
+    then saved with the given quality, or DOWNSAMPLE_QUALITY)
+    :param scale: the factor applied to the display size when downsampling (e.g. 2 for high-resolution screens)
+    :param package_name: the resource package name
+    :return: a dictionary {item name: (original size, new size)} with all the items that were made smaller
+    """
+    display_sizes = get_display_sizes(report.layout) if downsample else {}
+    res = {}
+    files = {}
+    for item in report.layout.get_resource_package(package_name)['items']:
+        member_name = get_resource_member_name(package_name, item)
+        if report._session is not None:
+            data = report._session.read_file(member_name)
+        else:
+            data = read_member(report.path, member_name)
+        if data is None:
+            continue
+        max_size = None
+        if item['name'] in display_sizes and all(display_sizes[item['name']]):
+            max_size = tuple(size * scale for size in display_sizes[item['name']])
+        new_data = optimize_image(data, quality, max_size)
+        if len(new_data) < len(data):
+            files[member_name] = new_data
+            res[item['name']] = (len(data), len(new_data))
+    if files:
+        if report._session is not None:
+            for member_name, data in files.items():
+                report._session.write_file(member_name, data)
+        else:
+            with report.edit() as session:
+                for member_name, data in files.items():
+                    session.write_file(member_name, data)
+    tracer.count('image_bytes_saved', sum(old - new for old, new in res.values()))
+    return res
+
+
+def optimize_folder_images(folder, report_class=None, **kwargs):
+    """
+    Recompresses the images of all the reports of a folder
+    :param folder: a path to a local folder
+    :param report_class: the report class used to open the reports (default is PbiReport)
+    :param kwargs: keywords passed to optimize_report_images
+    :return: a dictionary {report name: bytes saved}
+    """
+    if report_class is None:
+        from pbi.report import PbiReport
+        report_class = PbiReport
+    res = {}
+    for file in sorted(os.listdir(folder)):
+        filename, ext = os.path.splitext(file)
+        if ext == f'.{report_class.ext}':
+            items = optimize_report_images(report_class(folder, filename), **kwargs)
+            res[filename] = sum(old - new for old, new in items.values())
+    return res
@@ -1,16 +1,56 @@
 import copy
+import copyreg
+import io
 import json
+import pickle
+import zlib
 
 from pbi.bookmark import Bookmark
+from pbi.checkpoint import PbiCheckpoint
+from pbi.cleanup import find_garbage, get_garbage_size, remove_garbage, summarize_garbage
 from pbi.config import _PbiConfigObject
+from pbi.diff import diff_layouts
 from pbi.filter import _PbiFilterObject
+from pbi.object import _PbiOwner, _set_owner, mutates
 from pbi.page import PbiPage
+from pbi.trace import traced, tracer
 
 
 class PbiLayout(dict, _PbiFilterObject, _PbiConfigObject):
     """
     The Power BI Layout class.
     """
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the layout compactly (e.g. to send it to a worker process): its object tree, compressed
+        :param protocol: the pickle protocol
+        :return: a tuple
+        """
+        return _loads_tree, (zlib.compress(dump_tree(self), 1),)
+
+    def __copy__(self):
+        """
+        Returns a shallow copy of the layout (pages, config and filters are shared)
+        :return: a Power BI layout
+        """
+        res = _make_layout(self)
+        res.__dict__.update(self.__dict__)
+        return res
+
+    def __deepcopy__(self, memo):
+        """
+        Returns a deep copy of the layout (not through its compact pickled form)
+        :param memo: the memo dictionary of copy.deepcopy
+        :return: a Power BI layout
+        """
+        res = PbiLayout.__new__(PbiLayout)
+        memo[id(self)] = res
+        for key, value in self.items():
+            dict.__setitem__(res, key, copy.deepcopy(value, memo))
+        res.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return res
+
+    @traced('layout.parse')
     def __init__(self, strg):
         """
         Creates a PbiLayout object with all appropriate json strings converted as dictionaries or similar objects
@@ -26,6 +66,11 @@ class PbiLayout(dict, _PbiFilterObject, _PbiConfigObject):
 Warning: no bookmarks found in layout. Ignoring.
 """)
         self._update_layout_objects()
+        self._attach(self)
+        if tracer.enabled:
+            tracer.count('chars_decoded', len(strg))
+            tracer.count('pages_decoded', len(self['sections']))
+            tracer.count('containers_decoded', sum(len(page['visualContainers']) for page in self['sections']))
 
     @property
     def pages(self):
@@ -55,6 +100,42 @@ Warning: no bookmarks found in layout. Ignoring.
             res = res.union(page.get_used_bookmark_names())
         return res
 
+    @traced('layout.prune_bookmarks')
+    @mutates
+    def prune_bookmarks(self):
+        """
+        Removes the bookmark state (exploration state, target visuals) of the pages and visuals that no longer exist
+        :return: the number of bytes removed from the layout
+        """
+        if 'bookmarks' not in self['config']:
+            return 0
+        section_visuals = {
+            page.name: {container.name for container in page['visualContainers']}
+            for page in self['sections']
+        }
+        size = len(json.dumps(json.dumps(self['config']['bookmarks'])))
+        if not sum(bookmark.prune(section_visuals) for bookmark in self['config']['bookmarks']):
+            return 0
+        return 2 * (size - len(json.dumps(json.dumps(self['config']['bookmarks']))))
+
+    @traced('layout.collect_garbage')
+    def collect_garbage(self, dry_run=True):
+        """
+        Finds (and removes unless dry_run) the dead objects of the layout: hidden visuals no bookmark can show again,
+        empty groups, unused filters and unreferenced resource package items. Visuals whose parent group no longer
+        exists are detached from it.
+        :param dry_run: a boolean, True to only report the dead objects
+        :return: a dictionary {category: list of object names} with the approximate number of bytes freed ('bytes')
+        """
+        garbage = find_garbage(self)
+        res = summarize_garbage(garbage)
+        if dry_run:
+            res['bytes'] = get_garbage_size(garbage)
+        else:
+            res['bytes'] = remove_garbage(self, garbage)
+            self.prune_bookmarks()
+        return res
+
     def _update_layout_objects(self):
         """
         Updates layout strings into lists or dictionaries
@@ -63,6 +144,7 @@ Warning: no bookmarks found in layout. Ignoring.
         for i, section in enumerate(self['sections']):
             self['sections'][i] = PbiPage(section)
 
+    @mutates
     def replace(self, target, replacement):
         """
         Replace a string by another in all the layout.
@@ -91,6 +173,28 @@ Warning: no bookmarks found in layout. Ignoring.
             return None
         return page_list[0]
 
+    @traced('layout.add_visuals')
+    @mutates
+    def add_visuals(self, visual_lst, pages=None):
+        """
+        Adds the given visuals to many pages at once (the visuals are cloned structurally for each page)
+        :param visual_lst: a list of Power BI containers or a Power BI container
+        :param pages: a list of page names or None (all pages)
+        :return: a dictionary {page name: list of added visuals (with updated names)}
+        """
+        if type(visual_lst) != list:
+            visual_lst = [visual_lst]
+        if pages is None:
+            pages = self['sections']
+        else:
+            pages = [page for page in (self.get_page(name) for name in pages) if page is not None]
+        res = {}
+        for page in pages:
+            page._notify_write()
+            res[page.display_name] = page._add_copies(visual_lst, [visual.copy() for visual in visual_lst])
+        tracer.count('containers_added', len(visual_lst) * len(pages))
+        return res
+
     def get_resource_package(self, name):
         """
         Returns the layout resource package of given name
@@ -105,6 +209,7 @@ Warning: no bookmarks found in layout. Ignoring.
         assert len(res_lst) == 1
         return res_lst[0]
 
+    @mutates
     def add_resource_packages(self, name, resource_package_item):
         """
         Adds a resource package item to the layout resource packages of given name
@@ -114,21 +219,102 @@ Warning: no bookmarks found in layout. Ignoring.
         """
         self.get_resource_package(name)['items'].append(resource_package_item)
 
+    def _get_owner(self):
+        """
+        Returns the owner token the layout tags its objects with (tagging them all if the layout has none yet)
+        :return: an owner token
+        """
+        if self.__dict__.get('_owner') is None:
+            self._attach(self)
+        return self._owner
+
+    def _attach(self, obj):
+        """
+        Tags a Power BI object (e.g. a page or bookmark taken from another layout) and the objects it holds as held by
+        the layout, so that the checkpoints of the layout track them
+        :param obj: a Power BI object
+        :return: None
+        """
+        if self.__dict__.get('_owner') is None:
+            self._owner = _PbiOwner()
+            if obj is not self:
+                _set_owner(self, self._owner)
+        _set_owner(obj, self._owner)
+
+    def checkpoint(self):
+        """
+        Returns an in-memory checkpoint of the layout, to roll back speculative edits (can be used as a context manager
+        that rolls back if an exception is raised). Unchanged pages and containers are shared, not copied.
+        :return: a Power BI checkpoint
+        """
+        return PbiCheckpoint(self)
+
+    def diff(self, layout):
+        """
+        Returns the structural changes from the current layout to the given one
+        :param layout: a Power BI layout
+        :return: a list of Power BI changes
+        """
+        return diff_layouts(self, layout)
+
+    @traced('layout.export')
     def export(self):
         """
         Converts appropriate dictionaries back to json strings
         :return: a json string
         """
-        layout = copy.deepcopy(self)
+        layout = dict(self)  # the items that are not replaced below are only read
         try:
             layout['filters'] = self.export_filters()
         except KeyError:
             pass
         layout['config'] = self.export_config()
-        try:
-            self['config']['bookmarks'] = [dict(bookmark) for bookmark in self['config']['bookmarks']]
-        except KeyError:
-            pass
-        for i, section in enumerate(self['sections']):
-            layout['sections'][i] = section.export()
-        return json.dumps(layout)
+        layout['sections'] = [section.export() for section in self['sections']]
+        res = json.dumps(layout)
+        tracer.count('chars_encoded', len(res))
+        return res
+
+
+def _make_layout(items, owner=None):
+    """
+    Creates a layout from its already parsed items (without any json round trip)
+    :param items: a dictionary
+    :param owner: the owner token its objects are tagged with, or None
+    :return: a Power BI layout
+    """
+    layout = PbiLayout.__new__(PbiLayout)
+    dict.update(layout, items)
+    layout._owner = owner
+    return layout
+
+
+def _reduce_tree(layout):
+    """
+    Reduces a layout to its whole object tree (instead of its compact form)
+    :param layout: a Power BI layout
+    :return: a tuple
+    """
+    return _make_layout, (dict(layout), layout.__dict__.get('_owner'))
+
+
+def _loads_tree(data):
+    """
+    Creates a layout from its compact form
+    :param data: a compressed layout object tree (bytes)
+    :return: a Power BI layout
+    """
+    return pickle.loads(zlib.decompress(data))
+
+
+def dump_tree(layout):
+    """
+    Pickles the whole object tree of a layout (uncompressed, the fastest to load back with pickle.loads)
+    :param layout: a Power BI layout
+    :return: bytes
+    """
+    output = io.BytesIO()
+    pickler = pickle.Pickler(output, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[PbiLayout] = _reduce_tree
+    pickler.dump(layout)
+    return output.getvalue()
@@ -0,0 +1,248 @@
+import os
+
+from pbi.archive import read_layout_str
+from pbi.layout import PbiLayout
+
+FIELD_KINDS = {
+    'Column': 'column',
+    'Measure': 'measure',
+    'HierarchyLevel': 'hierarchy'
+}
+
+
+class PbiFieldReference:
+    """
+    A reference to a table column, measure or hierarchy level in a report.
+    """
+
+    def __init__(self, entity, property_name, kind, report, level, page_name=None, visual_name=None, source=None,
+                 filter_name=None):
+        """
+        Creates a field reference
+        :param entity: the table name
+        :param property_name: the column, measure or hierarchy level name ('Hierarchy.Level' for hierarchies)
+        :param kind: 'column', 'measure' or 'hierarchy'
+        :param report: the report name
+        :param level: 'report', 'page' or 'visual'
+        :param page_name: the (internal) name of the page or None
+        :param visual_name: the name of the visual or None
+        :param source: where the reference was found ('query', 'dataTransforms', 'config' or 'filter')
+        :param filter_name: the name of the filter or None
+        """
+        self.entity = entity
+        self.property_name = property_name
+        self.kind = kind
+        self.report = report
+        self.level = level
+        self.page_name = page_name
+        self.visual_name = visual_name
+        self.source = source
+        self.filter_name = filter_name
+
+    @property
+    def field(self):
+        """
+        Returns the field as a (table, column) tuple
+        :return: a tuple
+        """
+        return self.entity, self.property_name
+
+    @property
+    def location(self):
+        """
+        Returns the location of the reference
+        :return: a tuple
+        """
+        return self.report, self.level, self.page_name, self.visual_name, self.source, self.filter_name
+
+    def __repr__(self):
+        return f'PbiFieldReference({self.entity}.{self.property_name} ({self.kind}) in {self.location})'
+
+    def to_dict(self):
+        """
+        Returns the reference as a dictionary
+        :return: a dictionary
+        """
+        return dict(vars(self))
+
+
+def _get_entity(expression, aliases):
+    """
+    Returns the table referred to by a field expression
+    :param expression: the 'Expression' of a column or measure
+    :param aliases: a dictionary of query aliases with their table names
+    :return: a string or None
+    """
+    try:
+        source_ref = expression['SourceRef']
+    except (KeyError, TypeError):
+        return None
+    if 'Entity' in source_ref:
+        return source_ref['Entity']
+    return aliases.get(source_ref.get('Source'))
+
+
+def get_field_references(obj, aliases=None):
+    """
+    Returns all the fields referenced within a json-like object (query, data transforms, filter, etc.)
+    :param obj: a json-like object
+    :param aliases: a dictionary of query aliases with their table names or None
+    :return: a list of (entity, property, kind) tuples
+    """
+    if aliases is None:
+        aliases = {}
+    res = []
+    if isinstance(obj, list):
+        for item in obj:
+            res += get_field_references(item, aliases)
+        return res
+    if not isinstance(obj, dict):
+        return res
+    if isinstance(obj.get('From'), list):
+        aliases = dict(aliases)
+        aliases.update({
+            source['Name']: source['Entity'] for source in obj['From']
+            if isinstance(source, dict) and 'Name' in source and 'Entity' in source
+        })
+    for key, value in obj.items():
+        if key in FIELD_KINDS and isinstance(value, dict):
+            if key == 'HierarchyLevel':
+                try:
+                    hierarchy = value['Expression']['Hierarchy']
+                    entity = _get_entity(hierarchy['Expression'], aliases)
+                    property_name = f"{hierarchy['Hierarchy']}.{value['Level']}"
+                except (KeyError, TypeError):
+                    entity, property_name = None, None
+            else:
+                entity = _get_entity(value.get('Expression'), aliases)
+                property_name = value.get('Property')
+            if entity is not None and property_name is not None:
+                res.append((entity, property_name, FIELD_KINDS[key]))
+                continue
+        res += get_field_references(value, aliases)
+    return res
+
+
+class PbiLineage:
+    """
+    An index of the fields (table columns, measures, hierarchy levels) used by the visuals and filters of reports.
+    """
+
+    def __init__(self):
+        """
+        Creates an empty lineage index
+        """
+        self.references = {}
+        self._report_fields = {}
+
+    def _add(self, fields, **location):
+        """
+        Adds the given fields found at the given location
+        :param fields: a list of (entity, property, kind) tuples
+        :param location: the location keywords of the references
+        :return: None
+        """
+        report_fields = self._report_fields.setdefault(location['report'], set())
+        for entity, property_name, kind in dict.fromkeys(fields):
+            report_fields.add((entity, property_name))
+            self.references.setdefault((entity, property_name), []).append(
+                PbiFieldReference(entity, property_name, kind, **location)
+            )
+
+    def _add_filters(self, obj, **location):
+        """
+        Adds the fields referenced by the filters of the given object
+        :param obj: a Power BI layout, page or container
+        :param location: the location keywords of the references
+        :return: None
+        """
+        for flt in obj.get('filters', []):
+            fields = get_field_references(flt.get('expression')) + get_field_references(flt.get('filter'))
+            self._add(fields, source='filter', filter_name=flt.get('name'), **location)
+
+    def add_layout(self, layout, report):
+        """
+        Adds all the field references of a layout (in a single pass)
+        :param layout: a Power BI layout
+        :param report: the name of the report
+        :return: None
+        """
+        self.remove_report(report)
+        self._add_filters(layout, report=report, level='report')
+        for page in layout['sections']:
+            self._add_filters(page, report=report, level='page', page_name=page.name)
+            for container in page['visualContainers']:
+                location = {'report': report, 'level': 'visual', 'page_name': page.name, 'visual_name': container.name}
+                for source in ['query', 'dataTransforms', 'config']:
+                    if source in container:
+                        self._add(get_field_references(container[source]), source=source, **location)
+                self._add_filters(container, **location)
+
+    def add_report(self, report):
+        """
+        Adds all the field references of a report
+        :param report: a Power BI report
+        :return: None
+        """
+        self.add_layout(report.layout, report.filename)
+
+    def remove_report(self, report):
+        """
+        Removes all the field references of a report
+        :param report: the name of the report
+        :return: None
+        """
+        for field in self._report_fields.pop(report, set()):
+            self.references[field] = [ref for ref in self.references[field] if ref.report != report]
+            if not self.references[field]:
+                del self.references[field]
+
+    @classmethod
+    def from_folder(cls, folder):
+        """
+        Builds the lineage index of all the reports of a folder (read without extracting the archives)
+        :param folder: a path to a local folder
+        :return: a Power BI lineage index
+        """
+        lineage = cls()
+        for file in sorted(os.listdir(folder)):
+            filename, ext = os.path.splitext(file)
+            if ext == '.pbix':
+                lineage.add_layout(PbiLayout(read_layout_str(os.path.join(folder, file))), filename)
+        return lineage
+
+    @property
+    def fields(self):
+        """
+        Returns all the fields referenced
+        :return: a sorted list of (table, column) tuples
+        """
+        return sorted(self.references)
+
+    def get_references(self, entity, property_name=None):
+        """
+        Returns the references to a table, or to a column / measure of a table
+        :param entity: the table name
+        :param property_name: the column or measure name or None (all the fields of the table)
+        :return: a list of Power BI field references
+        """
+        if property_name is not None:
+            return list(self.references.get((entity, property_name), []))
+        return [ref for field, refs in self.references.items() if field[0] == entity for ref in refs]
+
+    def get_impact(self, fields):
+        """
+        Returns the reports, pages, visuals and filters impacted by a change of the given fields
+        :param fields: a list of tables (strings) or (table, column) tuples
+        :return: a dictionary {report: {page name or None: set of visual or filter names}}
+        """
+        res = {}
+        for field in fields:
+            refs = self.get_references(field) if isinstance(field, str) else self.get_references(*field)
+            for ref in refs:
+                page = res.setdefault(ref.report, {}).setdefault(ref.page_name, set())
+                if ref.visual_name is not None:
+                    page.add(ref.visual_name)
+                elif ref.filter_name is not None:
+                    page.add(ref.filter_name)
+        return res
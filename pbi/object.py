@@ -1,5 +1,113 @@
+import copy
+import functools
 import secrets
 
+# the active observers (e.g. layout checkpoints), notified before a Power BI object is modified in place
+_observers = []
+# the active recorders (e.g. patch recorders), notified of the outermost calls to the methods modifying objects
+_recorders = []
+_calls = []
+
+
+def mutates(method):
+    """
+    Decorates the methods that modify a Power BI object in place, so that the active observers are notified before
+    the object changes, and the active recorders of the call itself (calls made within the method are not recorded)
+    :param method: a method of a Power BI object
+    :return: the decorated method
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _observers:
+            self._notify_write()
+        if not _recorders:
+            return method(self, *args, **kwargs)
+        if not _calls:
+            for recorder in list(_recorders):
+                recorder.on_call(self, method.__name__, args, kwargs)
+        _calls.append(method.__name__)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _calls.pop()
+    return wrapper
+
+
+def _copy_value(value):
+    """
+    Copies a value of a Power BI object: lists of Power BI objects (pages, containers, filters, bookmarks) are copied
+    shallowly, as these objects save their own state when they change; anything else is deep-copied
+    :param value: a json-like object
+    :return: a copy of the value
+    """
+    if isinstance(value, list) and value and isinstance(value[0], _PbiObject):
+        return type(value)(value)
+    if isinstance(value, dict) and any(
+            isinstance(item, list) and item and isinstance(item[0], _PbiObject) for item in value.values()
+    ):
+        res = copy.copy(value)
+        for key, item in value.items():
+            res[key] = _copy_value(item)
+        return res
+    return copy.deepcopy(value)
+
+
+class _PbiOwner:
+    """
+    The token shared by a layout and the Power BI objects it holds (pickled and copied with them), so that the
+    checkpoints of a layout tell its objects from the objects of other layouts without walking it.
+    """
+
+
+def _iter_members(obj):
+    """
+    Yields a Power BI object and the Power BI objects it holds: its filters, pages, containers and bookmarks
+    :param obj: a Power BI layout, page, container, filter or bookmark
+    :return: a generator of Power BI objects
+    """
+    yield obj
+    config = obj.get('config')
+    for items in (obj.get('filters'), obj.get('sections'), obj.get('visualContainers'),
+                  config.get('bookmarks') if isinstance(config, dict) else None):
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, _PbiObject):
+                    yield from _iter_members(item)
+
+
+def _set_owner(obj, owner):
+    """
+    Tags a Power BI object and the Power BI objects it holds with the owner token of a layout
+    :param obj: a Power BI object
+    :param owner: an owner token or None (held by no layout)
+    :return: None
+    """
+    for member in _iter_members(obj):
+        member._owner = owner
+
+
+def _clone(value):
+    """
+    Copies a json-like value structurally, keeping the classes of the Power BI objects it holds (their constructors,
+    which decode json strings, are not called)
+    :param value: a json-like object
+    :return: a copy of the value
+    """
+    if type(value) is dict:
+        return {key: _clone(item) for key, item in value.items()}
+    if type(value) is list:
+        return [_clone(item) for item in value]
+    if isinstance(value, dict):
+        res = type(value).__new__(type(value))
+        dict.update(res, ((key, _clone(item)) for key, item in value.items()))
+    elif isinstance(value, list):
+        res = type(value).__new__(type(value))
+        list.extend(res, (_clone(item) for item in value))
+    else:
+        return value  # strings, numbers, booleans and None are immutable
+    res.__dict__.update(value.__dict__)
+    return res
+
 
 class _PbiObject:
     name_prefix = ''
@@ -10,3 +118,28 @@ class _PbiObject:
         :return: a string
         """
         return self.name_prefix + secrets.token_hex(10)
+
+    def _notify_write(self):
+        """
+        Notifies the active observers (e.g. layout checkpoints) that the object is about to be modified in place.
+        NB: called by all the methods that modify the object; call it before editing its dictionaries directly.
+        :return: None
+        """
+        for observer in _observers:
+            observer.before_write(self)
+
+    def _snapshot(self):
+        """
+        Returns a copy of the object content, to restore it in place later (nested Power BI objects are shared)
+        :return: a dictionary
+        """
+        return {key: _copy_value(value) for key, value in self.items()}
+
+    def _restore(self, state):
+        """
+        Restores in place the object content from a snapshot
+        :param state: a dictionary returned by _snapshot
+        :return: None
+        """
+        self.clear()
+        self.update(state)
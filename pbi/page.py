@@ -4,6 +4,7 @@ import json
 from pbi.config import PbiConfig
 from pbi.container import PbiContainer
 from pbi.filter import _PbiFilterObject
+from pbi.object import _recorders, _set_owner, mutates
 
 
 class PbiPage(dict, _PbiFilterObject):
@@ -40,6 +41,14 @@ class PbiPage(dict, _PbiFilterObject):
         """
         return self['name']
 
+    def get_spatial_index(self):
+        """
+        Returns a spatial index over the bounding boxes of the page visuals
+        :return: a Power BI spatial index
+        """
+        from pbi.spatial import PbiSpatialIndex
+        return PbiSpatialIndex(self)
+
     def export(self):
         """
         Converts appropriate dictionaries to json strings
@@ -88,6 +97,7 @@ class PbiPage(dict, _PbiFilterObject):
             found = self._get_visuals_from_name_set({vis.name for vis in found})
         return found
 
+    @mutates
     def remove_visuals(self, vis_name=None):
         """
         removes the Power BI containers which name include a given string
@@ -103,6 +113,7 @@ class PbiPage(dict, _PbiFilterObject):
             self['visualContainers'] = [container for container in self['visualContainers']
                                         if vis_name not in json.dumps(container)]
 
+    @mutates
     def add_visuals(self, visual_lst=None):
         """
         Adds the given visuals to the page layout.
@@ -113,14 +124,27 @@ class PbiPage(dict, _PbiFilterObject):
             visual_lst = []
         if type(visual_lst) != list:
             visual_lst = [visual_lst]
-        new_list = [visual.copy() for visual in visual_lst]
-        for visual in new_list:
-            visual.reset_name()
-        for i, vis in enumerate(visual_lst):
-            for j, vis2 in enumerate(visual_lst):
-                if vis2.parent_name == vis.name:
-                    new_list[j].update_parent_name(new_list[i].name)
+        return self._add_copies(visual_lst, [visual.copy() for visual in visual_lst])
+
+    def _add_copies(self, visual_lst, new_list):
+        """
+        Adds copies of the given visuals to the page layout, with new names and parent names remapped to the new
+        names of the copied groups (the active recorders are notified of the new names)
+        :param visual_lst: a list of Power BI containers
+        :param new_list: a list of copies of these containers
+        :return: the list of added visuals (with updated names)
+        """
+        names = {}
+        for visual, new_visual in zip(visual_lst, new_list):
+            new_visual.reset_name()
+            names[visual.name] = new_visual.name
+        for new_visual in new_list:
+            if new_visual.parent_name in names:
+                new_visual.update_parent_name(names[new_visual.parent_name])
+            _set_owner(new_visual, self.__dict__.get('_owner'))
         self['visualContainers'] += new_list
+        for recorder in list(_recorders):
+            recorder.on_copies(self, names)
         return new_list
 
     def add_bookmarks(self, report, page_name, bookmark_names):
@@ -140,6 +164,7 @@ class PbiPage(dict, _PbiFilterObject):
             visual_names_in_bookmarks.union(set(bookmark.get_target_visuals()))
         visuals_to_copy = original_page._get_visuals_from_name_set(visual_names_in_bookmarks)
 
+    @mutates
     def replace_visual_by_placeholder(self, visual, placeholder_visual):
         """
         Hides the visual and places a given placeholder visual on top
@@ -168,6 +193,7 @@ class PbiPage(dict, _PbiFilterObject):
         )
         added_visual.update_parent_name(visual.parent_name)
 
+    @mutates
     def update_keep_layer_order(self):
         """
         Updates all single visuals to keep layer order and returns number of updates
@@ -178,6 +204,7 @@ class PbiPage(dict, _PbiFilterObject):
             res += vis.update_keep_layer_order()
         return res
 
+    @mutates
     def update_multiselect(self):
         """
         Updates all multiselect slicers on the page not to allow selection with CTRL key and returns number of updates
@@ -189,6 +216,7 @@ class PbiPage(dict, _PbiFilterObject):
                 res = tuple(map(sum, zip(res, vis.update_multiselect())))
         return res
 
+    @mutates
     def disable_headers(self, types_to_filter=None):
         """
         Disables all headers on the page returns number of updates
@@ -201,6 +229,7 @@ class PbiPage(dict, _PbiFilterObject):
                 res += vis.disable_headers()
         return res
 
+    @mutates
     def add_search(self):
         """
         Add search feature on all slicers on the page and returns number of updates
@@ -212,6 +241,7 @@ class PbiPage(dict, _PbiFilterObject):
                 res += vis.add_search()
         return res
 
+    @mutates
     def remove_visuals_from_mobile(self):
         """
         Removes all the visuals from the mobile screen and returns number of updates
@@ -236,6 +266,7 @@ class PbiPage(dict, _PbiFilterObject):
         res = {name.replace("'", "") for name in res}
         return res
 
+    @mutates
     def replace(self, str, new_str):
         """
         replaces every occurrence of a string with a new string and returns the number of updates
@@ -249,6 +280,7 @@ class PbiPage(dict, _PbiFilterObject):
                 if str in \
                         vis['config']['singleVisual']['objects']['text'][1]['properties']['text']['expr']['Literal'][
                             'Value']:
+                    vis._notify_write()
                     vis['config']['singleVisual']['objects']['text'][1]['properties']['text']['expr']['Literal'][
                         'Value'] = \
                     vis['config']['singleVisual']['objects']['text'][1]['properties']['text']['expr']['Literal'][
@@ -260,6 +292,7 @@ class PbiPage(dict, _PbiFilterObject):
                 if str in \
                         vis['config']['singleVisual']['vcObjects']['title'][0]['properties']['text']['expr']['Literal'][
                             'Value']:
+                    vis._notify_write()
                     vis['config']['singleVisual']['vcObjects']['title'][0]['properties']['text']['expr']['Literal'][
                         'Value'] = \
                     vis['config']['singleVisual']['vcObjects']['title'][0]['properties']['text']['expr']['Literal'][
@@ -269,6 +302,7 @@ class PbiPage(dict, _PbiFilterObject):
                 pass
         return count
 
+    @mutates
     def set_visibility(self, value):
         """
         Sets the visibility of the page to the provided value
@@ -277,6 +311,7 @@ class PbiPage(dict, _PbiFilterObject):
         """
         self['config']['visibility'] = value
 
+    @mutates
     def hide(self):
         """
         Hides the page.
@@ -284,6 +319,7 @@ class PbiPage(dict, _PbiFilterObject):
         """
         self.set_visibility(1)
 
+    @mutates
     def unhide(self):
         """
         Unhides the page.
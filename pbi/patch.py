@@ -0,0 +1,416 @@
+import json
+import os
+
+from pbi.bookmark import Bookmark
+from pbi.container import PbiContainer
+from pbi.filter import PbiFilter
+from pbi.layout import PbiLayout
+from pbi.object import _recorders
+from pbi.page import PbiPage
+
+
+def _get_container_rule(page, container):
+    """
+    Returns the target of a container: its key path, then the rules to match it in other reports
+    :param page: a Power BI page
+    :param container: a Power BI container
+    :return: a dictionary
+    """
+    try:
+        container_type, title = container.type, container.display_name
+    except KeyError:
+        container_type, title = None, None
+    return {
+        'kind': 'container',
+        'path': ['sections', page.display_name, 'visualContainers', container.name],
+        'page': page.display_name,
+        'type': container_type,
+        'title': title
+    }
+
+
+def _get_filter_rule(owner_rule, flt):
+    """
+    Returns the target of a filter: its key path, then the rules to match it in other reports
+    :param owner_rule: the target of the layout, page or container holding the filter
+    :param flt: a Power BI filter
+    :return: a dictionary
+    """
+    return {
+        'kind': 'filter',
+        'path': owner_rule.get('path', []) + ['filters', flt.get('name')],
+        'owner': owner_rule,
+        'entity': flt.entity,
+        'property': flt.property_name
+    }
+
+
+class _PbiTargetIndex:
+    """
+    An index of the objects of a report by key path, used to locate the targets of the edits of a patch.
+    """
+
+    def __init__(self, report):
+        """
+        Indexes the objects of the given report
+        :param report: a Power BI report
+        """
+        self.report = report
+        self.rules = {}
+        self.objects = {}
+        self.names = {}
+        self.refresh()
+
+    def _add(self, obj, rule):
+        self.rules[id(obj)] = rule
+        self.objects[json.dumps(rule.get('path', [rule['kind']]))] = obj
+
+    def refresh(self):
+        """
+        Rebuilds the index (e.g. after pages or visuals were added or removed)
+        :return: None
+        """
+        self.rules = {}
+        self.objects = {}
+        layout = self.report.layout
+        self._add(self.report, {'kind': 'report'})
+        self._add(layout, {'kind': 'layout', 'path': []})
+        for flt in layout.get('filters', []):
+            self._add(flt, _get_filter_rule(self.rules[id(layout)], flt))
+        for bookmark in layout['config'].get('bookmarks', []):
+            self._add(bookmark, {
+                'kind': 'bookmark',
+                'path': ['config', 'bookmarks', bookmark['name']],
+                'displayName': bookmark.get('displayName')
+            })
+        for page in layout['sections']:
+            page_rule = {'kind': 'page', 'path': ['sections', page.display_name], 'page': page.display_name}
+            self._add(page, page_rule)
+            for flt in page.get('filters', []):
+                self._add(flt, _get_filter_rule(page_rule, flt))
+            for container in page['visualContainers']:
+                container_rule = _get_container_rule(page, container)
+                self._add(container, container_rule)
+                for flt in container.get('filters', []):
+                    self._add(flt, _get_filter_rule(container_rule, flt))
+
+    def add_copies(self, recorded, replayed):
+        """
+        Maps the names the copied visuals had when an edit was recorded to the names of the copies made when the
+        edit was replayed, so that the later edits of a copy are replayed on the matching copy
+        :param recorded: a list of dictionaries with 'page' and 'names' ({original name: copy name}) keys
+        :param replayed: a list of dictionaries with 'page' and 'names' keys, the copies made by the replay
+        :return: None
+        """
+        names = {(copies['page'], name): new_name for copies in replayed for name, new_name in copies['names'].items()}
+        for copies in recorded:
+            for name, new_name in copies['names'].items():
+                if (copies['page'], name) in names:
+                    self.names[copies['page'], new_name] = names[copies['page'], name]
+
+    def get_rule(self, obj):
+        """
+        Returns the target of an object of the report
+        :param obj: a Power BI object
+        :return: a dictionary or None if the object is not part of the report
+        """
+        if id(obj) not in self.rules:
+            self.refresh()
+        return self.rules.get(id(obj))
+
+    def resolve(self, rule):
+        """
+        Returns the objects of the report matching a target: the object at the same key path if any, else the objects
+        matching the rules (the copy made by the replay of a recorded copy, else the container of same type and title
+        on the page of same name, the filters on the same column of the matching owner, the bookmark of same display
+        name)
+        :param rule: a dictionary
+        :return: a list of Power BI objects (empty if the target cannot be resolved, or if several containers match it)
+        """
+        obj = self.objects.get(json.dumps(rule.get('path', [rule['kind']])))
+        if obj is not None:
+            return [obj]
+        layout = self.report.layout
+        if rule['kind'] == 'container':
+            name = self.names.get((rule['page'], rule['path'][-1]))
+            if name is not None:
+                obj = self.objects.get(json.dumps(rule['path'][:-1] + [name]))
+                return [] if obj is None else [obj]
+            res = [
+                container for page in layout['sections'] if page.display_name == rule['page']
+                for container in page['visualContainers']
+                if self.rules[id(container)]['type'] == rule['type']
+                and self.rules[id(container)]['title'] == rule['title']
+            ]
+            return res if len(res) == 1 else []
+        if rule['kind'] == 'filter':
+            return [
+                flt for owner in self.resolve(rule['owner']) for flt in owner.get('filters', [])
+                if flt.entity == rule['entity'] and flt.property_name == rule['property']
+            ]
+        if rule['kind'] == 'bookmark':
+            return [
+                bookmark for bookmark in layout['config'].get('bookmarks', [])
+                if bookmark.get('displayName') == rule['displayName']
+            ][:1]
+        return []
+
+
+class PbiPatch:
+    """
+    A portable list of edits recorded on a Power BI report: each edit is a method call on a target (the report, its
+    layout, a page, a container, a filter or a bookmark) identified by its key path and by rules to match it in other
+    reports, so that the same edits can be replayed on many reports.
+    """
+
+    def __init__(self, edits=None):
+        """
+        Creates a patch
+        :param edits: a list of dictionaries with 'target', 'method', 'args' and 'kwargs' keys (and 'copies', the
+        names of the visuals copied by the edit)
+        """
+        self.edits = edits if edits is not None else []
+
+    def __len__(self):
+        return len(self.edits)
+
+    def to_json(self):
+        """
+        Returns the patch as a json string
+        :return: a string
+        """
+        return json.dumps(self.edits)
+
+    @classmethod
+    def from_json(cls, strg):
+        """
+        Creates a patch from a json string
+        :param strg: a string returned by to_json
+        :return: a Power BI patch
+        """
+        return cls(json.loads(strg))
+
+    def save(self, path):
+        """
+        Saves the patch as a json file
+        :param path: the path to the file
+        :return: None
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.to_json())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a patch from a json file
+        :param path: the path to the file
+        :return: a Power BI patch
+        """
+        with open(path, encoding='utf-8') as file:
+            return cls.from_json(file.read())
+
+    def apply(self, report):
+        """
+        Replays the edits of the patch on a report (in memory: the report has to be saved afterwards)
+        :param report: a Power BI report
+        :return: the list of the edits whose target could not be found in the report (or matches several visuals)
+        """
+        res = []
+        index = _PbiTargetIndex(report)
+        for edit in self.edits:
+            targets = index.resolve(edit['target'])
+            if not targets:
+                res.append(edit)
+                continue
+            args = [_decode(arg, report) for arg in edit['args']]
+            kwargs = {key: _decode(value, report) for key, value in edit['kwargs'].items()}
+            copies = _PbiCopyRecorder()
+            with copies:
+                for target in targets:
+                    getattr(target, edit['method'])(*args, **kwargs)
+            if edit['target']['kind'] in ('report', 'layout', 'page'):
+                index.refresh()
+            index.add_copies(edit.get('copies', []), copies.copies)
+        return res
+
+
+class _PbiCopyRecorder:
+    """
+    Records the names of the visuals copied while an edit is replayed. To be used as a context manager.
+    """
+
+    def __init__(self):
+        self.copies = []
+
+    def __enter__(self):
+        _recorders.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _recorders.remove(self)
+        return False
+
+    def on_call(self, obj, method_name, args, kwargs):
+        return None
+
+    def on_copies(self, page, names):
+        """
+        Records the copies of visuals added to a page
+        :param page: a Power BI page
+        :param names: a dictionary {original name: copy name}
+        :return: None
+        """
+        self.copies.append({'page': page.display_name, 'names': dict(names)})
+
+
+class PbiPatchRecorder:
+    """
+    Records the edits made on a report (through the methods of the report, its pages and containers, etc.) as a
+    portable patch. To be used as a context manager.
+    """
+
+    def __init__(self, report):
+        """
+        Creates a recorder for the given report
+        :param report: a Power BI report
+        """
+        self.report = report
+        self.patch = PbiPatch()
+        self._index = None
+        self._edit = None
+
+    def __enter__(self):
+        self._index = _PbiTargetIndex(self.report)
+        _recorders.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _recorders.remove(self)
+        return False
+
+    def on_call(self, obj, method_name, args, kwargs):
+        """
+        Records a method call on a Power BI object, if the object is part of the recorded report
+        :param obj: a Power BI object
+        :param method_name: the name of the method
+        :param args: the positional arguments of the call
+        :param kwargs: the keyword arguments of the call
+        :return: None
+        """
+        self._edit = None
+        rule = self._index.get_rule(obj)
+        if rule is None:
+            return None
+        self._edit = {
+            'target': rule,
+            'method': method_name,
+            'args': [_encode(arg) for arg in args],
+            'kwargs': {key: _encode(value) for key, value in kwargs.items()}
+        }
+        self.patch.edits.append(self._edit)
+
+    def on_copies(self, page, names):
+        """
+        Records the names of the visuals copied by the recorded edit, to replay the later edits of the copies on the
+        matching copies
+        :param page: a Power BI page
+        :param names: a dictionary {original name: copy name}
+        :return: None
+        """
+        if self._edit is not None:
+            self._edit.setdefault('copies', []).append({'page': page.display_name, 'names': dict(names)})
+
+
+def _encode(value):
+    """
+    Converts a method argument to a json-like object
+    :param value: a method argument
+    :return: a json-like object
+    """
+    from pbi.report import PbiReport
+    if isinstance(value, PbiContainer):
+        return {'__container__': value.export()}
+    if isinstance(value, PbiPage):
+        return {'__page__': value.display_name}
+    if isinstance(value, PbiFilter):
+        return {'__filter__': dict(value)}
+    if isinstance(value, PbiReport):
+        return {'__report__': [value.folder, value.filename]}
+    if isinstance(value, (PbiLayout, Bookmark)):
+        raise ValueError(f'Cannot record an edit with a {type(value).__name__} argument.')
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {'__dict__': [[_encode(key), _encode(item)] for key, item in value.items()]}
+    return value
+
+
+def _decode(value, report):
+    """
+    Converts a json-like object back to a method argument
+    :param value: a json-like object returned by _encode
+    :param report: the report the edit is replayed on
+    :return: a method argument
+    """
+    if isinstance(value, list):
+        return [_decode(item, report) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '__container__' in value:
+        return PbiContainer(value['__container__'])
+    if '__page__' in value:
+        return report.get_page(value['__page__'])
+    if '__filter__' in value:
+        return PbiFilter(value['__filter__'])
+    if '__report__' in value:
+        return type(report)(*value['__report__'])
+    return {_decode_key(key): _decode(item, report) for key, item in value['__dict__']}
+
+
+def _decode_key(key):
+    """
+    Converts a json-like dictionary key back (lists become tuples, e.g. for (table, column) keys)
+    :param key: a json-like object
+    :return: a hashable object
+    """
+    return tuple(key) if isinstance(key, list) else key
+
+
+def _apply_to_file(args):
+    """
+    Replays a patch on a report file and saves it (used by apply_patch, in a worker process)
+    :param args: a (patch json string, folder, filename, report class) tuple
+    :return: the list of the edits whose target could not be found
+    """
+    strg, folder, filename, report_class = args
+    report = report_class(folder, filename)
+    patch = PbiPatch.from_json(strg)
+    res = patch.apply(report)
+    if len(res) < len(patch):
+        report.save()
+    return res
+
+
+def apply_patch(patch, folder, processes=None, report_class=None):
+    """
+    Replays a patch on all the reports of a folder and saves them, in a pool of worker processes
+    :param patch: a Power BI patch
+    :param folder: a path to a local folder
+    :param processes: the number of worker processes (default is the number of processors, 1 to run in-process)
+    :param report_class: the report class used to open the reports (default is PbiReport)
+    :return: a dictionary {report name: list of the edits whose target could not be found}
+    """
+    if report_class is None:
+        from pbi.report import PbiReport
+        report_class = PbiReport
+    strg = patch.to_json()
+    filenames = [
+        os.path.splitext(file)[0] for file in sorted(os.listdir(folder))
+        if os.path.splitext(file)[1] == f'.{report_class.ext}'
+    ]
+    tasks = [(strg, folder, filename, report_class) for filename in filenames]
+    if processes == 1:
+        return dict(zip(filenames, map(_apply_to_file, tasks)))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(processes) as executor:
+        return dict(zip(filenames, executor.map(_apply_to_file, tasks)))
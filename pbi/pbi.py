@@ -32,11 +32,8 @@ if (!(Test-Path $path -PathType Container)) {
     New-Item -ItemType Directory -Force -Path $path
 }
 Connect-PowerBIServiceAccount
-
-New-Item $path -itemType Directory''' + f'''
-$report_list= Get-PowerBIReport {workspace_id_filter}
-
-Write-Host $report_list.id
+$failed = 0''' + f'''
+$report_list= Get-PowerBIReport {workspace_id_filter}-ErrorAction Stop
 
 foreach ($report in $report_list)''' + '''
 {''' + f'''
@@ -44,11 +41,21 @@ foreach ($report in $report_list)''' + '''
     $report_name = $report.name
     if ($report_name.contains("{strg}"))''' + '''
     {''' + f'''
-        Write-Host "Importing report $report_name ($report_id)..." 
-        Export-PowerBIReport {workspace_id_filter}-Id $report_id -Outfile $path\\"temp.pbix"
-        Move-Item -Path $path\\"temp.pbix" -Destination $path\\$report_name".pbix" -Force''' + '''
+        Write-PbiEvent "start" $report_name @{{ id = "$report_id" }}
+        try
+        {{
+            Export-PowerBIReport {workspace_id_filter}-Id $report_id -Outfile $path\\"temp.pbix" -ErrorAction Stop
+            Move-Item -Path $path\\"temp.pbix" -Destination $path\\$report_name".pbix" -Force -ErrorAction Stop
+            Write-PbiEvent "finish" $report_name @{{ id = "$report_id"; bytes = (Get-Item $path\\$report_name".pbix").Length }}
+        }}
+        catch
+        {{
+            $failed = $failed + 1
+            Write-PbiEvent "error" $report_name @{{ id = "$report_id"; message = $_.Exception.Message }}
+        }}''' + '''
     }
-}'''
+}
+if ($failed -gt 0) { exit 1 }'''
 
     @staticmethod
     def _get_backup_script(**kwargs):
@@ -65,17 +72,18 @@ foreach ($report in $report_list)''' + '''
     def download(*args, **kwargs):
         """
         Downloads the reports and dataset from the workspace in the destination folder
-        :return: None
+        :return: the list of events of the download ('start', 'finish' with 'bytes' and 'duration', or 'error' events
+        per report)
         """
-        run_ps_script(PowerBI._get_download_script(*args, **kwargs))
+        return run_ps_script(PowerBI._get_download_script(*args, **kwargs))
 
     @staticmethod
     def get_backup(**kwargs):
         """
         Copies the reports and dataset from the workspace in the destination folder
-        :return: None
+        :return: the list of events of the download (see download)
         """
-        run_ps_script(PowerBI._get_backup_script(**kwargs))
+        return run_ps_script(PowerBI._get_backup_script(**kwargs))
 
     @staticmethod
     def _get_upload_script(
@@ -98,13 +106,24 @@ if (!(Test-Path $pathinput -PathType Container)) {
     New-Item -ItemType Directory -Force -Path $pathinput
 }
 Connect-PowerBIServiceAccount
+$failed = 0
 $bslash = "\\"
 foreach ($report in Get-ChildItem -Path $pathinput)''' + '''
     {
-        $reportname = "$pathinput$bslash$report"''' + f'''
-        New-PowerBIReport -Path $reportname {workspace_id_filter}-ConflictAction CreateOrOverwrite -ErrorAction Stop''' + '''
-        Write-Host "Published $pathinput$bslash$report."
+        $reportname = "$pathinput$bslash$report"
+        Write-PbiEvent "start" $report.BaseName @{ bytes = $report.Length }
+        try
+        {''' + f'''
+            $published = New-PowerBIReport -Path $reportname {workspace_id_filter}-ConflictAction CreateOrOverwrite -ErrorAction Stop
+            Write-PbiEvent "finish" $report.BaseName @{{ id = "$($published.Id)"; bytes = $report.Length }}''' + '''
+        }
+        catch
+        {
+            $failed = $failed + 1
+            Write-PbiEvent "error" $report.BaseName @{ message = $_.Exception.Message }
+        }
     }
+if ($failed -gt 0) { exit 1 }
 '''
 
     def upload(
@@ -112,9 +131,10 @@ foreach ($report in Get-ChildItem -Path $pathinput)''' + '''
     ):
         """
         publishes the given reports to the target workspace
-        :return: a string
+        :return: the list of events of the upload ('start', 'finish' with 'bytes' and 'duration', or 'error' events per
+        report)
         """
-        run_ps_script(
+        events = run_ps_script(
             self._get_upload_script(
                 *args,
                 **kwargs
@@ -122,3 +142,17 @@ foreach ($report in Get-ChildItem -Path $pathinput)''' + '''
         )
         message_box('Power BI upload', 'Done uploading.', 0)
         print('Done.')
+        return events
+
+    def watch(self, operations, **kwargs):
+        """
+        Watches the download folder and writes the reports dropped there to the upload folder, once processed with the
+        given operations (see pbi.watch.PbiWatcher), until interrupted
+        :param operations: a list of dictionaries with 'method', 'args' and 'kwargs' keys (PbiReport methods)
+        :param kwargs: keywords passed to the watcher (state_path, thin, settle, max_workers) and to its run method
+        (interval, duration)
+        :return: the state of the watcher (a dictionary {file name: record})
+        """
+        from pbi.watch import PbiWatcher
+        run_kwargs = {key: kwargs.pop(key) for key in ('interval', 'duration') if key in kwargs}
+        return PbiWatcher(self.download_folder, self.upload_folder, operations, **kwargs).run(**run_kwargs)
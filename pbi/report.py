@@ -1,11 +1,21 @@
-import json
 import os
-
-import pandas as pd
 import shutil
+import zlib
 
+from pbi.analyzer import analyze
+from pbi.archive import CONNECTIONS, LAYOUT, LAYOUT_ENCODING, read_member
+from pbi.connections import PbiConnections, rebind_file
+from pbi.filter import PbiFilterIndex
 from pbi.layout import PbiLayout
+from pbi.object import mutates
+from pbi.patch import PbiPatchRecorder
+from pbi.resources import get_resource_member_name, transfer_resources
+from pbi.result import PbiUpdateResult
+from pbi.session import PbiEditSession
+from pbi.thin import write_thin_archive
+from pbi.trace import traced, tracer
 from pbi.utils import run_ps_script
+from pbi.variant import build_variants
 
 
 class PbiReport:
@@ -13,49 +23,153 @@ class PbiReport:
     The Power BI report class.
     """
     ext = 'pbix'
-    archive_format = 'zip'
 
-    def __init__(self, folder, filename):
+    @traced('report.load')
+    def __init__(self, folder, filename, cache=None):
         """
-        Initiates a Power BI Report object.
+        Initiates a Power BI Report object (the layout and connections are read without extracting the archive).
         :param folder: a path to a local folder
         :param filename: a string
+        :param cache: a Power BI layout cache to reuse previously parsed layouts, or None
         """
         self.folder = folder
         self.filename = filename
-        self._open()
-        with open(self.temp_folder + '\\Report\\Layout', 'r', encoding='utf-16-le') as file:
-            layout_str = file.read()
-        self.layout = PbiLayout(layout_str)
-        try:
-            with open(self.temp_folder + '\\Connections', 'r') as file:
-                connections_str = file.read()
-            self.connections = json.loads(connections_str)
-        except FileNotFoundError:
-            self.connections = None
-            print("Warning: No connection file found.")
-        self._close()
+        self.cache = cache
+        self._session = None
+        self._load()
+
+    def _load(self):
+        """
+        Reads the layout and the connections from the .pbix archive (the layout is only parsed when first needed)
+        :return: None
+        """
+        self._layout = None
+        self._layout_bytes = read_member(self.path, LAYOUT)
+        self._layout_compressed = False
+        self._load_connections()
 
     @property
-    def path(self):
+    def layout(self):
+        """
+        Returns the report layout, parsed (or taken from the cache) on first access
+        :return: a Power BI layout
+        """
+        if self._layout is None:
+            layout_bytes = self._layout_bytes
+            if self._layout_compressed:
+                layout_bytes = zlib.decompress(layout_bytes)
+            if self.cache is None:
+                self._layout = PbiLayout(layout_bytes.decode(LAYOUT_ENCODING))
+            else:
+                self._layout = self.cache.load(layout_bytes)
+            self._layout_bytes = None
+        return self._layout
+
+    @layout.setter
+    def layout(self, layout):
+        self._layout = layout
+        self._layout_bytes = None
+
+    def __getstate__(self):
+        """
+        Returns the state pickled with the report (e.g. to send it to a worker process): a layout never accessed is
+        kept as its raw (compressed) bytes, a parsed layout is pickled compactly; edit sessions are not pickled
+        :return: a dictionary
+        """
+        state = self.__dict__.copy()
+        state['_session'] = None
+        if self._layout is None and not self._layout_compressed:
+            state['_layout_bytes'] = zlib.compress(self._layout_bytes, 1)
+            state['_layout_compressed'] = True
+        return state
+
+    def _load_connections(self):
+        """
+        Reads the connections from the .pbix archive
+        :return: None
         """
-        Returns the full path to the Power BI report.
+        data = read_member(self.path, CONNECTIONS)
+        self.connections = None if data is None else PbiConnections.from_bytes(data)
+        if self.connections is None:
+            print("Warning: No connection file found.")
+
+    def _notify_write(self):
+        """
+        Notifies the active observers that the layout is about to be modified by a method of the report (the layout
+        objects modified within notify them themselves)
+        :return: None
+        """
+        if self._layout is not None:
+            self._layout._notify_write()
+
+    @classmethod
+    def _get_path(cls, folder, filename):
+        """
+        Returns the full path to the Power BI report of given name in the given folder.
+        :param folder: a path to a local folder
+        :param filename: a string
         :return: a string
         """
-        return f'{self.folder}\\{self.filename}.{self.ext}'
+        return f'{folder}\\{filename}.{cls.ext}'
 
     @property
-    def temp_folder(self):
+    def path(self):
         """
-        returns a temporary folder name (will be used to unzip the .pbix file)
+        Returns the full path to the Power BI report.
         :return: a string
         """
-        return f'Temp_{self.filename}'
+        return self._get_path(self.folder, self.filename)
 
     @property
     def filters(self):
         return self.layout['filters']
 
+    def get_filter_index(self):
+        """
+        Returns an index of the report filters (at report, page and visual level) by table and column
+        :return: a Power BI filter index
+        """
+        return PbiFilterIndex(self.layout)
+
+    @traced('report.update_filters')
+    @mutates
+    def update_filters(self, updates, level=None):
+        """
+        Sets or clears the values of all the filters on the given columns (e.g. for a regional variant of a report)
+        :param updates: a dictionary {(table, column): value, list of values, or None to clear}
+        :param level: 'report', 'page', 'visual', a list of these or None (all levels)
+        :return: a dictionary with the number of updates per (table, column)
+        """
+        return self.get_filter_index().apply(updates, level)
+
+    @classmethod
+    def update_filters_in_folder(cls, folder, updates, level=None, **kwargs):
+        """
+        Sets or clears the values of the filters on the given columns in all the reports of a folder, and saves them
+        :param folder: a path to a local folder
+        :param updates: a dictionary {(table, column): value, list of values, or None to clear}
+        :param level: 'report', 'page', 'visual', a list of these or None (all levels)
+        :param kwargs: keywords passed to the save method
+        :return: a dictionary with the number of updates per (table, column), per report
+        """
+        res = {}
+        for file in sorted(os.listdir(folder)):
+            filename, ext = os.path.splitext(file)
+            if ext != f'.{cls.ext}':
+                continue
+            report = cls(folder, filename)
+            res[filename] = report.update_filters(updates, level)
+            if any(res[filename].values()):
+                report.save(**kwargs)
+        return res
+
+    def _count_containers(self):
+        """
+        Returns the number of containers in the report
+        :return: an integer
+        """
+        return sum(len(page['visualContainers']) for page in self.layout['sections'])
+
     def copy(self, new_name=None, new_folder=None):
         """
         Copies a Power BI report and returns the corresponding PbiReport
@@ -67,59 +181,97 @@ class PbiReport:
             new_name = f'{self.filename}_copy'
         if new_folder is None:
             new_folder = f'{self.folder}'
-        new_path = f'{new_folder}\\{new_name}.{self.ext}'
+        new_path = self._get_path(new_folder, new_name)
         shutil.copyfile(self.path, new_path)
-        return PbiReport(new_folder, new_name)
+        return type(self)(new_folder, new_name, self.cache)
+
+    @traced('report.export_thin')
+    def export_thin(self, new_name=None, new_folder=None, dataset_ids=None, workspace_ids=None, dataset_id=None):
+        """
+        Writes a thin copy of the report (report definition, resources and connections only, without the embedded data
+        model) and returns the corresponding PbiReport. The report must be bound to a shared dataset.
+        :param new_name: the name of the thin .pbix file or None (same name)
+        :param new_folder: the folder where to write the thin .pbix file or None (same folder, with a '_thin' suffix)
+        :param dataset_ids: a dictionary {dataset id from: dataset id to} to rebind the thin report, or None
+        :param workspace_ids: a dictionary {workspace id from: workspace id to} to rebind the thin report, or None
+        :param dataset_id: the id of the dataset the thin report must be bound to, or None (any dataset)
+        :return: a PbiReport object
+        """
+        if new_name is None:
+            new_name = self.filename if new_folder is not None else f'{self.filename}_thin'
+        if new_folder is None:
+            new_folder = f'{self.folder}'
+        new_path = self._get_path(new_folder, new_name)
+        members = {}
+        if self._layout is not None:
+            members[LAYOUT] = self.layout.export().encode(LAYOUT_ENCODING)
+        write_thin_archive(self.path, new_path, members, dataset_ids, workspace_ids, dataset_id)
+        return type(self)(new_folder, new_name, self.cache)
 
-    def _open(self):
+    def checkpoint(self):
         """
-        Decomposes the PBI Report in its Temp folder (unzip)
-        :return: None
+        Returns an in-memory checkpoint of the report layout, to roll back speculative edits without copying the report
+        :return: a Power BI checkpoint
         """
-        shutil.rmtree(self.temp_folder, ignore_errors=True)
-        os.mkdir(self.temp_folder)
-        shutil.unpack_archive(self.path, self.temp_folder, self.archive_format)
+        return self.layout.checkpoint()
 
-    def _close(self):
+    def record(self):
         """
-        Saves the PBI Report as a .pbix (zips) and removes Temp folder
-        :return: None
+        Returns a recorder of the edits made on the report, to be used as a context manager: the edits made within
+        (through the methods of the report, its pages, containers, filters, etc.) are recorded as a portable patch
+        (recorder.patch) that can be replayed on other reports
+        :return: a Power BI patch recorder
         """
-        os.remove(self.path)
-        shutil.make_archive(f'{self.path}', self.archive_format, self.temp_folder)
-        os.rename(
-            f'{self.path}.{self.archive_format}',
-            f'{self.path}'
-        )
-        shutil.rmtree(self.temp_folder)
+        return PbiPatchRecorder(self)
+
+    def edit(self):
+        """
+        Returns an edit session on the report, to be used as a context manager: all changes made within the session
+        (layout edits, resource packages, dataset rebinds, static files) are written to the .pbix file once, when the
+        session ends, or discarded if an exception is raised.
+        :return: a Power BI edit session
+        """
+        return PbiEditSession(self)
 
+    @traced('report.save')
     def save(self, dataset_id_from=None, dataset_id_to=None):
         """
-        Saves the Python Power BI Report as a .pbix file.
+        Saves the Python Power BI Report as a .pbix file (when the edit session ends if one is open).
         :param dataset_id_from: a string
         :param dataset_id_to: a string
         :return: None
         """
-        self._open()
         self.tidy_bookmarks()
-        layout = self.layout.export()
-        os.remove(self.temp_folder + '\\Report\\Layout')
-        new_layout_file = open(self.temp_folder + '\\Report\\Layout', "a", encoding='utf-16-le')
-        new_layout_file.write(layout)
-        new_layout_file.close()
-
-        if dataset_id_from is not None and dataset_id_to is not None and dataset_id_to != dataset_id_from:
-            with open(self.temp_folder + '\\Connections', 'r') as connection_file:
-                connection_str = connection_file.read()
-                new_connection_str = connection_str.replace(dataset_id_from, dataset_id_to)
-            connection_file.close()
-            os.remove(self.temp_folder + '\\Connections')
+        if self._session is not None:
+            self._session.rebind_dataset(dataset_id_from, dataset_id_to)
+            return None
+        with self.edit() as session:
+            session.rebind_dataset(dataset_id_from, dataset_id_to)
 
-            new_connections_file = open(self.temp_folder + '\\Connections', "a")
-            new_connections_file.write(new_connection_str)
-            new_connections_file.close()
+    @traced('report.add_visuals')
+    @mutates
+    def add_visuals(self, visual_lst, pages=None):
+        """
+        Adds the given visuals (e.g. a header group and its content) to many pages at once
+        :param visual_lst: a list of Power BI containers or a Power BI container
+        :param pages: a list of page names or None (all pages)
+        :return: a dictionary {page name: list of added visuals (with updated names)}
+        """
+        return self.layout.add_visuals(visual_lst, pages)
 
-        self._close()
+    def rebind(self, dataset_ids=None, workspace_ids=None):
+        """
+        Rebinds the report to other datasets (and workspaces). Only the connections are rewritten (layout changes are
+        not saved), or the rebinding is staged if an edit session is open.
+        :param dataset_ids: a dictionary {dataset id from: dataset id to} or None
+        :param workspace_ids: a dictionary {workspace id from: workspace id to} or None
+        :return: None
+        """
+        if self._session is not None:
+            self._session.rebind(dataset_ids, workspace_ids)
+            return None
+        if rebind_file(self.path, dataset_ids, workspace_ids):
+            self._load_connections()
 
     def get_page(self, page_name):
         """
@@ -129,12 +281,15 @@ class PbiReport:
         """
         return self.layout.get_page(page_name)
 
+    @traced('report.select_pages')
+    @mutates
     def select_pages(self, page_list):
         """
         Select the sections (pages) from the PBI Report which names appear in page_list.
         :param page_list: a list of strings
         :return: None
         """
+        self.layout._notify_write()
         self.layout['sections'] = [
             section for section in self.layout['sections']
             if section['displayName'] in page_list
@@ -157,6 +312,7 @@ class PbiReport:
         used_bookmarks = self.layout.get_used_bookmark_names()
         if 'bookmarks' not in self.layout['config']:
             return None
+        self.layout._notify_write()
         self.layout['config']['bookmarks'] = [
             bookmark for bookmark in self.layout['config']['bookmarks']
             if bookmark['name'] in used_bookmarks or (
@@ -167,6 +323,42 @@ class PbiReport:
             )
         ]
 
+    @mutates
+    def prune_bookmarks(self):
+        """
+        Removes the bookmark state of the pages and visuals that no longer exist (e.g. after select_pages,
+        remove_visuals or merge)
+        :return: the number of bytes removed from the layout
+        """
+        return self.layout.prune_bookmarks()
+
+    def collect_garbage(self, dry_run=True):
+        """
+        Finds the dead objects of the report (hidden visuals no bookmark can show again, empty groups, unused filters,
+        unreferenced resource package items) and, unless dry_run, removes them and saves the report (or stages the
+        update if an edit session is open), static files of the removed resource package items included
+        :param dry_run: a boolean, True to only report the dead objects
+        :return: a dictionary {category: list of object names} with the approximate number of layout bytes freed
+        """
+        try:
+            items = self.layout.get_resource_package('RegisteredResources')['items']
+        except (KeyError, AssertionError):
+            items = []
+        member_names = {item['name']: get_resource_member_name('RegisteredResources', item) for item in items}
+        res = self.layout.collect_garbage(dry_run)
+        if dry_run:
+            return res
+        if self._session is not None:
+            for name in res['unused_resources']:
+                self._session.remove_file(member_names[name])
+            return res
+        with self.edit() as session:
+            for name in res['unused_resources']:
+                session.remove_file(member_names[name])
+        return res
+
+    @traced('report.merge')
+    @mutates
     def merge(self, report):
         """
         Merges two reports
@@ -176,6 +368,9 @@ class PbiReport:
         if report is None:
             return None
         report.tidy_bookmarks()
+        self.layout._notify_write()
+        for page in report.layout['sections']:
+            self.layout._attach(page)
         self.layout['sections'] += report.layout['sections']
         self._update_section_id()
         bookmarks_to_add = []
@@ -197,8 +392,20 @@ class PbiReport:
                 ]
         if 'bookmarks' not in self.layout['config']:
             self.layout['config']['bookmarks'] = []
+        for bookmark in bookmarks_to_add:
+            self.layout._attach(bookmark)
         self.layout['config']['bookmarks'] += bookmarks_to_add
 
+    def diff(self, report):
+        """
+        Returns the structural changes (layout, pages, visuals, filters, bookmarks added, removed or modified, visuals
+        repositioned or moved to another page) from the current report to the given one, e.g. from a dev copy to a
+        prod copy
+        :param report: a Power BI report
+        :return: a list of Power BI changes
+        """
+        return self.layout.diff(report.layout)
+
     def _update_section_id(self, id_list=None):
         """
         Updates the ids of the report sections (pages).
@@ -209,48 +416,56 @@ class PbiReport:
         if id_list is None:
             id_list = list(range(len(self.layout['sections'])))
         for i, section in enumerate(self.layout['sections']):
+            section._notify_write()
             section['id'] = id_list[i]
             section['ordinal'] = section['id']
 
+    @traced('report.update_keep_layer_order')
+    @mutates
     def update_keep_layer_order(self):
         """
         Sets the 'keepLayerOrder' to all appropriate visuals to 'true'
-        :return: None
+        :return: a Power BI update result (number of updates per page)
         """
-        updates = []
+        res = PbiUpdateResult('Number of visuals updated per page (keep layer order)', ['Page', 'Updates'])
+        if tracer.enabled:
+            tracer.count('containers_touched', self._count_containers())
         for page in self.layout['sections']:
-            updates += [[page.display_name, page.update_keep_layer_order()]]
-        print(f"""
-Number of visuals updated per page (keep layer order):
-{pd.DataFrame(updates, columns=['Page', 'Updates'])}
-""")
+            res.add(page.display_name, page.update_keep_layer_order())
+        return res
 
+    @traced('report.update_multiselect')
+    @mutates
     def update_multiselect(self):
         """
         Sets the multiselect slicers not to allow selection with CTRL key
-        :return: None
+        :return: a Power BI update result (number of updates per page)
         """
-        updates = []
+        res = PbiUpdateResult(
+            'Number of multi-select slicers updated per page',
+            ['Page', 'CTRL Updates', 'Allow all Updates', 'Unselect all Updates']
+        )
+        if tracer.enabled:
+            tracer.count('containers_touched', self._count_containers())
         for page in self.layout['sections']:
-            updates += [[page.display_name, *page.update_multiselect()]]
-        print(f"""
-Number of multi-select slicers updated per page:
-{pd.DataFrame(updates, columns=['Page', 'CTRL Updates', 'Allow all Updates', 'Unselect all Updates'])}
-""")
+            res.add(page.display_name, *page.update_multiselect())
+        return res
 
+    @traced('report.remove_visuals_from_mobile')
+    @mutates
     def remove_visuals_from_mobile(self):
         """
         Removes all the visuals from the mobile screen
-        :return: None
+        :return: a Power BI update result (number of updates per page)
         """
-        updates = []
+        res = PbiUpdateResult('Number of visuals removed from mobile screen', ['Page', 'Updates'])
+        if tracer.enabled:
+            tracer.count('containers_touched', self._count_containers())
         for page in self.layout['sections']:
-            updates += [[page.display_name, page.remove_visuals_from_mobile()]]
-        print(f"""
-Number of visuals removed from mobile screen:
-{pd.DataFrame(updates, columns=['Page', 'Updates'])}
-""")
+            res.add(page.display_name, page.remove_visuals_from_mobile())
+        return res
 
+    @mutates
     def reset_mobile_screen(self, default_message_report=None, pages=None):
         """
         Resets the mobile screens for the report.
@@ -263,56 +478,94 @@ Number of visuals removed from mobile screen:
             pages = self.layout.pages
         self.remove_visuals_from_mobile()
         if default_message_report is not None:
-            default_visuals = default_message_report.layout['sections'][0]['visualContainers']
-            for page_name in pages:
-                page = self.get_page(page_name)
-                if page is not None:
-                    page.add_visuals(default_visuals)
+            self.layout.add_visuals(default_message_report.layout['sections'][0]['visualContainers'], pages)
 
+    @traced('report.disable_headers')
+    @mutates
     def disable_headers(self, **kwargs):
         """
         Disables headers for all visuals
-        :return: None
+        :return: a Power BI update result (number of updates per page)
         :kwargs:
         """
-        updates = []
+        res = PbiUpdateResult('Number of headers disabled per page', ['Page', 'Updates'])
+        if tracer.enabled:
+            tracer.count('containers_touched', self._count_containers())
         for page in self.layout['sections']:
-            updates += [[page.display_name, page.disable_headers(**kwargs)]]
-        print(f"""
-Number of headers disabled per page:
-{pd.DataFrame(updates, columns=['Page', 'Updates'])}
-""")
+            res.add(page.display_name, page.disable_headers(**kwargs))
+        return res
 
+    @traced('report.add_search')
+    @mutates
     def add_search(self, **kwargs):
         """
         Add search feature for all slicers
-        :return: None
+        :return: a Power BI update result (number of updates per page)
         :kwargs:
         """
-        updates = []
+        res = PbiUpdateResult('Number of search features enabled per page', ['Page', 'Updates'])
+        if tracer.enabled:
+            tracer.count('containers_touched', self._count_containers())
         for page in self.layout['sections']:
-            updates += [[page.display_name, page.add_search(**kwargs)]]
-        print(f"""
-Number of search features enabled per page:
-{pd.DataFrame(updates, columns=['Page', 'Updates'])}
-""")
+            res.add(page.display_name, page.add_search(**kwargs))
+        return res
 
+    @traced('report.add_resource_package')
+    @mutates
     def add_resource_package(self, report, name, item):
         """
-        Updates and saves the report to add the resource package (both in layout and linked files)
+        Updates and saves the report to add the resource package (both in layout and linked files), or stages the
+        update if an edit session is open
         :param report: the report with the resource package to add
         :param name: the name of the resource package
         :param item: the actual resource package item (dictionary)
         :return: None
         """
-        self.layout.add_resource_packages(name, item)
-        report._open()
-        self._open()
-        src_file = report.temp_folder + f"/Report/StaticResources/{name}/{item['name']}"
-        tgt_file = self.temp_folder + f"/Report/StaticResources/{name}/{item['name']}"
-        shutil.copyfile(src_file, tgt_file)
-        report._close()
-        self._close()
+        if self._session is not None:
+            self._session.add_resource_package(report, name, item)
+            return None
+        with self.edit() as session:
+            session.add_resource_package(report, name, item)
+
+    def push_resource_package(self, name, item_names, target_paths):
+        """
+        Copies resource package items (e.g. a logo or a theme) from the report to many .pbix files, archive to
+        archive, without extracting them. Items already present in a target (identical content) are not copied again.
+        NB: the targets are modified on disk: reports already loaded from these files have to be loaded again.
+        :param name: the name of the resource package (e.g. 'RegisteredResources')
+        :param item_names: a string or a list of item names
+        :param target_paths: a list of paths to .pbix files
+        :return: a dictionary {target path: {item name: 'added', 'replaced', 'present' or the name of an identical item}}
+        """
+        return transfer_resources(self.path, name, item_names, target_paths)
+
+    def build_variants(self, variants, max_workers=None):
+        """
+        Writes variants of the report (e.g. dev, test and prod copies, or one copy per region) from the layout parsed
+        once: each variant has its own edits, dataset rebinding and static files, and the variants are written in
+        parallel, sharing the members they do not change
+        :param variants: a list of Power BI report variants (pbi.variant.PbiVariant)
+        :param max_workers: the maximum number of threads writing the variants or None
+        :return: a dictionary {variant name: path to the variant .pbix file}
+        """
+        return build_variants(self, variants, max_workers)
+
+    def analyze(self):
+        """
+        Returns the size breakdown of the .pbix file: archive members, then layout pages, containers, bookmarks and
+        filters (as saved on disk)
+        :return: a Power BI size report
+        """
+        return analyze(self.path, self.filename)
+
+    def optimize_images(self, **kwargs):
+        """
+        Recompresses the images of the report static resources (losslessly by default) and saves them
+        :param kwargs: keywords passed to pbi.images.optimize_report_images (quality, downsample, scale)
+        :return: a dictionary {item name: (original size, new size)} with all the items that were made smaller
+        """
+        from pbi.images import optimize_report_images
+        return optimize_report_images(self, **kwargs)
 
     @classmethod
     def _get_download_script(cls, name, workspace_id, destination):
@@ -327,21 +580,32 @@ Number of search features enabled per page:
 Connect-PowerBIServiceAccount
 $path = "{destination}"
 $workspaceid = "{workspace_id}"
-$report_details= Get-PowerBIReport -WorkspaceId "$workspaceid"
+$report_details= Get-PowerBIReport -WorkspaceId "$workspaceid" -ErrorAction Stop
 $report_ids = $report_details.Id
 $report_names = $report_details.Name
 
 $i=0
+$failed = 0
 foreach ($report in $report_ids)''' + '''
 {''' + f'''
     $current_name = $report_names[$i]
     if ($current_name -eq "{name}")''' + '''
     {''' + '''
-        Write-Host "Downloading report $report and name $current_name..."
-        Export-PowerBIReport -WorkspaceId $workspaceid -Id $report -Outfile $path\\$current_name".pbix"
+        Write-PbiEvent "start" $current_name @{ id = "$report" }
+        try
+        {
+            Export-PowerBIReport -WorkspaceId $workspaceid -Id $report -Outfile $path\\$current_name".pbix" -ErrorAction Stop
+            Write-PbiEvent "finish" $current_name @{ id = "$report"; bytes = (Get-Item $path\\$current_name".pbix").Length }
+        }
+        catch
+        {
+            $failed = $failed + 1
+            Write-PbiEvent "error" $current_name @{ id = "$report"; message = $_.Exception.Message }
+        }
     }
     $i=$i + 1''' + '''
 }
+if ($failed -gt 0) { exit 1 }
 '''
 
     @classmethod
@@ -361,6 +625,8 @@ foreach ($report in $report_ids)''' + '''
             name
         )
 
+    @traced('report.update_names')
+    @mutates
     def update_names(self, dct):
         """
         Updates the hardcoded names in the report: e.g. filter names, etc.
@@ -373,12 +639,14 @@ foreach ($report in $report_ids)''' + '''
             new_name = new_name.replace("'", "''")
             self.layout.replace(f"'{old_name}'", f"'{new_name}'")
 
+    @mutates
     def set_landing_page(self, landing_page):
         """
         Sets the landing page of the report
         :page: a page of the report
         :return: None
         """
+        self.layout._notify_write()
         self.layout['sections'] = [landing_page] + [
             page for page in self.layout['sections']
             if page.display_name != landing_page.display_name
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import zipfile
+
+from pbi.archive import LAYOUT, LAYOUT_ENCODING, write_archive
+from pbi.trace import traced, tracer
+
+STATIC_RESOURCES = 'Report/StaticResources'
+
+
+def get_resource_member_name(package_name, item):
+    """
+    Returns the name of the archive member holding a resource package item
+    :param package_name: the resource package name (e.g. 'RegisteredResources')
+    :param item: the resource package item (dictionary)
+    :return: a string
+    """
+    return f"{STATIC_RESOURCES}/{package_name}/{item.get('path', item['name'])}"
+
+
+def _get_package(layout, package_name):
+    """
+    Returns the resource package of given name from a raw layout dictionary, creating it if needed
+    :param layout: a dictionary (the layout decoded at top level only)
+    :param package_name: the resource package name
+    :return: a dictionary
+    """
+    packages = layout.setdefault('resourcePackages', [])
+    for package in packages:
+        if package['resourcePackage']['name'] == package_name:
+            return package['resourcePackage']
+    package = {
+        'name': package_name,
+        'type': 1 if package_name == 'RegisteredResources' else 2,
+        'items': [],
+        'disabled': False
+    }
+    packages.append({'resourcePackage': package})
+    return package
+
+
+@traced('resources.transfer')
+def transfer_resources(source_path, package_name, item_names, target_paths):
+    """
+    Copies resource package items (images, themes, etc.) from a .pbix file to many others, archive to archive.
+    Source items are read once; each target archive is rewritten once, with the items registered in its layout
+    resource packages. Items whose content is already present in a target (under any name) are not copied again.
+    NB: only the top level of the target layouts is decoded.
+    :param source_path: the path to the source .pbix file
+    :param package_name: the resource package name (e.g. 'RegisteredResources')
+    :param item_names: a string or a list of item names
+    :param target_paths: a list of paths to the target .pbix files
+    :return: a dictionary {target path: {item name: 'added', 'replaced', 'present' or the name of an identical item}}
+    """
+    if isinstance(item_names, str):
+        item_names = [item_names]
+    with zipfile.ZipFile(source_path) as source:
+        layout = json.loads(source.read(LAYOUT).decode(LAYOUT_ENCODING))
+        items = {item['name']: item for item in _get_package(layout, package_name)['items']}
+        data = {name: source.read(get_resource_member_name(package_name, items[name])) for name in item_names}
+    hashes = {name: hashlib.sha1(content).hexdigest() for name, content in data.items()}
+
+    res = {}
+    for target_path in target_paths:
+        res[target_path] = _transfer_to_target(target_path, package_name, items, data, hashes)
+    return res
+
+
+def _transfer_to_target(target_path, package_name, items, data, hashes):
+    """
+    Copies resource package items to a target .pbix file (see transfer_resources)
+    :return: a dictionary {item name: status}
+    """
+    res = {}
+    with zipfile.ZipFile(target_path) as target:
+        layout = json.loads(target.read(LAYOUT).decode(LAYOUT_ENCODING))
+        package = _get_package(layout, package_name)
+        existing = {item['name']: item for item in package['items']}
+        existing_hashes = {}
+        for item in package['items']:
+            member_name = get_resource_member_name(package_name, item)
+            if member_name in target.NameToInfo:
+                existing_hashes[hashlib.sha1(target.read(member_name)).hexdigest()] = item['name']
+    members = {}
+    for name, content in data.items():
+        identical = existing_hashes.get(hashes[name])
+        if identical is not None:
+            res[name] = 'present' if identical == name else identical
+            tracer.count('resources_deduplicated')
+            continue
+        members[get_resource_member_name(package_name, items[name])] = content
+        if name in existing:
+            res[name] = 'replaced'
+        else:
+            package['items'].append(dict(items[name]))
+            res[name] = 'added'
+    if members:
+        members[LAYOUT] = json.dumps(layout).encode(LAYOUT_ENCODING)
+        write_archive(target_path, members)
+    return res
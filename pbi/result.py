@@ -0,0 +1,71 @@
+class PbiUpdateResult:
+    """
+    The result of a bulk update of a report: the number of updates per page.
+    """
+
+    def __init__(self, title, columns, rows=None):
+        """
+        Creates an empty update result
+        :param title: a description of the update (string)
+        :param columns: the column names, the first one being the page (list of strings)
+        :param rows: a list of rows (lists) or None
+        """
+        self.title = title
+        self.columns = columns
+        self.rows = rows if rows is not None else []
+
+    def add(self, page_name, *counts):
+        """
+        Adds the number(s) of updates for a page
+        :param page_name: a string
+        :param counts: integers (or booleans)
+        :return: None
+        """
+        self.rows.append([page_name, *[int(count or 0) for count in counts]])
+
+    @property
+    def counts(self):
+        """
+        Returns the number(s) of updates per page
+        :return: a dictionary {page name: integer or tuple of integers}
+        """
+        return {row[0]: row[1] if len(row) == 2 else tuple(row[1:]) for row in self.rows}
+
+    @property
+    def total(self):
+        """
+        Returns the total number(s) of updates
+        :return: an integer or a tuple of integers
+        """
+        totals = [sum(row[i] for row in self.rows) for i in range(1, len(self.columns))]
+        return totals[0] if len(totals) == 1 else tuple(totals)
+
+    def __bool__(self):
+        return any(any(row[1:]) for row in self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f'PbiUpdateResult({self.title!r}, total={self.total})'
+
+    def __str__(self):
+        cells = [self.columns] + [[str(cell) for cell in row] for row in self.rows]
+        widths = [max(len(str(row[i])) for row in cells) for i in range(len(self.columns))]
+        lines = [
+            '  '.join(str(cell).ljust(width) if i == 0 else str(cell).rjust(width)
+                      for i, (cell, width) in enumerate(zip(row, widths)))
+            for row in cells
+        ]
+        return '\n'.join([f'{self.title}:'] + lines)
+
+    def to_frame(self):
+        """
+        Returns the result as a pandas DataFrame (pandas is only imported when this is called)
+        :return: a pandas DataFrame
+        """
+        import pandas as pd
+        return pd.DataFrame(self.rows, columns=self.columns)
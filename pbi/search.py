@@ -0,0 +1,326 @@
+import bisect
+import os
+import re
+
+from pbi.object import _PbiObject
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """
+    Splits a text into lower case words
+    :param text: a string
+    :return: a list of strings
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class PbiTextLocation:
+    """
+    A piece of text within a report, which can be read and edited in place.
+    """
+
+    def __init__(self, holder, key, kind, report=None, page=None, visual=None, quoted=False, owner=None):
+        """
+        Creates a text location
+        :param holder: the dictionary holding the text
+        :param key: the key of the text within the holder
+        :param kind: 'paragraph', 'title', 'button', 'group', 'page' or 'bookmark'
+        :param report: the report name or None
+        :param page: the Power BI page or None
+        :param visual: the Power BI container or None
+        :param quoted: a boolean, True if the text is a Power BI literal (between single quotes)
+        :param owner: the Power BI object holding the text, if neither the holder nor the visual
+        """
+        self.holder = holder
+        self.key = key
+        self.kind = kind
+        self.report = report
+        self.page = page
+        self.visual = visual
+        self.quoted = quoted
+        self.owner = owner if owner is not None else visual if visual is not None else holder
+
+    def __repr__(self):
+        page = None if self.page is None else self.page.display_name
+        visual = None if self.visual is None else self.visual.name
+        return f'PbiTextLocation({self.kind} {self.text!r} in {self.report}/{page}/{visual})'
+
+    @property
+    def text(self):
+        """
+        Returns the text at the location
+        :return: a string
+        """
+        text = self.holder[self.key]
+        if self.quoted and len(text) >= 2 and text[0] == text[-1] == "'":
+            return text[1:-1].replace("''", "'")
+        return text
+
+    def update_text(self, new_text):
+        """
+        Updates the text at the location (NB: the text index has to be updated afterwards)
+        :param new_text: a string
+        :return: None
+        """
+        if self.quoted:
+            new_text = "'" + new_text.replace("'", "''") + "'"
+        if isinstance(self.owner, _PbiObject):
+            self.owner._notify_write()
+        self.holder[self.key] = new_text
+
+    def replace(self, target, replacement):
+        """
+        Replaces a string by another within the text at the location
+        :param target: a string
+        :param replacement: a string
+        :return: a boolean whether the update actually happened
+        """
+        if target not in self.text:
+            return False
+        self.update_text(self.text.replace(target, replacement))
+        return True
+
+
+def _get_literal_holders(lst):
+    """
+    Returns the literal dictionaries holding the 'text' property of a list of formatting objects
+    :param lst: a list of dictionaries (e.g. objects 'text' or vcObjects 'title')
+    :return: a list of dictionaries
+    """
+    res = []
+    for item in lst:
+        try:
+            res.append(item['properties']['text']['expr']['Literal'])
+        except (KeyError, TypeError):
+            pass
+    return res
+
+
+def get_visual_text_locations(container, report=None, page=None):
+    """
+    Returns all the text locations of a visual: textbox paragraphs, title, button labels, group name
+    :param container: a Power BI container
+    :param report: the report name or None
+    :param page: the Power BI page or None
+    :return: a list of Power BI text locations
+    """
+    location = {'report': report, 'page': page, 'visual': container}
+    config = container['config']
+    if 'singleVisualGroup' in config:
+        return [PbiTextLocation(config['singleVisualGroup'], 'displayName', 'group', **location)]
+    res = []
+    single_visual = config.get('singleVisual', {})
+    objects = single_visual.get('objects', {})
+    for general in objects.get('general', []):
+        for paragraph in general.get('properties', {}).get('paragraphs', []):
+            for text_run in paragraph.get('textRuns', []):
+                if 'value' in text_run:
+                    res.append(PbiTextLocation(text_run, 'value', 'paragraph', **location))
+    res += [
+        PbiTextLocation(literal, 'Value', 'title', quoted=True, **location)
+        for literal in _get_literal_holders(single_visual.get('vcObjects', {}).get('title', []))
+    ]
+    res += [
+        PbiTextLocation(literal, 'Value', 'button', quoted=True, **location)
+        for literal in _get_literal_holders(objects.get('text', []))
+    ]
+    return res
+
+
+class PbiTextIndex:
+    """
+    An inverted index over the texts of reports: textbox paragraphs, visual titles, button labels, group names,
+    page names and bookmark names.
+    """
+
+    def __init__(self):
+        """
+        Creates an empty text index
+        """
+        self.postings = {}
+        self.owners = {}
+        self._location_tokens = {}
+        self.reports = {}
+        self._sorted_tokens = None
+
+    def _index_location(self, location):
+        """
+        Adds a location under the words of its current text
+        :param location: a Power BI text location
+        :return: None
+        """
+        tokens = set(tokenize(location.text))
+        self._location_tokens[id(location)] = tokens
+        for token in tokens:
+            if token not in self.postings:
+                self._sorted_tokens = None
+            self.postings.setdefault(token, {})[id(location)] = location
+
+    def _unindex_location(self, location):
+        """
+        Removes a location from the words it was indexed under
+        :param location: a Power BI text location
+        :return: None
+        """
+        for token in self._location_tokens.pop(id(location), set()):
+            postings = self.postings[token]
+            postings.pop(id(location))
+            if not postings:
+                del self.postings[token]
+                self._sorted_tokens = None
+
+    def _add_locations(self, owner, locations):
+        """
+        Indexes the given locations for the given owner (visual, page, bookmark)
+        :param owner: the object owning the locations
+        :param locations: a list of Power BI text locations
+        :return: None
+        """
+        self._remove_owner(owner)
+        self.owners[id(owner)] = locations
+        for location in locations:
+            self._index_location(location)
+
+    def _remove_owner(self, owner):
+        """
+        Removes the locations of the given owner from the index
+        :param owner: the object owning the locations
+        :return: None
+        """
+        for location in self.owners.pop(id(owner), []):
+            self._unindex_location(location)
+
+    def add_visual(self, container, page=None, report=None):
+        """
+        Indexes (or re-indexes after an edit) the texts of a visual
+        :param container: a Power BI container
+        :param page: the Power BI page of the visual or None
+        :param report: the report name or None
+        :return: None
+        """
+        self._add_locations(container, get_visual_text_locations(container, report, page))
+
+    def remove_visual(self, container):
+        """
+        Removes the texts of a visual from the index
+        :param container: a Power BI container
+        :return: None
+        """
+        self._remove_owner(container)
+
+    def add_page(self, page, report=None):
+        """
+        Indexes (or re-indexes after an edit) the page name and the texts of all the visuals of a page
+        :param page: a Power BI page
+        :param report: the report name or None
+        :return: None
+        """
+        self._add_locations(page, [PbiTextLocation(page, 'displayName', 'page', report=report, page=page)])
+        for container in page['visualContainers']:
+            self.add_visual(container, page, report)
+
+    def add_layout(self, layout, report=None):
+        """
+        Indexes the texts of all the pages, visuals and bookmarks of a layout
+        :param layout: a Power BI layout
+        :param report: the report name or None
+        :return: None
+        """
+        for page in layout['sections']:
+            self.add_page(page, report)
+        for bookmark in layout['config'].get('bookmarks', []):
+            locations = [PbiTextLocation(bookmark, 'displayName', 'bookmark', report=report)]
+            locations += [
+                PbiTextLocation(child, 'displayName', 'bookmark', report=report, owner=bookmark)
+                for child in bookmark.get('children', [])
+            ]
+            self._add_locations(bookmark, locations)
+
+    def add_report(self, report):
+        """
+        Indexes the texts of a report
+        :param report: a Power BI report
+        :return: None
+        """
+        self.reports[report.filename] = report
+        self.add_layout(report.layout, report.filename)
+
+    @classmethod
+    def from_folder(cls, folder, report_class=None):
+        """
+        Builds the text index of all the reports of a folder
+        :param folder: a path to a local folder
+        :param report_class: the report class used to open the reports (default is PbiReport)
+        :return: a Power BI text index
+        """
+        if report_class is None:
+            from pbi.report import PbiReport
+            report_class = PbiReport
+        index = cls()
+        for file in sorted(os.listdir(folder)):
+            filename, ext = os.path.splitext(file)
+            if ext == f'.{report_class.ext}':
+                index.add_report(report_class(folder, filename))
+        return index
+
+    @property
+    def tokens(self):
+        """
+        Returns the sorted list of indexed words
+        :return: a list of strings
+        """
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.postings)
+        return self._sorted_tokens
+
+    def _get_token_locations(self, token, prefix):
+        """
+        Returns the locations of a word or of all the words starting with a prefix
+        :param token: a string
+        :param prefix: a boolean
+        :return: a dictionary of locations by id
+        """
+        if not prefix:
+            return dict(self.postings.get(token, {}))
+        res = {}
+        tokens = self.tokens
+        for i in range(bisect.bisect_left(tokens, token), len(tokens)):
+            if not tokens[i].startswith(token):
+                break
+            res.update(self.postings[tokens[i]])
+        return res
+
+    def search(self, text, prefix=False, kinds=None):
+        """
+        Returns the locations containing all the words of the given text
+        :param text: a string
+        :param prefix: a boolean, True to match the last word as a prefix (e.g. 'sal' matches 'sales')
+        :param kinds: a list of location kinds (e.g. ['title', 'button']) or None
+        :return: a list of Power BI text locations
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        res = None
+        for i, token in enumerate(tokens):
+            found = self._get_token_locations(token, prefix and i == len(tokens) - 1)
+            res = found if res is None else {key: res[key] for key in res if key in found}
+        return [location for location in res.values() if kinds is None or location.kind in kinds]
+
+    def replace(self, target, replacement, kinds=None):
+        """
+        Replaces a string by another in all the indexed locations containing it, and updates the index
+        :param target: a string
+        :param replacement: a string
+        :param kinds: a list of location kinds or None
+        :return: the number of updates
+        """
+        res = 0
+        for location in self.search(target, kinds=kinds):
+            if location.replace(target, replacement):
+                res += 1
+                self._unindex_location(location)
+                self._index_location(location)
+        return res
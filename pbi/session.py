@@ -0,0 +1,160 @@
+from pbi.archive import CONNECTIONS, LAYOUT, LAYOUT_ENCODING, read_member, write_archive
+from pbi.connections import PbiConnections
+from pbi.resources import get_resource_member_name
+from pbi.trace import traced
+
+
+class PbiEditSession:
+    """
+    An edit session on a Power BI report: layout edits, resource package copies, dataset rebinds and static file
+    changes are staged in memory, and the .pbix archive is written exactly once on commit (or left untouched on
+    rollback, and the layout restored as it was when the session was opened).
+    NB: the layout is restored through a checkpoint, so only edits made through the library methods are rolled back.
+    """
+
+    def __init__(self, report):
+        """
+        Creates an edit session on the given report
+        :param report: a Power BI report
+        """
+        self.report = report
+        self.files = {}
+        self.removals = set()
+        self.dataset_ids = {}
+        self.workspace_ids = {}
+        self.active = False
+        self._layout = None
+        self._checkpoint = None
+
+    def __enter__(self):
+        if self.report._session is not None:
+            raise RuntimeError(f'An edit session is already open on report {self.report.filename}.')
+        self.report._session = self
+        self.active = True
+        self._layout = self.report._layout
+        if self._layout is not None:
+            self._checkpoint = self._layout.checkpoint()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def _close(self):
+        """
+        Ends the session
+        :return: None
+        """
+        self.active = False
+        self.report._session = None
+        if self._checkpoint is not None:
+            self._checkpoint.release()
+            self._checkpoint = None
+
+    def read_file(self, name):
+        """
+        Returns the content of a file of the report, as staged in the session
+        :param name: the member name in the archive (e.g. 'Report/StaticResources/RegisteredResources/logo.png')
+        :return: bytes or None if the file does not exist
+        """
+        if name in self.removals:
+            return None
+        if name in self.files:
+            return self.files[name]
+        return read_member(self.report.path, name)
+
+    def write_file(self, name, data):
+        """
+        Stages the creation or replacement of a file of the report
+        :param name: the member name in the archive
+        :param data: bytes
+        :return: None
+        """
+        self.removals.discard(name)
+        self.files[name] = data
+
+    def remove_file(self, name):
+        """
+        Stages the removal of a file of the report
+        :param name: the member name in the archive
+        :return: None
+        """
+        self.files.pop(name, None)
+        self.removals.add(name)
+
+    def add_resource_package(self, report, name, item):
+        """
+        Stages the addition of a resource package item (both in layout and linked files) from another report
+        :param report: the report with the resource package to add
+        :param name: the name of the resource package
+        :param item: the actual resource package item (dictionary)
+        :return: None
+        :raise KeyError: if the file of the item is missing from the other report
+        """
+        path = get_resource_member_name(name, item)
+        data = report._session.read_file(path) if report._session is not None else read_member(report.path, path)
+        if data is None:
+            raise KeyError(f'The resource file {path} is missing from report {report.filename}.')
+        items = self.report.layout.get_resource_package(name)['items']
+        if item['name'] not in [existing_item['name'] for existing_item in items]:
+            self.report.layout.add_resource_packages(name, item)
+        self.write_file(path, data)
+
+    def rebind_dataset(self, dataset_id_from, dataset_id_to):
+        """
+        Stages the replacement of a dataset id by another in the report connections
+        :param dataset_id_from: a string
+        :param dataset_id_to: a string
+        :return: None
+        """
+        if dataset_id_from is not None and dataset_id_to is not None and dataset_id_to != dataset_id_from:
+            self.dataset_ids[dataset_id_from] = dataset_id_to
+
+    def rebind(self, dataset_ids=None, workspace_ids=None):
+        """
+        Stages the rebinding of the report to other datasets (and workspaces)
+        :param dataset_ids: a dictionary {dataset id from: dataset id to} or None
+        :param workspace_ids: a dictionary {workspace id from: workspace id to} or None
+        :return: None
+        """
+        self.dataset_ids.update(dataset_ids or {})
+        self.workspace_ids.update(workspace_ids or {})
+
+    @traced('session.commit')
+    def commit(self):
+        """
+        Writes the layout and all staged changes to the .pbix archive, in a single pass
+        :return: None
+        """
+        files = dict(self.files)
+        if self.report._layout is not None:  # a layout never parsed is unchanged
+            files[LAYOUT] = self.report.layout.export().encode(LAYOUT_ENCODING)
+        data = self.read_file(CONNECTIONS) if self.dataset_ids or self.workspace_ids else None
+        if data is not None:
+            connections = PbiConnections.from_bytes(data)
+            if connections.rebind(self.dataset_ids, self.workspace_ids):
+                files[CONNECTIONS] = connections.to_bytes()
+        try:
+            write_archive(self.report.path, files, self.removals)
+        finally:
+            self._close()
+        self.report._load_connections()
+
+    @traced('session.rollback')
+    def rollback(self):
+        """
+        Discards all staged changes and the layout edits made within the session: the layout is restored as it was when
+        the session was opened (edits made before are kept), or reloaded from the (untouched) .pbix archive if it was
+        not parsed yet
+        :return: None
+        """
+        if self._checkpoint is None:
+            self._close()
+            self.report._load()
+            return None
+        self._checkpoint.rollback()
+        self.report.layout = self._layout
+        self._close()
@@ -0,0 +1,187 @@
+import numpy as np
+
+
+class PbiSpatialIndex:
+    """
+    A spatial index over the bounding boxes of the containers of a Power BI page.
+    All queries are run as vectorized operations on arrays of coordinates.
+    """
+
+    def __init__(self, page):
+        """
+        Creates a spatial index for the given page
+        :param page: a Power BI page
+        """
+        self.page = page
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuilds the coordinate arrays from the page containers (to be called after visuals are added or removed)
+        :return: None
+        """
+        self.containers = list(self.page['visualContainers'])
+        boxes = [
+            [container['x'], container['y'], container['width'], container['height'], container.get('z', 0)]
+            for container in self.containers
+        ]
+        boxes = np.array(boxes, dtype=float).reshape(-1, 5)
+        self.x = boxes[:, 0]
+        self.y = boxes[:, 1]
+        self.width = boxes[:, 2]
+        self.height = boxes[:, 3]
+        self.z = boxes[:, 4]
+        self.is_group = np.array([container.is_group for container in self.containers], dtype=bool)
+
+    @property
+    def x2(self):
+        """
+        Returns the right edges of the containers
+        :return: a numpy array
+        """
+        return self.x + self.width
+
+    @property
+    def y2(self):
+        """
+        Returns the bottom edges of the containers
+        :return: a numpy array
+        """
+        return self.y + self.height
+
+    @property
+    def centers(self):
+        """
+        Returns the centers of the containers
+        :return: a numpy array of shape (n, 2)
+        """
+        return np.column_stack([self.x + self.width / 2, self.y + self.height / 2])
+
+    def _select(self, mask):
+        """
+        Returns the containers selected by a boolean mask
+        :param mask: a numpy array of booleans
+        :return: a list of Power BI containers
+        """
+        return [self.containers[i] for i in np.flatnonzero(mask)]
+
+    def _mask(self, include_groups):
+        """
+        Returns the mask of the containers to consider
+        :param include_groups: a boolean
+        :return: a numpy array of booleans
+        """
+        if include_groups:
+            return np.ones(len(self.containers), dtype=bool)
+        return ~self.is_group
+
+    def get_visuals_in_region(self, x, y, width, height, contained=False, include_groups=False):
+        """
+        Returns the containers intersecting (or fully contained in) the given region, e.g. a header band
+        :param x: the left edge of the region
+        :param y: the top edge of the region
+        :param width: the width of the region
+        :param height: the height of the region
+        :param contained: a boolean, True to only return the containers fully inside the region
+        :param include_groups: a boolean, True to also return visual groups
+        :return: a list of Power BI containers
+        """
+        if contained:
+            mask = (self.x >= x) & (self.y >= y) & (self.x2 <= x + width) & (self.y2 <= y + height)
+        else:
+            mask = (self.x < x + width) & (self.x2 > x) & (self.y < y + height) & (self.y2 > y)
+        return self._select(mask & self._mask(include_groups))
+
+    def get_overlaps(self, include_groups=False):
+        """
+        Returns all the pairs of containers whose bounding boxes overlap
+        :param include_groups: a boolean, True to also consider visual groups
+        :return: a list of tuples of Power BI containers
+        """
+        idx = np.flatnonzero(self._mask(include_groups))
+        x, y, x2, y2 = self.x[idx], self.y[idx], self.x2[idx], self.y2[idx]
+        overlap = (
+            (x[:, None] < x2[None, :]) & (x2[:, None] > x[None, :])
+            & (y[:, None] < y2[None, :]) & (y2[:, None] > y[None, :])
+        )
+        rows, cols = np.nonzero(np.triu(overlap, k=1))
+        return [(self.containers[idx[i]], self.containers[idx[j]]) for i, j in zip(rows, cols)]
+
+    def get_off_canvas(self, include_groups=False):
+        """
+        Returns the containers that are (even partially) outside of the page
+        :param include_groups: a boolean, True to also consider visual groups
+        :return: a list of Power BI containers
+        """
+        mask = (self.x < 0) | (self.y < 0) | (self.x2 > self.page['width']) | (self.y2 > self.page['height'])
+        return self._select(mask & self._mask(include_groups))
+
+    def get_nearest(self, x, y, k=1, include_groups=False):
+        """
+        Returns the k containers whose centers are the nearest to the given point
+        :param x: the x coordinate of the point
+        :param y: the y coordinate of the point
+        :param k: the number of containers to return
+        :param include_groups: a boolean, True to also consider visual groups
+        :return: a list of Power BI containers, the nearest first
+        """
+        idx = np.flatnonzero(self._mask(include_groups))
+        distances = np.hypot(*(self.centers[idx] - np.array([x, y])).T)
+        order = np.argsort(distances, kind='stable')[:k]
+        return [self.containers[idx[i]] for i in order]
+
+    def _indices(self, visuals):
+        """
+        Returns the indices of the given visuals in the index
+        :param visuals: a list of Power BI containers
+        :return: a numpy array of integers
+        """
+        positions = {id(container): i for i, container in enumerate(self.containers)}
+        return np.array([positions[id(visual)] for visual in visuals], dtype=int)
+
+    def _write_back(self, idx):
+        """
+        Writes the coordinates of the given indices back to the containers
+        :param idx: a numpy array of integers
+        :return: None
+        """
+        for i in idx:
+            self.containers[i].update_position(
+                x=float(self.x[i]),
+                y=float(self.y[i]),
+                width=float(self.width[i]),
+                height=float(self.height[i])
+            )
+
+    def move(self, visuals, dx=0, dy=0):
+        """
+        Moves the given visuals (e.g. a whole group) by the given offsets
+        :param visuals: a list of Power BI containers
+        :param dx: the horizontal offset
+        :param dy: the vertical offset
+        :return: None
+        """
+        idx = self._indices(visuals)
+        self.x[idx] += dx
+        self.y[idx] += dy
+        self._write_back(idx)
+
+    def resize(self, visuals, scale_x=1, scale_y=1, origin=None):
+        """
+        Resizes the given visuals (e.g. a whole group) by the given factors, relative to an origin
+        :param visuals: a list of Power BI containers
+        :param scale_x: the horizontal factor
+        :param scale_y: the vertical factor
+        :param origin: a (x, y) tuple or None (default is the top left corner of the visuals)
+        :return: None
+        """
+        idx = self._indices(visuals)
+        if not len(idx):
+            return None
+        if origin is None:
+            origin = self.x[idx].min(), self.y[idx].min()
+        self.x[idx] = origin[0] + (self.x[idx] - origin[0]) * scale_x
+        self.y[idx] = origin[1] + (self.y[idx] - origin[1]) * scale_y
+        self.width[idx] *= scale_x
+        self.height[idx] *= scale_y
+        self._write_back(idx)
@@ -0,0 +1,105 @@
+import os
+import re
+import zipfile
+from urllib.parse import unquote
+
+from pbi.archive import CONNECTIONS, read_member, write_archive
+from pbi.connections import PbiConnections
+from pbi.trace import traced, tracer
+
+CONTENT_TYPES = '[Content_Types].xml'
+THICK_MEMBERS = {'DataModel', 'DataMashup', 'DiagramLayout'}
+OVERRIDE_PATTERN = re.compile(rb'\s*<Override\s[^>]*?PartName="/?([^"]*)"[^>]*?/>')
+
+
+def get_thick_members(path):
+    """
+    Returns the members of a .pbix archive that a live-connected report does not need (the embedded data model, its
+    queries and diagram layout), which the service ignores for reports bound to a shared dataset
+    :param path: the path to the .pbix file
+    :return: a list of member names
+    """
+    with zipfile.ZipFile(path) as archive:
+        return [name for name in archive.namelist() if name.split('/')[0] in THICK_MEMBERS]
+
+
+def strip_content_types(data, removals):
+    """
+    Removes the overrides of removed members from the content of the '[Content_Types].xml' member (the rest of the
+    document is kept byte for byte)
+    :param data: bytes
+    :param removals: a collection of member names
+    :return: bytes
+    """
+    removals = set(removals)
+    return OVERRIDE_PATTERN.sub(
+        lambda match: b'' if unquote(match.group(1).decode('utf-8')) in removals else match.group(0),
+        data
+    )
+
+
+def check_binding(connections, dataset_id=None):
+    """
+    Checks that report connections bind the report to a shared dataset (the one given, if any)
+    :param connections: Power BI connections or None
+    :param dataset_id: the id of the dataset the report must be bound to, or None (any dataset)
+    :return: the set of dataset ids the report is bound to
+    """
+    if connections is None:
+        raise ValueError('The report has no connection file: it is not bound to a shared dataset.')
+    res = {connection.dataset_id for connection in connections.connections} - {None}
+    if not res:
+        raise ValueError('The report is not bound to a shared dataset.')
+    if dataset_id is not None and dataset_id not in res:
+        raise ValueError(f'The report is bound to {", ".join(sorted(res))}, not to {dataset_id}.')
+    return res
+
+
+@traced('thin.write')
+def write_thin_archive(path, target_path, members=None, dataset_ids=None, workspace_ids=None, dataset_id=None):
+    """
+    Writes a thin copy of a .pbix archive, with only the report definition, resources and connections: the data model
+    members are dropped (and their content type overrides removed), and the dataset binding is checked beforehand
+    :param path: the path to the source .pbix file
+    :param target_path: the path to the thin .pbix file
+    :param members: a dictionary {member name: bytes} of members to replace or add (e.g. an edited layout) or None
+    :param dataset_ids: a dictionary {dataset id from: dataset id to} to rebind the thin report, or None
+    :param workspace_ids: a dictionary {workspace id from: workspace id to} to rebind the thin report, or None
+    :param dataset_id: the id of the dataset the thin report must be bound to, or None (any dataset)
+    :return: the list of member names dropped
+    """
+    members = dict(members or {})
+    data = members.get(CONNECTIONS) or read_member(path, CONNECTIONS)
+    connections = None if data is None else PbiConnections.from_bytes(data)
+    if connections is not None and connections.rebind(dataset_ids, workspace_ids):
+        members[CONNECTIONS] = connections.to_bytes()
+    check_binding(connections, dataset_id)
+    removals = get_thick_members(path)
+    content_types = members.get(CONTENT_TYPES) or read_member(path, CONTENT_TYPES)
+    if content_types is not None:
+        members[CONTENT_TYPES] = strip_content_types(content_types, removals)
+    write_archive(path, members, removals, target_path)
+    tracer.count('members_dropped', len(removals))
+    return removals
+
+
+@traced('thin.write_folder')
+def write_thin_folder(folder, new_folder, dataset_ids=None, workspace_ids=None, dataset_id=None):
+    """
+    Writes thin copies of all the .pbix files of a folder (e.g. to an upload folder), without reading their layouts
+    :param folder: a path to a local folder
+    :param new_folder: the path to the folder where to write the thin copies
+    :param dataset_ids: a dictionary {dataset id from: dataset id to} to rebind the thin reports, or None
+    :param workspace_ids: a dictionary {workspace id from: workspace id to} to rebind the thin reports, or None
+    :param dataset_id: the id of the dataset the thin reports must be bound to, or None (any dataset)
+    :return: a dictionary {report name: list of member names dropped}
+    """
+    res = {}
+    for file in sorted(os.listdir(folder)):
+        filename, ext = os.path.splitext(file)
+        if ext == '.pbix':
+            res[filename] = write_thin_archive(
+                os.path.join(folder, file), os.path.join(new_folder, file), None, dataset_ids, workspace_ids,
+                dataset_id
+            )
+    return res
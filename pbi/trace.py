@@ -0,0 +1,221 @@
+import functools
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    """
+    The span used when tracing is disabled: does nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class PbiSpan:
+    """
+    A timed span of a Power BI job (e.g. opening a report, parsing a layout), possibly nested in another span.
+    """
+
+    def __init__(self, tracer, name, attributes):
+        """
+        Creates a span
+        :param tracer: the Power BI tracer recording the span
+        :param name: the span name (string)
+        :param attributes: a dictionary of attributes
+        """
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.counters = {}
+        self.parent = None
+        self.start = None
+        self.duration = None
+        self.thread = None
+
+    def __enter__(self):
+        stack = self.tracer._get_stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.duration = time.perf_counter() - self.start
+        self.tracer._get_stack().pop()
+        self.tracer._finish(self)
+        return False
+
+    @property
+    def depth(self):
+        """
+        Returns the nesting depth of the span
+        :return: an integer
+        """
+        return 0 if self.parent is None else self.parent.depth + 1
+
+    def to_dict(self):
+        """
+        Returns the span as a dictionary
+        :return: a dictionary
+        """
+        return {
+            'name': self.name,
+            'start': self.start,
+            'duration': self.duration,
+            'depth': self.depth,
+            'parent': None if self.parent is None else self.parent.name,
+            'attributes': self.attributes,
+            'counters': self.counters
+        }
+
+
+class PbiTracer:
+    """
+    Records nested timing spans and counters (bytes read and written, objects decoded, containers touched, etc.).
+    Disabled by default: spans and counters then cost a single attribute check.
+    """
+
+    def __init__(self):
+        """
+        Creates a disabled tracer
+        """
+        self.enabled = False
+        self.callback = None
+        self.spans = []
+        self.counters = {}
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def _get_stack(self):
+        """
+        Returns the stack of open spans of the current thread
+        :return: a list of Power BI spans
+        """
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def enable(self, callback=None):
+        """
+        Enables tracing
+        :param callback: a function called with each finished span, or None to only record them
+        :return: None
+        """
+        self.callback = callback
+        self.enabled = True
+
+    def disable(self):
+        """
+        Disables tracing
+        :return: None
+        """
+        self.enabled = False
+        self.callback = None
+
+    def reset(self):
+        """
+        Removes all recorded spans and counters
+        :return: None
+        """
+        self.spans = []
+        self.counters = {}
+        self._origin = time.perf_counter()
+
+    def span(self, name, **attributes):
+        """
+        Returns a context manager timing the enclosed block
+        :param name: the span name (string)
+        :param attributes: keywords recorded with the span
+        :return: a context manager
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return PbiSpan(self, name, attributes)
+
+    def count(self, name, value=1):
+        """
+        Increments a counter, globally and for all the currently open spans
+        :param name: the counter name (string)
+        :param value: the increment (number)
+        :return: None
+        """
+        if not self.enabled:
+            return None
+        self.counters[name] = self.counters.get(name, 0) + value
+        for span in self._get_stack():
+            span.counters[name] = span.counters.get(name, 0) + value
+
+    def _finish(self, span):
+        """
+        Records a finished span
+        :param span: a Power BI span
+        :return: None
+        """
+        self.spans.append(span)
+        if self.callback is not None:
+            self.callback(span)
+
+    def get_summary(self):
+        """
+        Returns the total duration and number of calls per span name
+        :return: a dictionary {name: {'calls': integer, 'duration': float}}
+        """
+        res = {}
+        for span in self.spans:
+            summary = res.setdefault(span.name, {'calls': 0, 'duration': 0.0})
+            summary['calls'] += 1
+            summary['duration'] += span.duration
+        return res
+
+    def export(self, path):
+        """
+        Exports the recorded spans as a JSON trace (Trace Event Format, readable by chrome://tracing or Perfetto)
+        :param path: the path to the trace file
+        :return: None
+        """
+        events = [
+            {
+                'name': span.name,
+                'ph': 'X',
+                'ts': (span.start - self._origin) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': os.getpid(),
+                'tid': span.thread,
+                'args': {**span.attributes, **span.counters}
+            }
+            for span in self.spans
+        ]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'otherData': {'counters': self.counters}}, file, default=str)
+
+
+tracer = PbiTracer()
+
+
+def traced(name):
+    """
+    Decorates a function or method to record a span at each call when tracing is enabled
+    :param name: the span name (string)
+    :return: a decorator
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
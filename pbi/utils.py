@@ -1,18 +1,106 @@
-import ctypes
+import json
 import subprocess
 import sys
+import time
 
+EVENT_PREFIX = '##pbi '
 
-def run_ps_script(ps_script):
+PS_EVENT_FUNCTION = f'''
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+function Write-PbiEvent($name, $report, $data = @{{}})
+{{
+    $record = [ordered]@{{ event = $name; report = $report }}
+    foreach ($key in $data.Keys) {{ $record[$key] = $data[$key] }}
+    [Console]::Out.WriteLine("{EVENT_PREFIX}" + ($record | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}}
+'''
+
+
+def _parse_event(line):
+    """
+    Parses a line of PowerShell output as a structured event (a json line written by Write-PbiEvent)
+    :param line: a string
+    :return: a dictionary or None if the line is not an event
+    """
+    if not line.startswith(EVENT_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(EVENT_PREFIX):])
+    except ValueError:
+        return None
+
+
+def iter_ps_script(ps_script, echo=True):
+    """
+    Runs a PowerShell script and yields its structured events as they are written ('start', 'finish' and 'error'
+    events per report, with 'bytes' when known). Each event gets the time it was received and, for 'finish' and
+    'error' events, the duration since the 'start' event of the same report. Other output lines are echoed.
+    A RuntimeError is raised once the script ends if its exit code is not 0.
+    :param ps_script: a PowerShell script (the Write-PbiEvent function is defined beforehand)
+    :param echo: a boolean, True to write the other output lines to sys.stdout
+    :return: a generator of dictionaries
+    """
     p = subprocess.Popen(
         [
             "powershell.exe",
-            ps_script
+            PS_EVENT_FUNCTION + ps_script
         ],
-        stdout=sys.stdout
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
     )
-    p.communicate()
+    starts = {}
+    try:
+        for line in p.stdout:
+            line = line.rstrip('\r\n')
+            event = _parse_event(line)
+            if event is None:
+                if echo:
+                    sys.stdout.write(line + '\n')
+                continue
+            event['time'] = time.time()
+            if event.get('event') == 'start':
+                starts[event.get('report')] = event['time']
+            elif event.get('report') in starts:
+                event['duration'] = event['time'] - starts.pop(event.get('report'))
+            yield event
+    except GeneratorExit:
+        p.kill()
+        raise
+    finally:
+        p.stdout.close()
+        returncode = p.wait()
+    if returncode != 0:
+        raise RuntimeError(f'The PowerShell script failed with exit code {returncode}.')
+
+
+def run_ps_script(ps_script, check=True):
+    """
+    Runs a PowerShell script and returns its structured events (see iter_ps_script)
+    :param ps_script: a PowerShell script
+    :param check: a boolean, True to raise a RuntimeError if the script failed or reported errors
+    :return: a list of dictionaries
+    """
+    res = []
+    failure = None
+    try:
+        for event in iter_ps_script(ps_script):
+            res.append(event)
+    except RuntimeError as error:
+        failure = error
+    errors = [event for event in res if event.get('event') == 'error']
+    if check and errors:
+        raise RuntimeError(
+            'The PowerShell script reported errors: '
+            + '; '.join(f"{event.get('report')}: {event.get('message')}" for event in errors)
+        )
+    if check and failure is not None:
+        raise failure
+    return res
 
 
 def message_box(title, text, style):
-    return ctypes.windll.user32.MessageBoxW(0, text, title, style)
\ No newline at end of file
+    import ctypes
+    return ctypes.windll.user32.MessageBoxW(0, text, title, style)
@@ -0,0 +1,99 @@
+import copy
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from pbi.archive import CONNECTIONS, LAYOUT, LAYOUT_ENCODING, write_archive
+from pbi.layout import dump_tree
+from pbi.trace import traced, tracer
+
+
+class PbiVariant:
+    """
+    A variant of a report (e.g. a dev, test or prod copy, or a regional copy): its own edits, dataset rebinding and
+    static files, applied on a copy of the source report when the variant is built.
+    """
+    ext = 'pbix'
+
+    def __init__(self, filename, edit=None, dataset_ids=None, files=None, folder=None):
+        """
+        Creates a report variant
+        :param filename: the name of the variant .pbix file
+        :param edit: a function taking a copy of the source report and editing it in place for the variant, or None
+        :param dataset_ids: a dictionary {dataset id from: dataset id to} to rebind the variant, or None
+        :param files: a dictionary {member name: bytes} of static files to add or replace, or None
+        :param folder: the folder of the variant .pbix file or None (same folder as the source report)
+        """
+        self.filename = filename
+        self.edit = edit
+        self.dataset_ids = dataset_ids or {}
+        self.files = files or {}
+        self.folder = folder
+
+    def get_path(self, report):
+        """
+        Returns the path to the variant .pbix file
+        :param report: the source report
+        :return: a string
+        """
+        return report._get_path(report.folder if self.folder is None else self.folder, self.filename)
+
+
+def _get_members(report, variant, layout, tree):
+    """
+    Returns the members of a variant that differ from the source report: its layout, connections and static files.
+    The variant edits are applied on an independent copy of the source report, with its own layout loaded from the
+    object tree of the source layout and its own connections, so that no edit (even made directly on the dictionaries)
+    leaks into the source report or the other variants.
+    :param report: the source report
+    :param variant: a report variant
+    :param layout: the exported source layout (bytes) if it was parsed (it may have unsaved changes) or None
+    :param tree: the pickled object tree of the source layout (see pbi.layout.dump_tree) or None if no variant has
+    edits
+    :return: a dictionary {member name: bytes}
+    """
+    members = dict(variant.files)
+    connections = None
+    if report.connections is not None and (variant.edit is not None or variant.dataset_ids):
+        connections = copy.deepcopy(report.connections)
+    if variant.edit is not None:
+        variant_report = copy.copy(report)
+        variant_report.connections = connections
+        variant_report.layout = pickle.loads(tree)
+        variant.edit(variant_report)
+        connections = variant_report.connections
+        members[LAYOUT] = variant_report.layout.export().encode(LAYOUT_ENCODING)
+    elif layout is not None:
+        members[LAYOUT] = layout
+    if connections is not None:
+        connections.rebind(variant.dataset_ids)
+        if connections != report.connections:
+            members[CONNECTIONS] = connections.to_bytes()
+    return members
+
+
+@traced('variant.build')
+def build_variants(report, variants, max_workers=None):
+    """
+    Builds variants of a report parsed once: the edits of each variant are applied on its own copy of the source
+    layout (loaded from the object tree of the layout, without parsing json again), then all the variant .pbix files
+    are written in parallel. The members that a variant does not change (data model, resources, etc.) are streamed
+    from the source archive as they are. The source layout is taken as it is in memory (unsaved changes included) and
+    exported once for the variants without edits, so that all the variants share the same base layout.
+    :param report: the source report
+    :param variants: a list of report variants
+    :param max_workers: the maximum number of threads writing the variants or None (default of ThreadPoolExecutor)
+    :return: a dictionary {variant name: path to the variant .pbix file}
+    """
+    if report._session is not None:
+        raise RuntimeError(f'Cannot build variants while an edit session is open on report {report.filename}.')
+    layout = None
+    if report._layout is not None:
+        layout = report.layout.export().encode(LAYOUT_ENCODING)
+    tree = None
+    if any(variant.edit is not None for variant in variants):
+        tree = dump_tree(report.layout)
+    tasks = [(variant.get_path(report), _get_members(report, variant, layout, tree)) for variant in variants]
+    tracer.count('variants_built', len(tasks))
+    with ThreadPoolExecutor(max_workers) as executor:
+        list(executor.map(lambda task: write_archive(report.path, task[1], target_path=task[0]), tasks))
+    return {variant.filename: path for variant, (path, _) in zip(variants, tasks)}
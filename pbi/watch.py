@@ -0,0 +1,239 @@
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pbi.archive import get_file_hash
+from pbi.trace import traced, tracer
+
+PARTIAL_FOLDER = '.partial'
+
+
+def _process_file(args):
+    """
+    Applies the operations of a watcher on a report and writes the result to the upload folder, or nothing if an
+    operation fails (used by PbiWatcher, in a worker process). The report is processed in a partial folder within the
+    upload folder and only moved to the upload folder once all operations succeeded, so that an uploader never sees a
+    partially processed report.
+    :param args: a (folder, filename, upload folder, operations, report class, thin) tuple
+    :return: a dictionary with 'status' ('done' or 'error'), 'duration' and 'message' keys
+    """
+    folder, filename, upload_folder, operations, report_class, thin = args
+    start = time.perf_counter()
+    partial_folder = os.path.join(upload_folder, PARTIAL_FOLDER)
+    report = None
+    try:
+        os.makedirs(partial_folder, exist_ok=True)
+        source = report_class(folder, filename)
+        if thin:
+            report = source.export_thin(filename, partial_folder)
+        else:
+            report = source.copy(filename, partial_folder)
+        with report.edit():
+            for operation in operations:
+                getattr(report, operation['method'])(*operation.get('args', []), **operation.get('kwargs', {}))
+        os.replace(report.path, report._get_path(upload_folder, filename))
+        status, message = 'done', None
+    except Exception as error:
+        status, message = 'error', f'{type(error).__name__}: {error}'
+        if report is not None and os.path.exists(report.path):
+            os.remove(report.path)
+    return {'status': status, 'duration': time.perf_counter() - start, 'message': message}
+
+
+def _get_result(future):
+    """
+    Returns the result of a processing, or an 'interrupted' result (processed again later) if the worker died
+    (BrokenProcessPool) or was interrupted
+    :param future: a future of _process_file
+    :return: a dictionary with 'status', 'duration' and 'message' keys
+    """
+    try:
+        return future.result()
+    except (Exception, KeyboardInterrupt) as error:
+        return {'status': 'interrupted', 'duration': None, 'message': f'{type(error).__name__}: {error}'}
+
+
+class PbiWatcher:
+    """
+    A watcher over a download folder: the reports dropped in the folder are processed once they are completely written
+    (their size and modification time did not change for a while), by applying a list of report operations on a
+    worker pool and writing the results to the upload folder. A state file records the processed files, so that a
+    restarted watcher does not process unchanged files again.
+    """
+    ext = 'pbix'
+
+    def __init__(
+            self, folder, upload_folder, operations, state_path=None, report_class=None, thin=False, settle=2.0,
+            max_workers=None
+    ):
+        """
+        Creates a watcher
+        :param folder: the path to the watched (download) folder
+        :param upload_folder: the path to the folder where to write the processed reports
+        :param operations: a list of dictionaries with 'method' (the name of a PbiReport method), 'args' and 'kwargs'
+        keys, e.g. [{'method': 'update_keep_layer_order'}, {'method': 'disable_headers', 'kwargs': {...}}]
+        :param state_path: the path to the json state file or None (a '.pbi_watch.json' file in the watched folder)
+        :param report_class: the report class used to open the reports (default is PbiReport)
+        :param thin: a boolean, True to write thin reports (without the embedded data model) to the upload folder
+        :param settle: the number of seconds a file must stay unchanged before it is processed
+        :param max_workers: the number of worker processes or None (the number of processors)
+        """
+        if report_class is None:
+            from pbi.report import PbiReport
+            report_class = PbiReport
+        self.folder = folder
+        self.upload_folder = upload_folder
+        self.operations = operations
+        self.state_path = os.path.join(folder, '.pbi_watch.json') if state_path is None else state_path
+        self.report_class = report_class
+        self.thin = thin
+        self.settle = settle
+        self.max_workers = max_workers
+        self.state = self._load_state()
+        self._seen = {}
+        self._running = {}
+
+    def _load_state(self):
+        """
+        Reads the state file
+        :return: a dictionary {file name: {'size', 'mtime', 'hash', 'status', 'duration', 'message'}}, where the status
+        is 'done', 'error' or 'interrupted'
+        """
+        try:
+            with open(self.state_path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self):
+        """
+        Writes the state file (atomically, so that it is never left partially written)
+        :return: None
+        """
+        with open(f'{self.state_path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self.state, file, indent=2)
+        os.replace(f'{self.state_path}.tmp', self.state_path)
+
+    def _is_processed(self, file, stat):
+        """
+        Returns whether a file was already processed in its current version: same size and modification time as
+        recorded, or same content (e.g. the same report dropped again). A processing that was interrupted does not
+        count, while a processing that failed does (it would fail again).
+        :param file: a file name
+        :param stat: the os.stat_result of the file
+        :return: a boolean
+        """
+        record = self.state.get(file)
+        if record is None or record['status'] == 'interrupted' or record['size'] != stat.st_size:
+            return False
+        if record['mtime'] == stat.st_mtime:
+            return True
+        if record['hash'] == get_file_hash(os.path.join(self.folder, file)):
+            record['mtime'] = stat.st_mtime
+            return True
+        return False
+
+    def get_ready_files(self, now=None):
+        """
+        Returns the files of the watched folder that are ready to be processed: new or changed since they were last
+        processed, not being processed, and unchanged for at least the settle time (partially written files wait)
+        :param now: the current time (time.time()) or None
+        :return: a list of file names
+        """
+        now = time.time() if now is None else now
+        res = []
+        seen = {}
+        for file in sorted(os.listdir(self.folder)):
+            if os.path.splitext(file)[1] != f'.{self.ext}' or file in self._running:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.folder, file))
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            first_seen = self._seen.get(file, (None, now))
+            seen[file] = first_seen if first_seen[0] == signature else (signature, now)
+            if now - seen[file][1] < self.settle or now - stat.st_mtime < self.settle:
+                continue
+            if self._is_processed(file, stat):
+                continue
+            if zipfile.is_zipfile(os.path.join(self.folder, file)):
+                res.append(file)
+        self._seen = seen
+        return res
+
+    def _finish(self, file, stat, result):
+        """
+        Records the result of the processing of a file in the state file
+        :param file: a file name
+        :param stat: the os.stat_result of the file when it was submitted
+        :param result: a dictionary returned by _process_file
+        :return: None
+        """
+        path = os.path.join(self.folder, file)
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            current = None
+        unchanged = current is not None and (current.st_size, current.st_mtime) == (stat.st_size, stat.st_mtime)
+        self.state[file] = {
+            'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': get_file_hash(path) if unchanged else None, **result
+        }
+        self._save_state()
+        tracer.count('reports_processed' if result['status'] == 'done' else 'reports_failed')
+        if result['status'] == 'error':
+            print(f'Failed to process {file}: {result["message"]}')
+        elif result['status'] == 'interrupted':
+            print(f'Interrupted while processing {file} (processed again later): {result["message"]}')
+
+    @traced('watch.poll')
+    def poll(self, executor):
+        """
+        Collects the results of the finished files and submits the files ready to be processed
+        :param executor: a concurrent.futures executor
+        :return: the number of files submitted
+        """
+        for file, (future, stat) in list(self._running.items()):
+            if future.done():
+                del self._running[file]
+                self._finish(file, stat, _get_result(future))
+        ready = self.get_ready_files()
+        for file in ready:
+            stat = os.stat(os.path.join(self.folder, file))
+            future = executor.submit(_process_file, (
+                self.folder, os.path.splitext(file)[0], self.upload_folder, self.operations, self.report_class,
+                self.thin
+            ))
+            self._running[file] = (future, stat)
+        return len(ready)
+
+    def run(self, interval=1.0, duration=None):
+        """
+        Watches the folder until interrupted (KeyboardInterrupt) or for the given duration, then waits for the files
+        being processed. The files of a worker that died are recorded as interrupted (and processed again) and the
+        worker pool is restarted.
+        :param interval: the number of seconds between two polls of the folder
+        :param duration: the number of seconds to watch the folder, or None (until interrupted)
+        :return: the state (a dictionary {file name: record})
+        """
+        end = None if duration is None else time.time() + duration
+        os.makedirs(self.upload_folder, exist_ok=True)
+        executor = ProcessPoolExecutor(self.max_workers)
+        try:
+            while end is None or time.time() < end:
+                try:
+                    self.poll(executor)
+                except BrokenProcessPool:  # a worker died: its files are recorded as errors at the next poll
+                    executor.shutdown(wait=False)
+                    executor = ProcessPoolExecutor(self.max_workers)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print('Stopping the watcher...')
+        for file, (future, stat) in list(self._running.items()):
+            self._finish(file, stat, _get_result(future))
+        self._running = {}
+        executor.shutdown()
+        return self.state
@@ -0,0 +1,20 @@
+import pytest
+
+from helpers import PosixReport, make_layout, make_pbix
+from pbi.layout import PbiLayout
+
+
+@pytest.fixture
+def layout():
+    return PbiLayout(make_layout())
+
+
+@pytest.fixture
+def other_layout():
+    return PbiLayout(make_layout())
+
+
+@pytest.fixture
+def report(tmp_path):
+    make_pbix(tmp_path / 'report.pbix')
+    return PosixReport(str(tmp_path), 'report')
@@ -0,0 +1,154 @@
+"""
+Builders of small synthetic layouts and .pbix files for the tests.
+"""
+import json
+import os
+import zipfile
+
+from pbi.report import PbiReport
+
+CONNECTIONS = {
+    'Version': 3,
+    'Connections': [{
+        'Name': 'EntityDataSource',
+        'ConnectionString': 'Data Source=pbiazure://api.powerbi.com;Initial Catalog=aaaa-1111;Identity Provider="x";',
+        'ConnectionType': 'pbiServiceLive',
+        'PbiServiceModelId': 123,
+        'PbiModelVirtualServerName': 'sobe_wowvirtualserver',
+        'PbiModelDatabaseName': 'aaaa-1111'
+    }],
+    'RemoteArtifacts': [{'DatasetId': 'aaaa-1111', 'ReportId': 'rrrr-1'}]
+}
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="utf-8"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Override PartName="/Version" ContentType="" /><Override PartName="/DataModel" ContentType="" />'
+    '<Override PartName="/Report/Layout" ContentType="" /></Types>'
+)
+
+
+def column(entity, prop, source=None):
+    ref = {'Source': source} if source else {'Entity': entity}
+    return {'Column': {'Expression': {'SourceRef': ref}, 'Property': prop}}
+
+
+def make_filter(name, entity, prop, value):
+    return {
+        'name': name,
+        'expression': column(entity, prop),
+        'filter': {
+            'Version': 2,
+            'From': [{'Name': 'r', 'Entity': entity, 'Type': 0}],
+            'Where': [{'Condition': {'In': {
+                'Expressions': [column(entity, prop, 'r')],
+                'Values': [[{'Literal': {'Value': f"'{value}'"}}]]
+            }}}]
+        },
+        'type': 'Categorical',
+        'howCreated': 1
+    }
+
+
+def make_container(name, visual_type, x, y, parent=None, title=None, filters=()):
+    single_visual = {'visualType': visual_type, 'objects': {}, 'vcObjects': {}}
+    if title:
+        single_visual['vcObjects']['title'] = [{'properties': {'text': {'expr': {'Literal': {'Value': f"'{title}'"}}}}}]
+    config = {
+        'name': name,
+        'layouts': [{'id': 0, 'position': {'x': x, 'y': y, 'z': 0, 'width': 200, 'height': 100}}],
+        'singleVisual': single_visual
+    }
+    if parent:
+        config['parentGroupName'] = parent
+    return {
+        'x': x, 'y': y, 'z': 0, 'width': 200, 'height': 100,
+        'config': json.dumps(config),
+        'filters': json.dumps(list(filters))
+    }
+
+
+def make_group(name, x, y):
+    config = {
+        'name': name,
+        'layouts': [{'id': 0, 'position': {'x': x, 'y': y, 'z': 0, 'width': 1280, 'height': 80}}],
+        'singleVisualGroup': {'displayName': 'Header', 'groupMode': 0}
+    }
+    return {'x': x, 'y': y, 'z': 0, 'width': 1280, 'height': 80, 'config': json.dumps(config), 'filters': '[]'}
+
+
+def make_layout(n_pages=2, n_visuals=3):
+    """
+    Returns the json string of a layout: each page has a header group with a title, then bar charts filtered on
+    Sales.Region; the pages are filtered on Sales.Country and the report on Sales.Year
+    """
+    sections = []
+    for p in range(n_pages):
+        containers = [
+            make_group(f'grp{p}', 0, 0),
+            make_container(f'title{p}', 'textbox', 10, 10, parent=f'grp{p}'),
+        ]
+        containers += [
+            make_container(
+                f'v{p}_{i}', 'barChart', 100 * i, 200, title=f'Chart {i}',
+                filters=[make_filter(f'f{p}_{i}', 'Sales', 'Region', 'EU')]
+            )
+            for i in range(n_visuals)
+        ]
+        sections.append({
+            'name': f'ReportSection{p}',
+            'displayName': f'Page {p}',
+            'ordinal': p,
+            'width': 1280,
+            'height': 720,
+            'displayOption': 1,
+            'config': json.dumps({'visibility': 0}),
+            'filters': json.dumps([make_filter(f'pf{p}', 'Sales', 'Country', 'France')]),
+            'visualContainers': containers
+        })
+    config = {
+        'version': '5.37',
+        'themeCollection': {},
+        'bookmarks': [{
+            'name': 'Bookmark1',
+            'displayName': 'Home view',
+            'options': {'targetVisualNames': ['title0']},
+            'explorationState': {'version': '1.3', 'activeSection': 'ReportSection0', 'sections': {}}
+        }]
+    }
+    return json.dumps({
+        'id': 0,
+        'resourcePackages': [{'resourcePackage': {
+            'name': 'SharedResources', 'type': 2, 'disabled': False,
+            'items': [{'type': 202, 'path': 'BaseThemes/CY22SU11.json', 'name': 'CY22SU11'}]
+        }}],
+        'sections': sections,
+        'config': json.dumps(config),
+        'filters': json.dumps([make_filter('rf', 'Sales', 'Year', '2024')]),
+        'layoutOptimization': 0
+    })
+
+
+def make_pbix(path, connections=CONNECTIONS, **kwargs):
+    """
+    Writes a .pbix file with a synthetic layout, connections, a data model and a theme
+    """
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('Version', '1.28'.encode('utf-16-le'))
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('Report/Layout', make_layout(**kwargs).encode('utf-16-le'))
+        if connections is not None:
+            archive.writestr('Connections', json.dumps(connections))
+        archive.writestr('DataModel', b'\x01' * 5000, compress_type=zipfile.ZIP_STORED)
+        archive.writestr('Report/StaticResources/SharedResources/BaseThemes/CY22SU11.json', '{"name": "theme"}')
+        archive.writestr('SecurityBindings', b'\x00' * 20)
+    return path
+
+
+class PosixReport(PbiReport):
+    """
+    A report whose path is built with os.path.join (the library builds Windows paths), to test the functions working
+    on whole folders
+    """
+
+    @classmethod
+    def _get_path(cls, folder, filename):
+        return os.path.join(folder, f'{filename}.{cls.ext}')
@@ -0,0 +1,29 @@
+import shutil
+
+from pbi.analyzer import analyze, analyze_folder
+
+
+def test_size_breakdown(report):
+    res = analyze(report.path)
+    assert {entry['report'] for entry in res.entries} == {'report'}
+    members = {entry['path'][0]: entry for entry in res.get_largest(n=100, kind='member')}
+    assert res.get_largest(1) == [members['Report/Layout']]
+    assert (members['DataModel']['size'], members['DataModel']['compressed_size']) == (5000, 5000)
+    assert [entry['path'] for entry in res.get_largest(kind='filter')].count(('filters', 'rf')) == 1
+    assert len(res.get_largest(n=100, kind='filter')) == 3
+    assert [entry['path'] for entry in res.get_largest(kind='bookmark')] == [('bookmarks', 'Home view')]
+    containers = res.get_largest(n=100, kind='container')
+    assert len(containers) == 10
+    assert ('sections', 'Page 0', 'visualContainers', 'grp0') in [entry['path'] for entry in containers]
+    page = next(entry for entry in res.get_largest(kind='page') if entry['path'] == ('sections', 'Page 0'))
+    assert page['size'] > sum(entry['size'] for entry in containers if entry['path'][1] == 'Page 0')
+    assert f"{5000:>12,}  member     report: DataModel" in str(res).splitlines()
+
+
+def test_folder_totals(report):
+    shutil.copyfile(report.path, report.path.replace('report.pbix', 'copy.pbix'))
+    res = analyze_folder(report.folder)
+    totals = res.get_totals()
+    assert set(totals) == {'copy', 'report'} and totals['copy'] == totals['report']
+    bookmark_size = res.get_largest(kind='bookmark')[0]['size']
+    assert res.get_totals('bookmark') == {'copy': bookmark_size, 'report': bookmark_size}
@@ -0,0 +1,51 @@
+import json
+
+from pbi.bookmark import Bookmark
+
+
+def _add_state(layout):
+    bookmark = layout['config']['bookmarks'][0]
+    bookmark['options']['targetVisualNames'] = ['title0', 'gone']
+    bookmark['explorationState']['sections'] = {
+        'ReportSection0': {
+            'visualContainers': {'v0_0': {}, 'gone': {}},
+            'visualContainerGroups': {'grp0': {}, 'old_group': {}}
+        },
+        'ReportSection1': {'visualContainers': {'v1_0': {}}},
+        'RemovedSection': {'visualContainers': {}}
+    }
+    bookmark['children'] = [{
+        'name': 'Bookmark2',
+        'explorationState': {'sections': {'RemovedSection': {}, 'ReportSection1': {'visualContainers': {'x': {}}}}}
+    }]
+    return bookmark
+
+
+def test_prune_removed_pages_and_visuals(layout):
+    bookmark = _add_state(layout)
+    size = len(layout.export())
+    freed = layout.prune_bookmarks()
+    assert freed > 0
+    assert bookmark['options']['targetVisualNames'] == ['title0']
+    assert bookmark['explorationState']['sections'] == {
+        'ReportSection0': {'visualContainers': {'v0_0': {}}, 'visualContainerGroups': {'grp0': {}}},
+        'ReportSection1': {'visualContainers': {'v1_0': {}}}
+    }
+    assert bookmark['children'][0]['explorationState']['sections'] == {'ReportSection1': {'visualContainers': {}}}
+    assert 2 * (size - len(layout.export())) == freed
+    assert layout.prune_bookmarks() == 0
+
+
+def test_prune_after_page_removal(layout):
+    bookmark = _add_state(layout)
+    layout['sections'].pop(1)
+    assert bookmark.prune({'ReportSection0': {'grp0', 'title0', 'v0_0', 'v0_1', 'v0_2'}}) == 7
+    assert list(bookmark['explorationState']['sections']) == ['ReportSection0']
+    assert bookmark['children'][0]['explorationState']['sections'] == {}
+
+
+def test_export_keeps_bookmark_objects(layout):
+    _add_state(layout)
+    exported = json.loads(json.loads(layout.export())['config'])
+    assert exported['bookmarks'][0]['children'][0]['name'] == 'Bookmark2'
+    assert isinstance(layout['config']['bookmarks'][0], Bookmark)
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from pbi.archive import LAYOUT, LAYOUT_ENCODING, read_layout_str, write_archive
+from pbi.catalog import PbiCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    res = PbiCatalog(str(tmp_path / 'catalog.db'))
+    yield res
+    res.close()
+
+
+def test_containers_without_single_visual_are_indexed(report, catalog):
+    layout = json.loads(read_layout_str(report.path))
+    layout['sections'][0]['visualContainers'].append({
+        'x': 0, 'y': 0, 'z': 0, 'width': 10, 'height': 10, 'filters': '[]',
+        'config': json.dumps({'name': 'bare', 'layouts': []})
+    })
+    write_archive(report.path, {LAYOUT: json.dumps(layout).encode(LAYOUT_ENCODING)})
+    assert catalog.refresh(report.folder)['added'] == 1
+    rows = {
+        row['name']: (row['type'], row['display_name'], row['parent_name'])
+        for row in catalog.query("SELECT * FROM visuals WHERE page_name = 'ReportSection0'")
+    }
+    assert rows['bare'] == (None, None, None)
+    assert rows['grp0'] == ('singleVisualGroup', 'Header', None)
+    assert rows['title0'] == ('textbox', None, 'grp0')
+    assert rows['v0_1'] == ('barChart', "'Chart 1'", None)
+
+
+def test_refresh_only_parses_changed_reports(report, catalog):
+    assert catalog.refresh(report.folder) == {'added': 1, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    os.utime(report.path, (0, 0))
+    assert catalog.refresh(report.folder) == {'added': 0, 'updated': 0, 'unchanged': 1, 'removed': 0}
+    report.get_page('Page 1').hide()
+    report.save()
+    assert catalog.refresh(report.folder) == {'added': 0, 'updated': 1, 'unchanged': 0, 'removed': 0}
+    assert len(catalog.query('SELECT * FROM pages')) == 2
+    os.remove(report.path)
+    assert catalog.refresh(report.folder) == {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 1}
+    assert catalog.query('SELECT * FROM visuals') == []
+
+
+def test_find_visuals_filters_bookmarks_and_connections(report, catalog):
+    layout = json.loads(read_layout_str(report.path))
+    config = json.loads(layout['sections'][1]['visualContainers'][2]['config'])
+    config['singleVisual']['vcObjects']['visualLink'] = [
+        {'properties': {'bookmark': {'expr': {'Literal': {'Value': "'Bookmark1'"}}}}}
+    ]
+    layout['sections'][1]['visualContainers'][2]['config'] = json.dumps(config)
+    write_archive(report.path, {LAYOUT: json.dumps(layout).encode(LAYOUT_ENCODING)})
+    catalog.refresh(report.folder)
+    assert len(catalog.find_visuals('barChart')) == 6
+    assert [(row['page'], row['name']) for row in catalog.find_visuals(display_name="'Chart 1'")] == [
+        ('Page 0', 'v0_1'), ('Page 1', 'v1_1')
+    ]
+    assert {row['level'] for row in catalog.find_filters('Sales', 'Region')} == {'visual'}
+    assert [row['name'] for row in catalog.find_filters(property_name='Year')] == ['rf']
+    assert [(row['bookmark'], row['visual_name']) for row in catalog.find_bookmarks('Home view')] == [
+        ('Bookmark1', 'v1_0')
+    ]
+    assert [row['filename'] for row in catalog.find_connections('aaaa-1111')] == ['report']
+    assert catalog.find_connections('bbbb-2222') == []
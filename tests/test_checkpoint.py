@@ -0,0 +1,80 @@
+import copy
+import pickle
+
+
+def test_rollback_restores_layout(layout):
+    before = layout.export()
+    with layout.checkpoint() as checkpoint:
+        page = layout.get_page('Page 0')
+        page.get_visuals('v0_0')[0].update_position(x=999)
+        page.remove_visuals(['v0_1'])
+        layout.get_page('Page 1').hide()
+        assert layout.export() != before
+        assert checkpoint.rollback() > 0
+    assert layout.export() == before
+
+
+def test_rollback_on_exception(layout):
+    before = layout.export()
+    try:
+        with layout.checkpoint():
+            layout.get_page('Page 0').hide()
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert layout.export() == before
+
+
+def test_checkpoint_ignores_other_layouts(layout, other_layout):
+    with layout.checkpoint() as checkpoint:
+        layout.get_page('Page 0').hide()
+        other_layout.get_page('Page 0').hide()
+        other_layout.get_page('Page 1').get_visuals('v1_0')[0].update_position(x=999)
+        other = other_layout.export()
+        assert checkpoint.changed == [layout.get_page('Page 0')]
+        checkpoint.rollback()
+    assert other_layout.export() == other
+    assert other_layout.get_page('Page 1').get_visuals('v1_0')[0]['x'] == 999
+
+
+def test_release_keeps_changes(layout, other_layout):
+    checkpoint = layout.checkpoint()
+    layout.get_page('Page 0').hide()
+    checkpoint.release()
+    assert checkpoint.rollback() == 0
+    assert layout.export() != other_layout.export()
+
+
+def test_checkpoint_does_not_walk_the_layout(layout, monkeypatch):
+    def fail(obj):
+        raise AssertionError('the layout was walked')
+    monkeypatch.setattr('pbi.object._iter_members', fail)
+    with layout.checkpoint() as checkpoint:
+        layout.get_page('Page 0').hide()
+        assert checkpoint.changed == [layout.get_page('Page 0')]
+
+
+def test_copies_keep_their_own_layout(layout):
+    for other in (copy.deepcopy(layout), pickle.loads(pickle.dumps(layout))):
+        before = other.export()
+        with other.checkpoint() as checkpoint:
+            layout.get_page('Page 0').hide()
+            other.get_page('Page 1').hide()
+            assert checkpoint.changed == [other.get_page('Page 1')]
+            checkpoint.rollback()
+        assert other.export() == before
+        assert layout.get_page('Page 0')['config']['visibility'] == 1
+
+
+def test_attached_objects_are_tracked(layout, other_layout):
+    page = layout.get_page('Page 0')
+    new_visual = page.add_visuals(other_layout.get_page('Page 1').get_visuals('v1_0')[0])[0]
+    page.add_filters(other_layout.get_page('Page 1')['filters'])
+    before = layout.export()
+    with layout.checkpoint() as checkpoint:
+        new_visual.update_position(x=999)
+        page['filters'][-1].update_name('renamed')
+        other_layout.get_page('Page 1').get_visuals('v1_0')[0].update_position(x=999)
+        assert len(checkpoint.changed) == 2
+        checkpoint.rollback()
+    assert layout.export() == before
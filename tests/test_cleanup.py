@@ -0,0 +1,50 @@
+from pbi.filter import PbiFilter
+
+
+def _add_garbage(layout):
+    page, other_page = layout['sections']
+    page.get_visuals('v0_0')[0]['config']['singleVisual']['display'] = {'mode': 'hidden'}
+    page.get_visuals('v0_1')[0]['config']['parentGroupName'] = 'missing'
+    empty = page.get_visuals('grp0')[0].copy()
+    empty.update_name('empty')
+    page['visualContainers'].append(empty)
+    page['filters'].append(PbiFilter({'name': 'unused', 'isHiddenInViewMode': True}))
+    other_page.get_visuals('grp1')[0]['config']['singleVisualGroup']['isHidden'] = True
+    layout['resourcePackages'].append({'resourcePackage': {
+        'name': 'RegisteredResources', 'type': 1, 'disabled': False,
+        'items': [{'type': 100, 'path': 'logo.png', 'name': 'logo.png'}]
+    }})
+
+
+def test_dry_run_finds_garbage(layout):
+    _add_garbage(layout)
+    before = layout.export()
+    res = layout.collect_garbage()
+    assert res.pop('bytes') > 0
+    assert res == {
+        'hidden_visuals': ['Page 0/v0_0', 'Page 1/grp1', 'Page 1/title1'],
+        'orphan_visuals': ['Page 0/v0_1'],
+        'empty_groups': ['Page 0/empty'],
+        'unused_filters': ['Page 0/unused'],
+        'unused_resources': ['logo.png']
+    }
+    assert layout.export() == before
+
+
+def test_bookmarked_hidden_visuals_are_kept(layout):
+    _add_garbage(layout)
+    layout['config']['bookmarks'][0]['options']['targetVisualNames'] = ['grp1', 'v0_0']
+    assert layout.collect_garbage()['hidden_visuals'] == []
+
+
+def test_collect_garbage(layout):
+    _add_garbage(layout)
+    with layout.checkpoint() as checkpoint:
+        res = layout.collect_garbage(dry_run=False)
+        assert res['bytes'] > 0
+        assert layout.get_page('Page 0').get_visuals('v0_1')[0].parent_name is None
+        assert [container.name for container in layout['sections'][1]['visualContainers']] == ['v1_0', 'v1_1', 'v1_2']
+        assert layout.get_resource_package('RegisteredResources')['items'] == []
+        assert layout.collect_garbage()['bytes'] == 0
+        assert checkpoint.rollback() > 0
+    assert layout.collect_garbage()['empty_groups'] == ['Page 0/empty']
@@ -0,0 +1,45 @@
+import codecs
+import json
+
+from helpers import CONNECTIONS, make_pbix
+from pbi.archive import CONNECTIONS as CONNECTIONS_MEMBER, LAYOUT, read_member
+from pbi.connections import PbiConnections, rebind_file, rebind_folder
+
+
+def test_dataset_ids_and_properties():
+    connections = PbiConnections(json.dumps(CONNECTIONS))
+    assert connections.dataset_ids == {'aaaa-1111'}
+    assert connections.connections[0].data_source == 'pbiazure://api.powerbi.com'
+
+
+def test_rebind_replaces_all_ids_at_once():
+    connections = PbiConnections(json.dumps(CONNECTIONS))
+    # a swap: an id mapped to another id of the mapping is not replaced twice
+    assert connections.rebind({'aaaa-1111': 'bbbb-2222', 'bbbb-2222': 'aaaa-1111'}) == 3
+    assert connections.dataset_ids == {'bbbb-2222'}
+    assert connections.rebind({'cccc-3333': 'dddd-4444'}) == 0
+    assert connections.rebind({'bbbb-2222': 'bbbb-2222'}) == 0
+
+
+def test_bom_is_kept():
+    data = codecs.BOM_UTF8 + json.dumps(CONNECTIONS).encode('utf-8')
+    connections = PbiConnections.from_bytes(data)
+    connections.rebind({'aaaa-1111': 'bbbb-2222'})
+    res = connections.to_bytes()
+    assert res.startswith(codecs.BOM_UTF8)
+    assert PbiConnections.from_bytes(res).dataset_ids == {'bbbb-2222'}
+
+
+def test_rebind_file_only_rewrites_connections(tmp_path):
+    path = str(make_pbix(tmp_path / 'a.pbix'))
+    layout = read_member(path, LAYOUT)
+    assert rebind_file(path, {'aaaa-1111': 'bbbb-2222'}) == 3
+    assert PbiConnections.from_bytes(read_member(path, CONNECTIONS_MEMBER)).dataset_ids == {'bbbb-2222'}
+    assert read_member(path, LAYOUT) == layout
+
+
+def test_rebind_folder(tmp_path):
+    make_pbix(tmp_path / 'a.pbix')
+    make_pbix(tmp_path / 'b.pbix', connections=None)
+    (tmp_path / 'notes.txt').write_text('not a report')
+    assert rebind_folder(str(tmp_path), {'aaaa-1111': 'bbbb-2222'}) == {'a': 3, 'b': 0}
@@ -0,0 +1,26 @@
+from pbi.config import PbiConfig
+from pbi.container import PbiContainer
+from pbi.filter import PbiFilter, PbiFilters
+
+
+def test_copy_is_structural_and_independent(layout):
+    container = layout.get_page('Page 0').get_visuals('v0_0')[0]
+    res = container.copy()
+    assert res == container
+    assert (type(res), type(res['config']), type(res['filters']), type(res['filters'][0])) == (
+        PbiContainer, PbiConfig, PbiFilters, PbiFilter
+    )
+    res['config']['layouts'][0]['position']['x'] = 999
+    res['filters'][0]['name'] = 'other'
+    assert container['config']['layouts'][0]['position']['x'] == 0
+    assert container['filters'][0]['name'] == 'f0_0'
+
+
+def test_add_visuals_to_all_pages(layout):
+    container = layout.get_page('Page 0').get_visuals('v0_1')[0]
+    res = layout.add_visuals(container)
+    assert set(res) == {'Page 0', 'Page 1'}
+    added = [visuals[0] for visuals in res.values()]
+    assert added[0] is not added[1]
+    assert added[0]['config'] is not added[1]['config']
+    assert len({container.name, added[0].name, added[1].name}) == 3
@@ -0,0 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pbi.corpus import PbiCorpus, _attach
+
+
+def _count_visuals(corpus, name):
+    with corpus:
+        layout = corpus.get_layout(name)
+        return [len(page['visualContainers']) for page in layout['sections']]
+
+
+def test_workers_load_layouts_and_only_the_owner_frees_the_memory(report):
+    corpus = PbiCorpus.create([report])
+    with ProcessPoolExecutor(1) as executor:
+        assert executor.submit(_count_visuals, corpus, 'report').result() == [5, 5]
+    _attach(corpus.name).close()  # closed in the worker, still there
+    assert corpus.get_layout('report').export() == report.layout.export()
+    corpus.close()
+    with pytest.raises(FileNotFoundError):
+        _attach(corpus.name)
@@ -0,0 +1,65 @@
+from pbi.diff import PbiMerkleTree, diff_layouts
+
+
+def _changes(old, new):
+    return {(change.kind, change.status, change.path) for change in diff_layouts(old, new)}
+
+
+def test_identical_layouts(layout, other_layout):
+    assert diff_layouts(layout, other_layout) == []
+
+
+def test_layout_own_keys_and_config(layout, other_layout):
+    other_layout['resourcePackages'] = []
+    other_layout['config']['themeCollection'] = {'baseTheme': {'name': 'CY22SU11'}}
+    changes = diff_layouts(layout, other_layout)
+    assert len(changes) == 1
+    assert (changes[0].kind, changes[0].status, changes[0].path) == ('layout', 'modified', ())
+    assert set(changes[0].key_paths) == {('resourcePackages',), ('config', 'themeCollection', 'baseTheme')}
+
+
+def test_bookmarks_are_not_layout_changes(layout, other_layout):
+    other_layout['config']['bookmarks'][0]['displayName'] = 'Other view'
+    assert _changes(layout, other_layout) == {('bookmark', 'modified', ('bookmarks', 'Bookmark1'))}
+
+
+def test_same_named_visuals_on_different_pages(layout, other_layout):
+    for p in range(2):
+        for page_layout in (layout, other_layout):
+            page_layout['sections'][p]['visualContainers'][2]['config']['name'] = 'chart'
+    tree = PbiMerkleTree(other_layout)
+    assert tree.get_container('ReportSection0', 'chart') is not tree.get_container('ReportSection1', 'chart')
+    other_layout['sections'][1]['visualContainers'][2]['config']['singleVisual']['visualType'] = 'pieChart'
+    assert _changes(layout, other_layout) == {
+        ('visual', 'modified', ('sections', 'Page 1', 'visualContainers', 'chart'))
+    }
+
+
+def test_repositioned_visual(layout, other_layout):
+    other_layout.get_page('Page 0').get_visuals('v0_1')[0].update_position(x=555)
+    changes = diff_layouts(layout, other_layout)
+    assert [(change.status, change.path) for change in changes] == [
+        ('repositioned', ('sections', 'Page 0', 'visualContainers', 'v0_1'))
+    ]
+    assert set(changes[0].key_paths) == {('x',), ('config', 'layouts', 0, 'position', 'x')}
+
+
+def test_visual_moved_to_another_page(layout, other_layout):
+    source, target = other_layout['sections']
+    container = source['visualContainers'].pop(3)
+    target['visualContainers'].append(container)
+    changes = diff_layouts(layout, other_layout)
+    assert [(change.status, change.path, change.old_path) for change in changes] == [(
+        'moved',
+        ('sections', 'Page 1', 'visualContainers', 'v0_1'),
+        ('sections', 'Page 0', 'visualContainers', 'v0_1')
+    )]
+
+
+def test_pages_added_and_removed(layout, other_layout):
+    other_layout['sections'].pop(0)
+    assert ('page', 'removed', ('sections', 'Page 0')) in _changes(layout, other_layout)
+    assert ('visual', 'removed', ('sections', 'Page 0', 'visualContainers', 'v0_0')) in _changes(layout, other_layout)
+    changes = _changes(other_layout, layout)
+    assert ('page', 'added', ('sections', 'Page 0')) in changes
+    assert ('visual', 'added', ('sections', 'Page 0', 'visualContainers', 'v0_0')) in changes
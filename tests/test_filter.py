@@ -0,0 +1,61 @@
+import pytest
+
+from helpers import make_filter
+from pbi.filter import PbiFilter, PbiFilterIndex
+
+UNFILTERED = [
+    {'name': 'measure', 'expression': {'Measure': {
+        'Expression': {'SourceRef': {'Entity': 'Sales'}}, 'Property': 'Total'
+    }}},
+    {'name': 'aggregation', 'expression': {'Aggregation': {'Expression': {'Column': {
+        'Expression': {'SourceRef': {'Entity': 'Sales'}}, 'Property': 'Amount'
+    }}, 'Function': 0}}},
+    {'name': 'hierarchy', 'expression': {'HierarchyLevel': {'Expression': {'Hierarchy': {
+        'Expression': {'SourceRef': {'Entity': 'Date'}}, 'Hierarchy': 'Calendar'
+    }}, 'Level': 'Year'}}},
+    {'name': 'two keys', 'expression': {
+        'Column': {'Expression': {'SourceRef': {'Entity': 'Sales'}}, 'Property': 'Region'},
+        'Measure': {'Expression': {'SourceRef': {'Entity': 'Sales'}}, 'Property': 'Total'}
+    }},
+    {'name': 'no expression'},
+]
+
+
+def test_update_value_of_in_condition():
+    flt = PbiFilter(make_filter('f', 'Sales', 'Region', 'EU'))
+    assert flt.update_value(['US', "Côte d'Ivoire", 3])
+    assert flt['filter']['Where'][0]['Condition']['In']['Values'] == [
+        [{'Literal': {'Value': "'US'"}}], [{'Literal': {'Value': "'Côte d''Ivoire'"}}], [{'Literal': {'Value': '3L'}}]
+    ]
+    assert flt.clear_value()
+    assert not flt.clear_value()
+
+
+def test_update_value_of_unfiltered_column():
+    flt = PbiFilter(make_filter('f', 'Sales', 'Region', 'EU'))
+    flt.pop('filter')
+    assert flt.update_value('EU')
+    condition = flt['filter']['Where'][0]['Condition']['In']
+    assert condition['Expressions'][0]['Column']['Property'] == 'Region'
+    assert flt['filter']['From'] == [{'Name': 's', 'Entity': 'Sales', 'Type': 0}]
+
+
+@pytest.mark.parametrize('data', UNFILTERED, ids=[data['name'] for data in UNFILTERED])
+def test_update_value_of_unsupported_filter(data):
+    flt = PbiFilter(data)
+    assert not flt.update_value('x')
+    assert 'filter' not in flt
+
+
+def test_update_filters(layout):
+    updates = {('Sales', 'Region'): 'US', ('Sales', 'Country'): None, ('Sales', 'Year'): 2025}
+    counts = PbiFilterIndex(layout).apply(updates)
+    assert counts == {('Sales', 'Region'): 6, ('Sales', 'Country'): 2, ('Sales', 'Year'): 1}
+    assert all('filter' not in flt for page in layout['sections'] for flt in page['filters'])
+    layout['filters'].append(PbiFilter(UNFILTERED[0]))
+    assert PbiFilterIndex(layout).apply({('Sales', 'Total'): 1}) == {('Sales', 'Total'): 0}
+
+
+def test_update_filters_by_level(layout):
+    assert PbiFilterIndex(layout).apply({('Sales', 'Region'): 'US'}, 'page') == {('Sales', 'Region'): 0}
+
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from pbi.images import DOWNSAMPLE_QUALITY, optimize_image
+
+Image = pytest.importorskip('PIL.Image')
+ICC_PROFILE = b'\x00' * 128 + b'fake icc profile'
+
+
+def _make_jpeg(size=(400, 300)):
+    image = Image.new('RGB', size, (200, 10, 10))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotated 90 degrees
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=100, exif=exif.tobytes(), icc_profile=ICC_PROFILE)
+    return output.getvalue()
+
+
+def test_jpeg_is_kept_when_lossless():
+    data = _make_jpeg()
+    assert optimize_image(data) is data
+    assert optimize_image(data, max_size=(800, 600)) is data
+
+
+def test_downsampled_jpeg_keeps_metadata():
+    data = _make_jpeg()
+    image = Image.open(io.BytesIO(optimize_image(data, max_size=(100, 100))))
+    assert image.size == (100, 75)
+    assert image.getexif()[0x0112] == 6
+    assert image.info['icc_profile'] == ICC_PROFILE
+
+
+def test_downsampled_jpeg_quality():
+    data = _make_jpeg((1600, 1200))
+    default = optimize_image(data, max_size=(800, 600))
+    assert len(optimize_image(data, quality=DOWNSAMPLE_QUALITY, max_size=(800, 600))) == len(default)
+    assert len(optimize_image(data, quality=40, max_size=(800, 600))) < len(default)
+
+
+def test_png_keeps_icc_profile():
+    output = io.BytesIO()
+    Image.new('RGB', (300, 200), (0, 128, 255)).save(output, 'PNG', compress_level=0, icc_profile=ICC_PROFILE)
+    data = output.getvalue()
+    res = optimize_image(data)
+    assert len(res) < len(data)
+    image = Image.open(io.BytesIO(res))
+    assert image.info['icc_profile'] == ICC_PROFILE
+    assert image.convert('RGB').tobytes() == Image.open(io.BytesIO(data)).convert('RGB').tobytes()
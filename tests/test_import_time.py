@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 0.15
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ['pandas', 'numpy', 'ctypes', 'multiprocessing', 'PIL']
+
+CODE = f'''
+import sys
+import time
+start = time.perf_counter()
+import pbi.report
+import pbi.pbi
+duration = time.perf_counter() - start
+print(duration)
+print(','.join(module for module in {LAZY_MODULES} if module in sys.modules))
+'''
+
+
+def _import():
+    """
+    Imports the library in a fresh interpreter
+    :return: the import duration and the list of lazy modules that were imported
+    """
+    duration, loaded = subprocess.run(
+        [sys.executable, '-c', CODE], capture_output=True, text=True, check=True, cwd=ROOT
+    ).stdout.splitlines()
+    return float(duration), [module for module in loaded.split(',') if module]
+
+
+def test_heavy_modules_are_imported_lazily():
+    assert _import()[1] == []
+
+
+def test_import_time_budget():
+    duration = min(_import()[0] for _ in range(3))  # the best of a few runs, not to fail on a busy machine
+    assert duration < IMPORT_TIME_BUDGET, f'Import took {duration:.3f}s (budget: {IMPORT_TIME_BUDGET}s)'
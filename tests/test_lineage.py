@@ -0,0 +1,62 @@
+from helpers import column
+from pbi.lineage import PbiLineage, get_field_references
+
+
+def _query(alias='s'):
+    return {'Commands': [{'SemanticQueryDataShapeCommand': {'Query': {
+        'Version': 2,
+        'From': [{'Name': alias, 'Entity': 'Sales', 'Type': 0}, {'Name': 'd', 'Entity': 'Date', 'Type': 0}],
+        'Select': [
+            column('Sales', 'Region', alias),
+            {'Measure': {'Expression': {'SourceRef': {'Source': alias}}, 'Property': 'Revenue'}},
+            {'HierarchyLevel': {
+                'Expression': {'Hierarchy': {'Expression': {'SourceRef': {'Source': 'd'}}, 'Hierarchy': 'Calendar'}},
+                'Level': 'Year'
+            }},
+        ]
+    }}}]}
+
+
+def test_field_references_resolve_aliases():
+    assert get_field_references(_query()) == [
+        ('Sales', 'Region', 'column'), ('Sales', 'Revenue', 'measure'), ('Date', 'Calendar.Year', 'hierarchy')
+    ]
+    assert get_field_references({'Column': {'Expression': {'SourceRef': {'Source': 'x'}}, 'Property': 'A'}}) == []
+
+
+def test_references_by_level_and_source(layout):
+    layout.get_page('Page 0').get_visuals('v0_1')[0]['query'] = _query()
+    lineage = PbiLineage()
+    lineage.add_layout(layout, 'report')
+    assert lineage.fields == [
+        ('Date', 'Calendar.Year'), ('Sales', 'Country'), ('Sales', 'Region'), ('Sales', 'Revenue'), ('Sales', 'Year')
+    ]
+    assert [ref.location for ref in lineage.get_references('Sales', 'Year')] == [
+        ('report', 'report', None, None, 'filter', 'rf')
+    ]
+    assert [ref.location for ref in lineage.get_references('Sales', 'Revenue')] == [
+        ('report', 'visual', 'ReportSection0', 'v0_1', 'query', None)
+    ]
+    assert len(lineage.get_references('Sales', 'Region')) == 7
+    assert len(lineage.get_references('Sales')) == 11
+
+
+def test_impact_and_report_replacement(layout, other_layout):
+    lineage = PbiLineage()
+    lineage.add_layout(layout, 'a')
+    lineage.add_layout(other_layout, 'b')
+    assert lineage.get_impact([('Sales', 'Country')]) == {
+        'a': {'ReportSection0': {'pf0'}, 'ReportSection1': {'pf1'}},
+        'b': {'ReportSection0': {'pf0'}, 'ReportSection1': {'pf1'}},
+    }
+    other_layout['sections'].pop(1)
+    lineage.add_layout(other_layout, 'b')
+    assert lineage.get_impact(['Sales'])['b'] == {None: {'rf'}, 'ReportSection0': {'pf0', 'v0_0', 'v0_1', 'v0_2'}}
+    lineage.remove_report('a')
+    lineage.remove_report('b')
+    assert lineage.references == {}
+
+
+def test_from_folder(report):
+    lineage = PbiLineage.from_folder(report.folder)
+    assert {ref.report for ref in lineage.get_references('Sales')} == {'report'}
@@ -0,0 +1,95 @@
+import shutil
+
+from helpers import PosixReport
+from pbi.archive import read_member
+from pbi.patch import PbiPatch, apply_patch
+
+
+def _copy(report, name):
+    shutil.copyfile(report.path, report.path.replace('report.pbix', f'{name}.pbix'))
+    return PosixReport(report.folder, name)
+
+
+def test_replay_on_other_report(report):
+    other = _copy(report, 'other')
+    with report.record() as recorder:
+        report.get_page('Page 0').get_visuals('v0_1')[0].update_position(x=555)
+        report.get_page('Page 1').hide()
+    patch = PbiPatch.from_json(recorder.patch.to_json())
+    assert len(patch) == 2
+    assert patch.apply(other) == []
+    assert other.layout.export() == report.layout.export()
+
+
+def test_edits_of_copies_are_replayed_on_the_copies(report):
+    other = _copy(report, 'other')
+    with report.record() as recorder:
+        page = report.get_page('Page 0')
+        new_visual = page.add_visuals(page.get_visuals('v0_1')[0])[0]
+        new_visual.update_position(x=555)
+    assert recorder.patch.edits[0]['copies'] == [{'page': 'Page 0', 'names': {'v0_1': new_visual.name}}]
+    assert PbiPatch.from_json(recorder.patch.to_json()).apply(other) == []
+    page = other.get_page('Page 0')
+    original, copy = [container for container in page['visualContainers'] if container.display_name == "'Chart 1'"]
+    assert original.name == 'v0_1' and original['x'] == 100
+    assert copy.name not in ('v0_1', new_visual.name) and copy['x'] == 555
+
+
+def test_target_matched_by_type_and_title(report):
+    other = _copy(report, 'other')
+    other.get_page('Page 0').get_visuals('v0_1')[0].update_name('renamed')
+    with report.record() as recorder:
+        report.get_page('Page 0').get_visuals('v0_1')[0].update_position(x=555)
+    assert recorder.patch.apply(other) == []
+    assert other.get_page('Page 0').get_visuals('renamed')[0]['x'] == 555
+
+
+def test_ambiguous_target_is_unresolved(report):
+    other = _copy(report, 'other')
+    page = other.get_page('Page 0')
+    page.get_visuals('v0_1')[0].update_name('renamed')
+    title = page.get_visuals('v0_2')[0]['config']['singleVisual']['vcObjects']['title']
+    title[0]['properties']['text']['expr']['Literal']['Value'] = "'Chart 1'"
+    with report.record() as recorder:
+        report.get_page('Page 0').get_visuals('v0_1')[0].update_position(x=555)
+    assert recorder.patch.apply(other) == recorder.patch.edits
+    assert [container['x'] for container in page['visualContainers'][2:]] == [0, 100, 200]
+
+
+def test_unresolved_edits_are_returned(report):
+    other = _copy(report, 'other')
+    other.get_page('Page 1')['displayName'] = 'Renamed'
+    with report.record() as recorder:
+        report.get_page('Page 1').hide()
+    assert [edit['method'] for edit in recorder.patch.apply(other)] == ['hide']
+
+
+def test_apply_patch_to_folder(report, tmp_path):
+    folder = tmp_path / 'reports'
+    folder.mkdir()
+    for name in ('a', 'b'):
+        shutil.copyfile(report.path, folder / f'{name}.pbix')
+    with report.record() as recorder:
+        report.get_page('Page 1').hide()
+    assert apply_patch(recorder.patch, str(folder), processes=1, report_class=PosixReport) == {'a': [], 'b': []}
+    assert PosixReport(str(folder), 'b').get_page('Page 1')['config']['visibility'] == 1
+
+
+def test_report_methods_notify_the_layout(report):
+    with report.checkpoint() as checkpoint:
+        report._notify_write()
+        assert checkpoint.changed == [report.layout]
+
+
+def test_resource_packages_are_replayed_with_their_files(report):
+    source, other = _copy(report, 'source'), _copy(report, 'other')
+    item = {'type': 202, 'path': 'BaseThemes/New.json', 'name': 'New'}
+    with source.edit() as session:
+        session.write_file('Report/StaticResources/SharedResources/BaseThemes/New.json', b'{"name": "new"}')
+        source.layout.add_resource_packages('SharedResources', item)
+    with report.record() as recorder:
+        report.add_resource_package(source, 'SharedResources', item)
+    assert [edit['method'] for edit in recorder.patch.edits] == ['add_resource_package']
+    assert PbiPatch.from_json(recorder.patch.to_json()).apply(other) == []
+    assert read_member(other.path, 'Report/StaticResources/SharedResources/BaseThemes/New.json') == b'{"name": "new"}'
+    assert other.layout.get_resource_package('SharedResources')['items'][-1] == item
@@ -0,0 +1,74 @@
+import copy
+import os
+import pickle
+
+from pbi.cache import PbiLayoutCache
+from pbi.container import PbiContainer
+from pbi.layout import PbiLayout
+from pbi.trace import tracer
+from helpers import PosixReport
+
+
+def test_copy_is_shallow(layout):
+    res = copy.copy(layout)
+    assert type(res) is PbiLayout
+    assert res == layout
+    assert res['sections'] is layout['sections']
+    assert res['config'] is layout['config']
+
+
+def test_deepcopy_is_independent(layout):
+    res = copy.deepcopy(layout)
+    assert type(res) is PbiLayout
+    assert res.export() == layout.export()
+    assert res['sections'][0] is not layout['sections'][0]
+    assert type(res['sections'][0]['visualContainers'][0]) is PbiContainer
+    res['sections'][0].hide()
+    assert res.export() != layout.export()
+
+
+def test_pickle_round_trip(layout):
+    res = pickle.loads(pickle.dumps(layout))
+    assert type(res) is PbiLayout
+    assert res.export() == layout.export()
+
+
+def test_export_does_not_modify_layout(layout):
+    before = layout['sections'][0]
+    layout.export()
+    assert layout['sections'][0] is before
+    assert isinstance(layout['config'], dict)
+
+
+def test_pickled_report_keeps_raw_layout_until_parsed(report):
+    res = pickle.loads(pickle.dumps(report))
+    assert res._layout is None
+    assert res.layout.export() == report.layout.export()
+    edited = pickle.loads(pickle.dumps(report))
+    assert edited._layout is not None
+
+
+def test_cache_round_trip(report, tmp_path):
+    cache = PbiLayoutCache(str(tmp_path / 'cache'))
+    tracer.reset()
+    tracer.enable()
+    try:
+        first = PosixReport(report.folder, report.filename, cache)
+        expected = first.layout.export()
+        assert 'cache_hits' not in tracer.counters and tracer.counters['cache_misses'] == 1
+        second = PosixReport(report.folder, report.filename, cache)
+        assert second.layout is not first.layout
+        assert tracer.counters['cache_hits'] == 1 and tracer.counters['cache_misses'] == 1
+    finally:
+        tracer.disable()
+        tracer.reset()
+    assert len(os.listdir(cache.folder)) == 1
+    assert second.layout.export() == expected
+
+
+def test_cache_key_changes_with_format_version(tmp_path, monkeypatch):
+    cache = PbiLayoutCache(str(tmp_path / 'cache'))
+    key = cache.get_key(b'layout')
+    assert cache.get_key(b'layout') == key
+    monkeypatch.setattr('pbi.cache.FORMAT_VERSION', 0)
+    assert cache.get_key(b'layout') != key
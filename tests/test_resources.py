@@ -0,0 +1,58 @@
+import shutil
+
+from helpers import PosixReport
+from pbi.archive import read_member
+from pbi.resources import get_resource_member_name, transfer_resources
+
+NEW = b'{"name": "new"}'
+
+
+def _copy(report, name, item_name=None, data=NEW):
+    shutil.copyfile(report.path, report.path.replace('report.pbix', f'{name}.pbix'))
+    res = PosixReport(report.folder, name)
+    if item_name is not None:
+        item = {'type': 202, 'path': f'BaseThemes/{item_name}.json', 'name': item_name}
+        with res.edit() as session:
+            session.write_file(get_resource_member_name('SharedResources', item), data)
+            res.layout.add_resource_packages('SharedResources', item)
+    return res
+
+
+def test_push_resource_package(report):
+    targets = {
+        'added': _copy(report, 'added'),
+        'present': _copy(report, 'present', 'New'),
+        'identical': _copy(report, 'identical', 'Other'),
+        'replaced': _copy(report, 'replaced', 'New', b'{"name": "old"}'),
+    }
+    source = _copy(report, 'source', 'New')
+    res = source.push_resource_package('SharedResources', ['New', 'CY22SU11'], [t.path for t in targets.values()])
+    assert {name: res[target.path] for name, target in targets.items()} == {
+        'added': {'New': 'added', 'CY22SU11': 'present'},
+        'present': {'New': 'present', 'CY22SU11': 'present'},
+        'identical': {'New': 'Other', 'CY22SU11': 'present'},
+        'replaced': {'New': 'replaced', 'CY22SU11': 'present'},
+    }
+    member_name = 'Report/StaticResources/SharedResources/BaseThemes/New.json'
+    for name in ('added', 'replaced'):
+        target = PosixReport(report.folder, name)
+        assert read_member(target.path, member_name) == NEW
+        assert [item['name'] for item in target.layout.get_resource_package('SharedResources')['items']] == [
+            'CY22SU11', 'New'
+        ]
+    assert read_member(targets['identical'].path, member_name) is None
+
+
+def test_new_resource_package_is_created(report):
+    source = _copy(report, 'source')
+    with source.edit() as session:
+        session.write_file('Report/StaticResources/RegisteredResources/logo.png', b'png')
+        source.layout['resourcePackages'].append({'resourcePackage': {
+            'name': 'RegisteredResources', 'type': 1, 'disabled': False,
+            'items': [{'type': 100, 'path': 'logo.png', 'name': 'logo.png'}]
+        }})
+    assert transfer_resources(source.path, 'RegisteredResources', 'logo.png', [report.path]) == {
+        report.path: {'logo.png': 'added'}
+    }
+    package = PosixReport(report.folder, 'report').layout.get_resource_package('RegisteredResources')
+    assert (package['type'], [item['name'] for item in package['items']]) == (1, ['logo.png'])
@@ -0,0 +1,47 @@
+from pbi.search import PbiTextIndex
+
+
+def _index(layout):
+    index = PbiTextIndex()
+    index.add_layout(layout, 'report')
+    return index
+
+
+def test_search_words_prefixes_and_kinds(layout):
+    index = _index(layout)
+    assert sorted((location.visual.name, location.text) for location in index.search('chart 1')) == [
+        ('v0_1', 'Chart 1'), ('v1_1', 'Chart 1')
+    ]
+    assert index.search('cha') == []
+    assert len(index.search('cha', prefix=True)) == 6
+    assert [location.text for location in index.search('page', kinds=['page'])] == ['Page 0', 'Page 1']
+    assert [location.kind for location in index.search('header view home')] == []
+    assert [location.kind for location in index.search('home view')] == ['bookmark']
+    assert {location.kind for location in index.search('header')} == {'group'}
+
+
+def test_replace_updates_texts_and_index(layout):
+    index = _index(layout)
+    with layout.checkpoint() as checkpoint:
+        assert index.replace('Chart', "Sales' chart", kinds=['title']) == 6
+        assert len(checkpoint.changed) == 6
+    visual = layout.get_page('Page 0').get_visuals('v0_1')[0]
+    assert visual.display_name == "'Sales'' chart 1'"
+    assert index.search('chart', kinds=['page']) == []
+    assert len(index.search("sales' chart")) == 6
+    assert index.replace('missing', 'x') == 0
+
+
+def test_reindex_and_remove_visual(layout):
+    index = _index(layout)
+    page = layout.get_page('Page 0')
+    visual = page.get_visuals('v0_1')[0]
+    visual['config']['singleVisual']['vcObjects']['title'][0]['properties']['text']['expr']['Literal']['Value'] = (
+        "'Revenue'"
+    )
+    assert index.search('revenue') == []
+    index.add_visual(visual, page, 'report')
+    assert [location.visual for location in index.search('revenue')] == [visual]
+    assert len(index.search('chart')) == 5
+    index.remove_visual(visual)
+    assert index.search('revenue') == [] and 'revenue' not in index.tokens
@@ -0,0 +1,65 @@
+import zipfile
+
+import pytest
+
+from helpers import PosixReport
+from pbi.archive import LAYOUT, read_member, write_archive
+
+
+def test_commit_writes_layout_and_files(report):
+    with report.edit() as session:
+        report.get_page('Page 0').hide()
+        session.write_file('Report/StaticResources/RegisteredResources/new.txt', b'new')
+        session.remove_file('SecurityBindings')
+        session.rebind({'aaaa-1111': 'bbbb-2222'})
+    reloaded = PosixReport(report.folder, report.filename)
+    assert reloaded.get_page('Page 0')['config']['visibility'] == 1
+    assert read_member(report.path, 'Report/StaticResources/RegisteredResources/new.txt') == b'new'
+    assert read_member(report.path, 'SecurityBindings') is None
+    assert reloaded.connections.dataset_ids == {'bbbb-2222'}
+
+
+def test_rollback_keeps_edits_made_before_the_session(report):
+    before = read_member(report.path, LAYOUT)
+    report.get_page('Page 1').hide()
+    expected = report.layout.export()
+    with pytest.raises(RuntimeError):
+        with report.edit():
+            report.get_page('Page 0').hide()
+            report.get_page('Page 1').get_visuals('v1_0')[0].update_position(x=999)
+            raise RuntimeError
+    assert read_member(report.path, LAYOUT) == before
+    assert report.layout.export() == expected
+    assert report._session is None
+
+
+def test_rollback_of_unparsed_layout(report):
+    with pytest.raises(RuntimeError):
+        with report.edit():
+            report.get_page('Page 0').hide()
+            raise RuntimeError
+    assert report.get_page('Page 0')['config']['visibility'] == 0
+
+
+def test_write_archive_keeps_members(report, tmp_path):
+    target = str(tmp_path / 'copy.pbix')
+    write_archive(report.path, {'Version': b'2'}, {'SecurityBindings'}, target)
+    with zipfile.ZipFile(report.path) as source, zipfile.ZipFile(target) as copy:
+        assert copy.testzip() is None
+        assert copy.read('Version') == b'2'
+        assert 'SecurityBindings' not in copy.namelist()
+        for info in copy.infolist():
+            source_info = source.getinfo(info.filename)
+            assert (info.compress_type, info.date_time) == (source_info.compress_type, source_info.date_time)
+            if info.filename != 'Version':
+                assert copy.read(info) == source.read(source_info)
+
+
+def test_missing_resource_file_is_not_staged(report):
+    item = {'type': 202, 'path': 'BaseThemes/Missing.json', 'name': 'Missing'}
+    expected = report.layout.export()
+    with pytest.raises(KeyError):
+        with report.edit() as session:
+            session.add_resource_package(report, 'SharedResources', item)
+    assert report.layout.export() == expected
+    assert read_member(report.path, 'Report/StaticResources/SharedResources/BaseThemes/Missing.json') is None
@@ -0,0 +1,39 @@
+def _names(containers):
+    return [container.name for container in containers]
+
+
+def test_visuals_in_region(layout):
+    index = layout.get_page('Page 0').get_spatial_index()
+    assert _names(index.get_visuals_in_region(0, 0, 1280, 80)) == ['title0']
+    assert _names(index.get_visuals_in_region(0, 0, 1280, 80, include_groups=True)) == ['grp0', 'title0']
+    assert _names(index.get_visuals_in_region(0, 0, 1280, 80, contained=True, include_groups=True)) == ['grp0']
+
+
+def test_overlaps_and_off_canvas(layout):
+    page = layout.get_page('Page 0')
+    index = page.get_spatial_index()
+    assert [_names(pair) for pair in index.get_overlaps()] == [['v0_0', 'v0_1'], ['v0_1', 'v0_2']]
+    assert ['grp0', 'title0'] in [_names(pair) for pair in index.get_overlaps(include_groups=True)]
+    assert index.get_off_canvas() == []
+    page.get_visuals('v0_2')[0].update_position(x=1200)
+    index.refresh()
+    assert _names(index.get_off_canvas()) == ['v0_2']
+    assert [_names(pair) for pair in index.get_overlaps()] == [['v0_0', 'v0_1']]
+
+
+def test_nearest(layout):
+    index = layout.get_page('Page 0').get_spatial_index()
+    assert _names(index.get_nearest(100, 250, k=2)) == ['v0_0', 'v0_1']
+    assert _names(index.get_nearest(640, 40, include_groups=True)) == ['grp0']
+
+
+def test_move_and_resize_write_back(layout):
+    page = layout.get_page('Page 0')
+    index = page.get_spatial_index()
+    first, second = page.get_visuals('v0_0')[0], page.get_visuals('v0_1')[0]
+    index.move([second], dx=10, dy=5)
+    assert (second['x'], second['y']) == (110, 205)
+    assert second['config']['layouts'][0]['position']['x'] == 110
+    index.resize([first, second], scale_x=2)
+    assert [(visual['x'], visual['width']) for visual in (first, second)] == [(0, 400), (220, 400)]
+    assert _names(index.get_visuals_in_region(500, 200, 10, 10)) == ['v0_1']
@@ -0,0 +1,44 @@
+import zipfile
+
+import pytest
+
+from helpers import make_pbix
+from pbi.archive import CONNECTIONS, read_member
+from pbi.connections import PbiConnections
+from pbi.thin import get_thick_members, write_thin_archive, write_thin_folder
+
+
+def test_thin_archive_drops_the_data_model(report, tmp_path):
+    target = str(tmp_path / 'thin.pbix')
+    assert write_thin_archive(report.path, target, dataset_ids={'aaaa-1111': 'bbbb-2222'}) == ['DataModel']
+    with zipfile.ZipFile(report.path) as source, zipfile.ZipFile(target) as thin:
+        assert thin.namelist() == [name for name in source.namelist() if name != 'DataModel']
+        assert b'/DataModel' not in thin.read('[Content_Types].xml')
+        assert b'/Report/Layout' in thin.read('[Content_Types].xml')
+        assert thin.read('Report/Layout') == source.read('Report/Layout')
+    assert PbiConnections.from_bytes(read_member(target, CONNECTIONS)).dataset_ids == {'bbbb-2222'}
+    assert get_thick_members(target) == []
+
+
+def test_thin_export_keeps_layout_edits(report, tmp_path):
+    report.get_page('Page 1').hide()
+    thin = report.export_thin('thin', str(tmp_path))
+    assert thin.get_page('Page 1')['config']['visibility'] == 1
+    assert get_thick_members(thin.path) == []
+
+
+def test_binding_is_checked(tmp_path):
+    path = str(make_pbix(tmp_path / 'a.pbix', connections=None))
+    with pytest.raises(ValueError, match='no connection file'):
+        write_thin_archive(path, str(tmp_path / 'thin.pbix'))
+    path = str(make_pbix(tmp_path / 'b.pbix'))
+    with pytest.raises(ValueError, match='not to cccc-3333'):
+        write_thin_archive(path, str(tmp_path / 'thin.pbix'), dataset_id='cccc-3333')
+
+
+def test_thin_folder(tmp_path):
+    for name in ('a', 'b'):
+        make_pbix(tmp_path / f'{name}.pbix')
+    (tmp_path / 'thin').mkdir()
+    assert write_thin_folder(str(tmp_path), str(tmp_path / 'thin')) == {'a': ['DataModel'], 'b': ['DataModel']}
+    assert sorted(path.name for path in (tmp_path / 'thin').iterdir()) == ['a.pbix', 'b.pbix']
@@ -0,0 +1,59 @@
+import json
+import threading
+
+import pytest
+
+from helpers import PosixReport
+from pbi.trace import PbiTracer, tracer
+
+
+@pytest.fixture
+def enabled_tracer():
+    finished = []
+    tracer.reset()
+    tracer.enable(finished.append)
+    yield finished
+    tracer.disable()
+    tracer.reset()
+
+
+def test_disabled_tracer_records_nothing():
+    local_tracer = PbiTracer()
+    with local_tracer.span('job'):
+        local_tracer.count('items')
+    assert (local_tracer.spans, local_tracer.counters) == ([], {})
+
+
+def test_nested_spans_and_counters(report, enabled_tracer):
+    with tracer.span('job', report='report'):
+        opened = PosixReport(report.folder, report.filename)
+        assert len(opened.layout['sections']) == 2
+    assert [span.name for span in enabled_tracer] == ['report.load', 'layout.parse', 'job']
+    load, parse, job = enabled_tracer
+    assert (load.parent, parse.parent, load.depth, job.depth) == (job, job, 1, 0)
+    assert parse.counters['pages_decoded'] == job.counters['pages_decoded'] == 2
+    assert job.counters['containers_decoded'] == 10
+    assert 'pages_decoded' not in load.counters
+    assert tracer.counters['containers_decoded'] == 10
+    assert tracer.get_summary()['job']['calls'] == 1
+
+
+def test_spans_of_other_threads_are_not_nested(enabled_tracer):
+    with tracer.span('main'):
+        thread = threading.Thread(target=lambda: tracer.span('worker').__enter__().__exit__())
+        thread.start()
+        thread.join()
+    worker, main = enabled_tracer
+    assert worker.parent is None and worker.thread != main.thread
+
+
+def test_export_trace_events(tmp_path, enabled_tracer):
+    with tracer.span('job', report='report'):
+        tracer.count('bytes_read', 10)
+    tracer.export(tmp_path / 'trace.json')
+    with open(tmp_path / 'trace.json') as file:
+        trace = json.load(file)
+    assert [(event['name'], event['ph'], event['args']) for event in trace['traceEvents']] == [
+        ('job', 'X', {'report': 'report', 'bytes_read': 10})
+    ]
+    assert trace['otherData']['counters'] == {'bytes_read': 10}
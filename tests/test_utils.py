@@ -0,0 +1,65 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from pbi.utils import EVENT_PREFIX, PS_EVENT_FUNCTION, _parse_event, iter_ps_script, run_ps_script
+
+FAKE_POWERSHELL = f'''#!{sys.executable}
+import sys
+lines = sys.argv[1].split('\\n')
+sys.stdout.buffer.write('\\n'.join(line[len('echo '):] for line in lines if line.startswith('echo ')).encode('utf-8'))
+sys.exit(int(lines[-1]))
+'''
+
+
+@pytest.fixture
+def powershell(tmp_path, monkeypatch):
+    """
+    Puts on the PATH a fake powershell.exe writing the lines of the script starting with 'echo ' as utf-8 and exiting
+    with the code on the last line of the script
+    """
+    path = tmp_path / 'powershell.exe'
+    path.write_text(FAKE_POWERSHELL)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', str(tmp_path) + os.pathsep + os.environ['PATH'])
+
+
+def test_event_function_writes_utf8_without_shadowing_automatic_variables():
+    assert PS_EVENT_FUNCTION.lstrip().startswith('[Console]::OutputEncoding = [Text.Encoding]::UTF8')
+    assert '$event' not in PS_EVENT_FUNCTION.lower()
+
+
+def test_parse_event():
+    assert _parse_event(EVENT_PREFIX + '{"event": "start", "report": "Ventes é"}') == {
+        'event': 'start', 'report': 'Ventes é'
+    }
+    assert _parse_event('Downloading...') is None
+    assert _parse_event(EVENT_PREFIX + '{not json') is None
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='uses a fake powershell.exe script')
+def test_iter_ps_script(powershell, capsys):
+    script = '\n'.join([
+        'echo ' + EVENT_PREFIX + '{"event": "start", "report": "Ventes é"}',
+        'echo Downloading Ventes é',
+        'echo ' + EVENT_PREFIX + '{"event": "finish", "report": "Ventes é", "bytes": 10}',
+        '0'
+    ])
+    events = list(iter_ps_script(script))
+    assert [(event['event'], event['report']) for event in events] == [('start', 'Ventes é'), ('finish', 'Ventes é')]
+    assert events[1]['bytes'] == 10
+    assert events[1]['duration'] >= 0
+    assert 'duration' not in events[0]
+    assert capsys.readouterr().out == 'Downloading Ventes é\n'
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='uses a fake powershell.exe script')
+def test_run_ps_script_errors(powershell):
+    script = '\n'.join(['echo ' + EVENT_PREFIX + '{"event": "error", "report": "a", "message": "denied"}', '0'])
+    with pytest.raises(RuntimeError, match='a: denied'):
+        run_ps_script(script)
+    assert [event['event'] for event in run_ps_script(script, check=False)] == ['error']
+    with pytest.raises(RuntimeError, match='exit code 3'):
+        run_ps_script('3')
@@ -0,0 +1,49 @@
+import pytest
+
+from helpers import PosixReport
+from pbi.variant import PbiVariant
+
+
+def _hide_first_page(report):
+    report.layout['sections'][0]['config']['visibility'] = 1  # a direct edit, not seen by any checkpoint
+
+
+def test_variants_are_built_from_independent_copies(report):
+    expected = report.layout.export()
+    paths = report.build_variants([
+        PbiVariant('hidden', edit=_hide_first_page),
+        PbiVariant('hidden_second', edit=lambda variant: variant.get_page('Page 1').hide()),
+        PbiVariant('prod', dataset_ids={'aaaa-1111': 'bbbb-2222'}),
+    ])
+    assert report.layout.export() == expected
+    visibility = {
+        name: [page['config']['visibility'] for page in PosixReport(report.folder, name).layout['sections']]
+        for name in paths
+    }
+    assert visibility == {'hidden': [1, 0], 'hidden_second': [0, 1], 'prod': [0, 0]}
+    assert PosixReport(report.folder, 'prod').connections.dataset_ids == {'bbbb-2222'}
+    assert PosixReport(report.folder, 'hidden').connections.dataset_ids == {'aaaa-1111'}
+    assert report.connections.dataset_ids == {'aaaa-1111'}
+
+
+def _rebind_in_edit(report):
+    report.connections.rebind({'aaaa-1111': 'cccc-3333'})
+
+
+def test_variants_share_unsaved_source_changes(report):
+    report.get_page('Page 1').hide()
+    paths = report.build_variants([
+        PbiVariant('edited', edit=_rebind_in_edit),
+        PbiVariant('plain', files={'Report/notes.txt': b'notes'}),
+    ])
+    for name in paths:
+        assert PosixReport(report.folder, name).get_page('Page 1')['config']['visibility'] == 1
+    assert PosixReport(report.folder, 'edited').connections.dataset_ids == {'cccc-3333'}
+    assert PosixReport(report.folder, 'plain').connections.dataset_ids == {'aaaa-1111'}
+    assert report.connections.dataset_ids == {'aaaa-1111'}
+
+
+def test_variants_are_not_built_within_an_edit_session(report):
+    with report.edit():
+        with pytest.raises(RuntimeError):
+            report.build_variants([PbiVariant('prod', dataset_ids={'aaaa-1111': 'bbbb-2222'})])
@@ -0,0 +1,112 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from helpers import PosixReport, make_pbix
+from pbi.watch import PARTIAL_FOLDER, PbiWatcher, _get_result
+
+OPERATIONS = [{'method': 'rebind', 'kwargs': {'dataset_ids': {'aaaa-1111': 'bbbb-2222'}}}]
+
+
+@pytest.fixture
+def folders(tmp_path):
+    download, upload = tmp_path / 'download', tmp_path / 'upload'
+    download.mkdir()
+    upload.mkdir()
+    return str(download), str(upload)
+
+
+def _make_watcher(folders, operations=OPERATIONS):
+    return PbiWatcher(*folders, operations, report_class=PosixReport, settle=2.0)
+
+
+def _drop(folder, name, age=10):
+    path = os.path.join(folder, f'{name}.pbix')
+    make_pbix(path)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _process(watcher):
+    with ThreadPoolExecutor(1) as executor:
+        watcher.poll(executor)
+        for future, _ in watcher._running.values():
+            future.result()
+        watcher.poll(executor)
+
+
+def test_files_wait_until_settled(folders):
+    watcher = _make_watcher(folders)
+    path = _drop(folders[0], 'a', age=0)
+    with open(os.path.join(folders[0], 'notes.txt'), 'w') as file:
+        file.write('not a report')
+    now = time.time()
+    assert watcher.get_ready_files(now) == []
+    assert watcher.get_ready_files(now + 1) == []
+    with open(path, 'ab') as file:  # still being written: the settle time starts again
+        file.write(b'\0')
+    mtime = now - 10
+    os.utime(path, (mtime, mtime))
+    assert watcher.get_ready_files(now + 3) == []
+    os.truncate(path, os.path.getsize(path) - 1)
+    os.utime(path, (mtime, mtime))
+    assert watcher.get_ready_files(now + 4) == []
+    assert watcher.get_ready_files(now + 6) == ['a.pbix']
+
+
+def test_processed_files_are_recorded(folders):
+    watcher = _make_watcher(folders)
+    path = _drop(folders[0], 'a')
+    watcher.get_ready_files(time.time() - 5)
+    _process(watcher)
+    assert watcher.state['a.pbix']['status'] == 'done'
+    assert PosixReport(folders[1], 'a').connections.dataset_ids == {'bbbb-2222'}
+    assert os.listdir(os.path.join(folders[1], PARTIAL_FOLDER)) == []
+
+    restarted = _make_watcher(folders)
+    assert restarted.state == watcher.state
+    restarted.get_ready_files(time.time() - 5)
+    assert restarted.get_ready_files() == []
+    os.utime(path)  # same content dropped again
+    restarted.get_ready_files(time.time() + 5)
+    assert restarted.get_ready_files(time.time() + 10) == []
+
+
+def test_failed_files_are_not_uploaded(folders):
+    watcher = _make_watcher(folders, OPERATIONS + [{'method': 'missing_operation'}])
+    _drop(folders[0], 'a')
+    watcher.get_ready_files(time.time() - 5)
+    _process(watcher)
+    assert watcher.state['a.pbix']['status'] == 'error'
+    assert sorted(os.listdir(folders[1])) == [PARTIAL_FOLDER]
+    assert os.listdir(os.path.join(folders[1], PARTIAL_FOLDER)) == []
+
+
+def test_broken_pool_and_interrupt_are_interrupted():
+    for error in (BrokenProcessPool('a worker died'), KeyboardInterrupt()):
+        future = Future()
+        future.set_exception(error)
+        result = _get_result(future)
+        assert result['status'] == 'interrupted'
+        assert result['message'].startswith(type(error).__name__)
+
+
+def test_restart_after_interrupted_and_failed_files(folders):
+    watcher = _make_watcher(folders)
+    stats = {name: os.stat(_drop(folders[0], name)) for name in ('failed', 'interrupted')}
+    future = Future()
+    future.set_exception(BrokenProcessPool('a worker died'))
+    watcher._finish('interrupted.pbix', stats['interrupted'], _get_result(future))
+    watcher._finish('failed.pbix', stats['failed'], {'status': 'error', 'duration': 1.0, 'message': 'KeyError: x'})
+
+    restarted = _make_watcher(folders)
+    restarted.get_ready_files(time.time() - 5)
+    assert restarted.get_ready_files() == ['interrupted.pbix']
+    _process(restarted)
+    assert restarted.state['interrupted.pbix']['status'] == 'done'
+    assert os.path.exists(os.path.join(folders[1], 'interrupted.pbix'))
+    assert not os.path.exists(os.path.join(folders[1], 'failed.pbix'))